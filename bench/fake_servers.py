@@ -0,0 +1,408 @@
+"""Local stand-ins for the Jules and GitHub APIs, for offline benchmarks.
+
+FakeJules runs sessions on a timer: activities appear gradually over
+--session-seconds, then the session completes with its result and a
+sessionCompleted activity. Each progress activity carries a code diff of
+--activity-bytes as a changeSet artifact, the way code-heavy sessions do. Agent2 sessions
+open a PR on FakeGitHub, Agent3 sessions post a review verdict, and fix sessions
+clear the NEEDS_CHANGES verdict for their feature. One in N review sessions
+can be made slow (--slow-review-every), to stand in for a stuck reviewer. FakeGitHub serves the REST
+endpoints the orchestrator calls (pulls, merge, matching-refs, branches, with
+ETags) plus the GraphQL lookups. Both servers can add latency and answer every
+Nth request with a 429.
+
+Used by bench/run_bench.py; can also be run alone to point a local orchestrator at:
+Usage: python bench/fake_servers.py [--jules-port 8801] [--github-port 8802] [--session-seconds 2]
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from orchestrator.metrics import endpoint_label  # noqa: E402
+
+REPO = "acme/app"
+FILLER = "Working through the change set; running the build and checking the diff. "
+
+
+class FakeGitHub:
+    def __init__(self, repo=REPO):
+        self.repo = repo
+        self.prs = {}
+        self.branches = []
+        self._lock = threading.Lock()
+
+    def open_pr(self, head, title, base="main"):
+        with self._lock:
+            number = len(self.prs) + 1
+            self.prs[number] = {"number": number, "title": title, "head": head, "base": base, "merged": False}
+            if head not in self.branches:
+                self.branches.append(head)
+        return number
+
+    def pr_url(self, number):
+        return f"https://github.com/{self.repo}/pull/{number}"
+
+    def pr_number(self, text):
+        match = re.search(rf"https://github.com/{re.escape(self.repo)}/pull/(\d+)", text or "")
+        return int(match.group(1)) if match else None
+
+    def handle(self, method, path, query, headers, body):
+        if not headers.get("Authorization"):
+            return 401, {"message": "Requires authentication"}
+        if path == "/graphql" and method == "POST":
+            return 200, {"data": self._graphql(body.get("query", ""), body.get("variables") or {})}
+        prefix = f"/repos/{self.repo}"
+        if not path.startswith(prefix):
+            return 404, {"message": "Not Found"}
+        rest = path[len(prefix):]
+        if rest == "/pulls" and method == "POST":
+            number = self.open_pr(body.get("head", ""), body.get("title", ""), body.get("base", "main"))
+            return 201, self._rest_pr(self.prs[number])
+        with self._lock:
+            if rest == "/pulls" and method == "GET":
+                head = (query.get("head") or [""])[0].split(":", 1)[-1]
+                return 200, [self._rest_pr(pr) for pr in self.prs.values() if not pr["merged"] and pr["head"] == head]
+            elif rest == "/branches":
+                page = int((query.get("page") or ["1"])[0])
+                per_page = int((query.get("per_page") or ["30"])[0])
+                names = self.branches[(page - 1) * per_page : page * per_page]
+                return 200, [{"name": name} for name in names]
+            elif rest.startswith("/git/matching-refs/heads/"):
+                prefix = rest[len("/git/matching-refs/heads/"):]
+                return 200, [{"ref": f"refs/heads/{name}"} for name in self.branches if name.startswith(prefix)]
+            else:
+                match = re.fullmatch(r"/pulls/(\d+)(/merge)?", rest)
+                pr = self.prs.get(int(match.group(1))) if match else None
+                if pr is None:
+                    return 404, {"message": "Not Found"}
+                if not match.group(2):
+                    return 200, self._rest_pr(pr)
+                if method == "GET":
+                    return (204, None) if pr["merged"] else (404, {"message": "Not Found"})
+                if pr["merged"]:
+                    return 405, {"message": "Pull Request is already merged"}
+                pr["merged"] = True
+                return 200, {"merged": True, "message": "Pull Request successfully merged"}
+
+    def _rest_pr(self, pr):
+        return {
+            "number": pr["number"],
+            "title": pr["title"],
+            "html_url": self.pr_url(pr["number"]),
+            "state": "closed" if pr["merged"] else "open",
+            "merged": pr["merged"],
+            "mergeable": True,
+            "head": {"ref": pr["head"]},
+            "base": {"ref": pr["base"]},
+        }
+
+    def _graphql_pr(self, pr):
+        return {
+            "number": pr["number"],
+            "title": pr["title"],
+            "url": self.pr_url(pr["number"]),
+            "state": "MERGED" if pr["merged"] else "OPEN",
+            "merged": pr["merged"],
+            "mergeable": "MERGEABLE",
+            "headRefName": pr["head"],
+        }
+
+    def _graphql(self, query, variables):
+        # Only the shapes github_client.batch_lookup builds; one repository, so one block.
+        found = {}
+        with self._lock:
+            for alias, number in re.findall(r"(pr\d+): pullRequest\(number: (\d+)\)", query):
+                pr = self.prs.get(int(number))
+                found[alias] = self._graphql_pr(pr) if pr else None
+            for alias, var in re.findall(r"(ref\d+): refs\([^)]*query: \$(s\d+)", query):
+                needle = str(variables.get(var, ""))
+                found[alias] = {"nodes": [{"name": name} for name in self.branches if needle in name]}
+        return {"r0": found}
+
+
+class FakeJules:
+    def __init__(self, github, session_seconds=1.0, activities=20, activity_bytes=200, needs_changes_every=0,
+                 slow_review_every=0, slow_factor=20.0):
+        self.github = github
+        self.session_seconds = session_seconds
+        # The review sessions where (feature number + that feature's review count) % N == 0 take
+        # slow_factor times as long: one in N per feature however concurrent panels interleave; 0 = none.
+        self.slow_review_every = slow_review_every
+        self.slow_factor = slow_factor
+        self.reviews = Counter()
+        self.activities = activities
+        self.filler = (FILLER * (activity_bytes // len(FILLER) + 1))[:activity_bytes]
+        # Every Nth feature (by number) gets NEEDS_CHANGES on its first review; 0 = always PASS.
+        self.needs_changes_every = needs_changes_every
+        self.sessions = {}
+        self.fixed = set()
+        self._lock = threading.Lock()
+
+    def handle(self, method, path, query, headers, body):
+        if not headers.get("X-Goog-Api-Key"):
+            return 401, {"error": {"message": "API key required"}}
+        parts = [part for part in path.split("/") if part]
+        if parts[1:] == ["sessions"] and method == "POST":
+            return 200, self._create(body)
+        if len(parts) < 3 or parts[1] != "sessions":
+            return 404, {"error": {"message": "not found"}}
+        session_id, _, verb = parts[2].partition(":")
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return 404, {"error": {"message": f"session {session_id} not found"}}
+            self._advance(session)
+            if verb:
+                return 200, {}
+            if parts[3:] == ["activities"]:
+                page_size = int((query.get("pageSize") or ["50"])[0])
+                offset = int((query.get("pageToken") or ["0"])[0])
+                released = session["released"]
+                page = {"activities": [self._activity(session, idx) for idx in range(offset, min(offset + page_size, released))]}
+                if offset + page_size < released:
+                    page["nextPageToken"] = str(offset + page_size)
+                return 200, page
+            found = {"name": f"sessions/{session_id}", "title": session["title"], "state": session["state"]}
+            if session.get("pr_number"):
+                found["outputs"] = [{"pullRequest": {"url": self.github.pr_url(session["pr_number"])}}]
+            return 200, found
+
+    def _create(self, body):
+        title = str(body.get("title") or "")
+        prompt = str(body.get("prompt") or "")
+        with self._lock:
+            session_id = str(10**15 + len(self.sessions) + 1)
+            if title.startswith("Agent2 Fix"):
+                kind, feature = "fix", self._feature_for_pr(prompt)
+            elif title.startswith("Agent2 "):
+                kind, feature = "dev", title.split(" ", 1)[1]
+            elif title.startswith("Agent3 Review "):
+                kind, feature = "review", title.rsplit(" ", 1)[1]
+            else:
+                kind, feature = "other", None
+            duration = self.session_seconds
+            if kind == "review":
+                self.reviews[feature] += 1
+                digits = re.sub(r"\D", "", str(feature)) or "0"
+                if self.slow_review_every and (int(digits) + self.reviews[feature]) % self.slow_review_every == 0:
+                    duration *= self.slow_factor
+            self.sessions[session_id] = {
+                "id": session_id,
+                "title": title,
+                "kind": kind,
+                "feature": feature,
+                "created": time.monotonic(),
+                "duration": duration,
+                "state": "IN_PROGRESS",
+                "released": 0,
+                "result": None,
+            }
+        return {"name": f"sessions/{session_id}", "title": title, "state": "QUEUED"}
+
+    def _feature_for_pr(self, prompt):
+        number = self.github.pr_number(prompt)
+        for session in self.sessions.values():
+            if session["kind"] == "dev" and session.get("pr_number") == number:
+                return session["feature"]
+        return None
+
+    def _advance(self, session):
+        if session["state"] == "COMPLETED":
+            return
+        elapsed = time.monotonic() - session["created"]
+        if elapsed < session["duration"]:
+            session["released"] = int(self.activities * elapsed / session["duration"])
+            return
+        session["result"] = self._finish(session)
+        # Result message (if any), then sessionCompleted.
+        session["released"] = self.activities + (1 if session["result"] else 0) + 1
+        session["state"] = "COMPLETED"
+
+    def _finish(self, session):
+        feature = session["feature"]
+        if session["kind"] == "dev":
+            branch = f"feature/{str(feature).lower()}-{session['id']}"
+            session["pr_number"] = self.github.open_pr(branch, f"Feature {feature}")
+            return f"Opened pull request {self.github.pr_url(session['pr_number'])} from {branch}."
+        if session["kind"] == "review":
+            digits = re.sub(r"\D", "", str(feature))
+            picky = self.needs_changes_every and digits and int(digits) % self.needs_changes_every == 0
+            verdict = "NEEDS_CHANGES" if picky and feature not in self.fixed else "PASS"
+            review = {
+                "verdict": verdict,
+                "blocking": ["Handle the empty input case."] if verdict == "NEEDS_CHANGES" else [],
+                "non_blocking": [],
+            }
+            return f"BEGIN_REVIEW_JSON\n{json.dumps(review)}\nEND_REVIEW_JSON"
+        if session["kind"] == "fix":
+            self.fixed.add(feature)
+            return "Pushed the requested changes."
+        return None
+
+    def _activity(self, session, idx):
+        name = f"sessions/{session['id']}/activities/{idx}"
+        if idx >= self.activities:
+            if idx == self.activities and session["result"]:
+                return {"name": name, "originator": "agent", "agentMessaged": {"agentMessage": session["result"]}}
+            return {"name": name, "originator": "system", "sessionCompleted": {}}
+        patch = f"diff --git a/src/step{idx}.py b/src/step{idx}.py\n+{self.filler}\n"
+        return {
+            "name": name,
+            "originator": "agent",
+            "progressUpdated": {"title": f"Step {idx + 1}", "description": "Edited the module and ran the tests."},
+            "artifacts": [{"changeSet": {"source": "sources/github/" + self.github.repo, "gitPatch": {"unidiffPatch": patch}}}],
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeServer"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def _dispatch(self, method):
+        server = self.server
+        split = urlsplit(self.path)
+        path = unquote(split.path)
+        throttled = server.record(method, path)
+        if server.latency:
+            time.sleep(server.latency)
+        if throttled:
+            self._send(429, {"message": "rate limited"}, {"Retry-After": f"{server.retry_after:g}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            self._send(400, {"message": "invalid json"})
+            return
+        status, payload = server.app.handle(method, path, parse_qs(split.query), self.headers, body)
+        self._send(status, payload)
+
+    def _send(self, status, payload, extra_headers=None):
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        headers = dict(extra_headers or {})
+        if status == 200 and self.command == "GET" and body:
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+                self.server.count("not_modified")
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        if body:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, app, port=0, latency=0.0, throttle_every=0, retry_after=0.2):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.app = app
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.requests = Counter()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def record(self, method, path):
+        # Returns True when this request should be answered with a 429.
+        with self._lock:
+            self.requests[f"{method} {endpoint_label(path)}"] += 1
+            self.stats["requests"] += 1
+            throttled = bool(self.throttle_every) and self.stats["requests"] % self.throttle_every == 0
+            if throttled:
+                self.stats["throttled"] += 1
+            return throttled
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name=f"fake-{self.server_port}", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def start_fakes(session_seconds=1.0, activities=20, activity_bytes=200, needs_changes_every=0,
+                latency=0.0, throttle_every=0, jules_port=0, github_port=0, slow_review_every=0):
+    github = FakeGitHub()
+    jules = FakeJules(github, session_seconds, activities, activity_bytes, needs_changes_every, slow_review_every)
+    jules_server = FakeServer(jules, jules_port, latency, throttle_every).start()
+    github_server = FakeServer(github, github_port, latency, throttle_every).start()
+    return jules_server, github_server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jules-port", type=int, default=8801)
+    parser.add_argument("--github-port", type=int, default=8802)
+    parser.add_argument("--session-seconds", type=float, default=2.0)
+    parser.add_argument("--activities", type=int, default=20)
+    parser.add_argument("--activity-bytes", type=int, default=200)
+    parser.add_argument("--needs-changes-every", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--slow-review-every", type=int, default=0)
+    args = parser.parse_args()
+    jules_server, github_server = start_fakes(
+        args.session_seconds,
+        args.activities,
+        args.activity_bytes,
+        args.needs_changes_every,
+        args.latency_ms / 1000,
+        args.throttle_every,
+        args.jules_port,
+        args.github_port,
+        args.slow_review_every,
+    )
+    print(f"JULES_API_BASE={jules_server.url}/v1alpha")
+    print(f"GITHUB_API_URL={github_server.url}")
+    print(f"GITHUB_REPOSITORY={REPO}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        jules_server.stop()
+        github_server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""End-to-end orchestrator benchmark against the local fake Jules/GitHub servers.
+
+Each scenario gets a fresh clone of a local bare "origin" with a generated
+backlog of N ready features, then runs `python -m orchestrator.run` until every
+feature is merged (or a run makes no progress). Reported per scenario: wall
+time, orchestrator runs, requests served by each fake (and how many were 429s
+or 304s), and CPU time of the orchestrator processes including their git children.
+
+Usage: python bench/run_bench.py [--scenario single,fifty] [--json results.json]
+                                 [--env ORCH_GIT_BACKEND=plumbing] [--verbose]
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from fake_servers import REPO, start_fakes  # noqa: E402
+
+SCENARIOS = {
+    # One feature through Agent2, Agent3 and merge: the fixed cost of a run.
+    "single": {"features": 1, "concurrency": 1, "session_seconds": 0.5},
+    # A full backlog through the async engine; every 10th feature goes through a fix round.
+    "fifty": {"features": 50, "concurrency": 10, "session_seconds": 0.5, "needs_changes_every": 10},
+    # Sessions with thousands of large activities: paging and activity scanning.
+    "huge-activity": {"features": 1, "concurrency": 1, "session_seconds": 2.0, "activities": 5000, "activity_bytes": 2000},
+    # Slow, rate-limited APIs: every 7th request is a 429.
+    "throttled": {"features": 5, "concurrency": 5, "session_seconds": 0.5, "latency_ms": 50, "throttle_every": 7},
+    # Three redundant reviewers per feature, one in three review sessions 20x slower; first PASS decides.
+    # Compare with --env ORCH_REVIEWERS=1 to see slow reviewers block the pipeline.
+    "review-panel": {
+        "features": 6,
+        "concurrency": 6,
+        "session_seconds": 0.5,
+        "slow_review_every": 3,
+        "env": {"ORCH_REVIEWERS": "3", "ORCH_REVIEW_QUORUM": "first_pass"},
+    },
+}
+DEFAULTS = {
+    "features": 1,
+    "concurrency": 1,
+    "session_seconds": 0.5,
+    "activities": 20,
+    "activity_bytes": 200,
+    "needs_changes_every": 0,
+    "latency_ms": 0,
+    "throttle_every": 0,
+    "slow_review_every": 0,
+    "env": {},
+    "max_runs": 60,
+}
+
+
+def git(args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def write_backlog(directory, features):
+    directory.mkdir(parents=True)
+    files = {
+        "product": {"version": 1, "product": {"id": "bench", "name": "Bench", "vision": "Benchmark backlog."}},
+        "epics": {"version": 1, "items": [{"id": "E1", "title": "Bench epic", "status": "planned"}]},
+        "features": {"version": 1, "items": []},
+        "stories": {"version": 1, "items": []},
+        "acceptance": {"version": 1, "items": []},
+    }
+    for idx in range(1, features + 1):
+        files["features"]["items"].append(
+            {"id": f"F{idx}", "epic": "E1", "title": f"Feature {idx}", "status": "ready", "description": f"Bench feature {idx}."}
+        )
+        files["stories"]["items"].append({"id": f"S{idx}", "feature": f"F{idx}", "title": f"Story {idx}", "status": "ready"})
+        files["acceptance"]["items"].append({"story": f"S{idx}", "criteria": [f"Criterion {idx}"]})
+    for name, payload in files.items():
+        (directory / f"{name}.yaml").write_text(yaml.safe_dump(payload, sort_keys=False))
+
+
+def make_workdir(tmp, features):
+    origin = tmp / "origin.git"
+    work = tmp / "work"
+    git(["init", "-q", "--bare", "-b", "main", str(origin)], tmp)
+    git(["clone", "-q", str(origin), str(work)], tmp)
+    git(["config", "user.name", "bench"], work)
+    git(["config", "user.email", "bench@example.com"], work)
+    git(["checkout", "-q", "-b", "main"], work)
+    write_backlog(work / "backlog", features)
+    (work / "status").mkdir()
+    (work / "status" / ".keep").write_text("")
+    git(["add", "-A"], work)
+    git(["commit", "-qm", "seed"], work)
+    git(["push", "-q", "origin", "main"], work)
+    return work
+
+
+def orchestrator_env(scenario, jules_url, github_url, overrides):
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.startswith(("JULES_", "ORCH_", "GITHUB_")) and key != "PRODUCT_PROMPT"
+    }
+    env.update(
+        {
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])),
+            "JULES_API_BASE": f"{jules_url}/v1alpha",
+            "JULES_KEY_ARCH": "bench-arch",
+            "JULES_KEY_DEV": "bench-dev",
+            "JULES_KEY_REVIEW": "bench-review",
+            "JULES_SOURCE": f"sources/github/{REPO}",
+            "GITHUB_TOKEN": "bench-token",
+            "GITHUB_REPOSITORY": REPO,
+            "GITHUB_API_URL": github_url,
+            "ORCH_AUTO_MERGE": "true",
+            "ORCH_STATUS_MODE": "artifact",
+            "ORCH_CONCURRENCY": str(scenario["concurrency"]),
+            "ORCH_POLL_SECONDS": "0",
+            "ORCH_POLL_MIN_SECONDS": "0.05",
+            "ORCH_POLL_MAX_SECONDS": "0.5",
+            # The fakes are local; pacing would only measure the governor.
+            "ORCH_API_RPM": "60000",
+            "ORCH_RUN_MAX_MINUTES": "15",
+        }
+    )
+    env.update(scenario["env"])
+    env.update(overrides)
+    return env
+
+
+def feature_statuses(work):
+    features = yaml.safe_load((work / "backlog" / "features.yaml").read_text()) or {}
+    return {str(item.get("id")): item.get("status") for item in features.get("items", [])}
+
+
+def cpu_children():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_scenario(name, scenario, overrides, verbose):
+    tmp = Path(tempfile.mkdtemp(prefix=f"bench-{name}-"))
+    jules_server, github_server = start_fakes(
+        scenario["session_seconds"],
+        scenario["activities"],
+        scenario["activity_bytes"],
+        scenario["needs_changes_every"],
+        scenario["latency_ms"] / 1000,
+        scenario["throttle_every"],
+        slow_review_every=scenario["slow_review_every"],
+    )
+    try:
+        work = make_workdir(tmp, scenario["features"])
+        env = orchestrator_env(scenario, jules_server.url, github_server.url, overrides)
+        log_path = tmp / "orchestrator.log"
+        statuses = feature_statuses(work)
+        runs = 0
+        failed_runs = 0
+        outcome = "done"
+        cpu_start = cpu_children()
+        start = time.perf_counter()
+        with log_path.open("w") as log:
+            while any(status != "done" for status in statuses.values()):
+                if runs >= scenario["max_runs"]:
+                    outcome = "max_runs"
+                    break
+                runs += 1
+                proc = subprocess.run(
+                    [sys.executable, "-m", "orchestrator.run"], cwd=work, env=env, stdout=log, stderr=subprocess.STDOUT
+                )
+                failed_runs += proc.returncode != 0
+                previous, statuses = statuses, feature_statuses(work)
+                if statuses == previous:
+                    outcome = "stalled"
+                    break
+        wall = time.perf_counter() - start
+        cpu = cpu_children() - cpu_start
+        result = {
+            "scenario": name,
+            "outcome": outcome,
+            "features": scenario["features"],
+            "done": sum(1 for status in statuses.values() if status == "done"),
+            "runs": runs,
+            "failed_runs": failed_runs,
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": round(cpu, 3),
+            "jules_requests": jules_server.stats["requests"],
+            "github_requests": github_server.stats["requests"],
+            "throttled": jules_server.stats["throttled"] + github_server.stats["throttled"],
+            "not_modified": jules_server.stats["not_modified"] + github_server.stats["not_modified"],
+            "endpoints": {
+                "jules": dict(jules_server.requests.most_common()),
+                "github": dict(github_server.requests.most_common()),
+            },
+        }
+        if outcome != "done" or failed_runs:
+            print(f"[{name}] {outcome}, {failed_runs} failed run(s); last log lines:")
+            print("".join(log_path.read_text().splitlines(keepends=True)[-20:]))
+        if verbose:
+            for service, counts in result["endpoints"].items():
+                for endpoint, count in counts.items():
+                    print(f"  {service:<6} {count:6d}  {endpoint}")
+        return result
+    finally:
+        jules_server.stop()
+        github_server.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", default=",".join(SCENARIOS), help=f"comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, help="override ORCH_CONCURRENCY for every scenario")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra orchestrator env")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="print request counts per endpoint")
+    args = parser.parse_args()
+    overrides = dict(item.split("=", 1) for item in args.env)
+
+    results = []
+    print(f"{'scenario':<14} {'outcome':<9} {'done':>7} {'runs':>5} {'wall s':>8} {'cpu s':>7} {'jules':>7} {'github':>7} {'429':>5}")
+    for name in filter(None, args.scenario.split(",")):
+        if name not in SCENARIOS:
+            raise SystemExit(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        scenario = {**DEFAULTS, **SCENARIOS[name]}
+        if args.concurrency:
+            scenario["concurrency"] = args.concurrency
+        result = run_scenario(name, scenario, overrides, args.verbose)
+        results.append(result)
+        print(
+            f"{name:<14} {result['outcome']:<9} {result['done']:>3}/{result['features']:<3} {result['runs']:>5} "
+            f"{result['wall_seconds']:8.2f} {result['cpu_seconds']:7.2f} {result['jules_requests']:7d} "
+            f"{result['github_requests']:7d} {result['throttled']:5d}"
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+    return 0 if all(result["outcome"] == "done" and not result["failed_runs"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
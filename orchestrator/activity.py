@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from .backlog import BACKLOG_KEYS, is_backlog_payload
+from .review import is_review_payload
+from .utils import iter_json_objects, iter_strings
+
+
+PR_URL_RE = re.compile(r"https://github.com/[^/]+/[^/]+/pull/\d+")
+BRANCH_REF_RE = re.compile(r"refs/heads/([A-Za-z0-9._/-]+)")
+FEATURE_BRANCH_RE = re.compile(r"(feature/[A-Za-z0-9._/-]+)")
+GIT_PUSH_RE = re.compile(r"\bgit\b[^|;&\n]*\bpush\b")
+
+WANT_PR = "pr"
+WANT_BACKLOG = "backlog"
+WANT_REVIEW = "review"
+
+# Jules activity kinds; an activity carries exactly one of these keys.
+AGENT_MESSAGED = "agentMessaged"
+USER_MESSAGED = "userMessaged"
+PLAN_GENERATED = "planGenerated"
+PLAN_APPROVED = "planApproved"
+PROGRESS_UPDATED = "progressUpdated"
+SESSION_COMPLETED = "sessionCompleted"
+SESSION_FAILED = "sessionFailed"
+ACTIVITY_KINDS = (
+    AGENT_MESSAGED,
+    USER_MESSAGED,
+    PLAN_GENERATED,
+    PLAN_APPROVED,
+    PROGRESS_UPDATED,
+    SESSION_COMPLETED,
+    SESSION_FAILED,
+)
+UNKNOWN_KIND = "unknown"
+# Envelope fields of every activity; never searched.
+_ENVELOPE_KEYS = frozenset({"name", "id", "createTime", "originator", "description", "artifacts"})
+
+
+@dataclass
+class Activity:
+    name: str | None
+    kind: str
+    body: dict[str, Any]
+    description: str | None
+    artifacts: list[Any]
+
+    @classmethod
+    def from_api(cls, raw: dict[str, Any]) -> "Activity":
+        kind = next((key for key in ACTIVITY_KINDS if key in raw), UNKNOWN_KIND)
+        if kind == UNKNOWN_KIND:
+            # A kind this client does not know yet: keep its payload keys, minus the envelope.
+            body = {key: value for key, value in raw.items() if key not in _ENVELOPE_KEYS}
+        else:
+            body = raw.get(kind) if isinstance(raw.get(kind), dict) else {}
+        description = raw.get("description")
+        artifacts = raw.get("artifacts")
+        return cls(
+            name=str(raw.get("name") or raw.get("id") or "") or None,
+            kind=kind,
+            body=body,
+            description=description if isinstance(description, str) else None,
+            artifacts=artifacts if isinstance(artifacts, list) else [],
+        )
+
+    @property
+    def final_state(self) -> str | None:
+        if self.kind == SESSION_COMPLETED:
+            return "COMPLETED"
+        if self.kind == SESSION_FAILED:
+            return "FAILED"
+        return None
+
+    def texts(self) -> Iterator[str]:
+        # Only the fields an agent writes prose into. Our own prompts (userMessaged) are
+        # skipped, so their marker and JSON templates never match; patch bodies, tool
+        # output and media in the artifacts are never walked.
+        if self.kind == AGENT_MESSAGED:
+            yield from _text(self.body.get("agentMessage"))
+        elif self.kind == PROGRESS_UPDATED:
+            yield from _text(self.body.get("title"), self.body.get("description"))
+        elif self.kind == PLAN_GENERATED:
+            plan = self.body.get("plan")
+            steps = plan.get("steps") if isinstance(plan, dict) else None
+            for step in steps or []:
+                if isinstance(step, dict):
+                    yield from _text(step.get("title"), step.get("description"))
+        elif self.kind == SESSION_FAILED:
+            yield from _text(self.body.get("reason"))
+        elif self.kind == UNKNOWN_KIND:
+            yield from iter_strings(self.body)
+        if self.kind != USER_MESSAGED:
+            yield from _text(self.description)
+        for artifact in self.artifacts:
+            if not isinstance(artifact, dict):
+                continue
+            change_set = artifact.get("changeSet")
+            if isinstance(change_set, dict) and isinstance(change_set.get("gitPatch"), dict):
+                yield from _text(change_set["gitPatch"].get("suggestedCommitMessage"))
+            bash = artifact.get("bashOutput")
+            if isinstance(bash, dict):
+                # "git push origin feature/..." names the branch; push output goes to branch_texts() only.
+                yield from _text(bash.get("command"))
+
+    def branch_texts(self) -> Iterator[str]:
+        # Output of git push commands, searched for the branch only: "git push -u origin HEAD"
+        # names it just in the output ("HEAD -> feature/x").
+        for artifact in self.artifacts:
+            bash = artifact.get("bashOutput") if isinstance(artifact, dict) else None
+            if isinstance(bash, dict) and isinstance(bash.get("command"), str) and GIT_PUSH_RE.search(bash["command"]):
+                yield from _text(bash.get("output"))
+
+
+def _text(*values: Any) -> Iterator[str]:
+    for value in values:
+        if isinstance(value, str) and value:
+            yield value
+
+
+def session_pr_url(session: dict[str, Any]) -> str | None:
+    # A session that published a PR lists it in outputs[].pullRequest.url.
+    for output in session.get("outputs") or []:
+        pull_request = output.get("pullRequest") if isinstance(output, dict) else None
+        if isinstance(pull_request, dict) and pull_request.get("url"):
+            return str(pull_request["url"])
+    return None
+
+
+# Longest text buffered after a BEGIN marker whose END never arrives.
+MAX_MARKER_PAYLOAD = 1 << 20
+
+
+class MarkerMatcher:
+    # BEGIN_x ... END_x payloads, fed one string at a time; only the text between the markers
+    # is buffered, so a payload split across activities (or polls) is still found.
+    def __init__(self, begin: str, end: str) -> None:
+        self.begin = begin
+        self.end = end
+        self.payload: dict[str, Any] | None = None
+        self._parts: list[str] | None = None
+        self._size = 0
+
+    def feed(self, text: str) -> None:
+        while self.payload is None:
+            if self._parts is None:
+                start = text.find(self.begin)
+                if start == -1:
+                    return
+                text = text[start + len(self.begin) :]
+                self._parts = []
+                self._size = 0
+            end = text.find(self.end)
+            if end == -1:
+                self._parts.append(text)
+                self._size += len(text)
+                if self._size <= MAX_MARKER_PAYLOAD:
+                    return
+                # A stray BEGIN; drop what it buffered and look for the next one.
+                self._parts = None
+                continue
+            self._parts.append(text[:end])
+            raw = "\n".join(self._parts).strip()
+            self._parts = None
+            text = text[end + len(self.end) :]
+            try:
+                obj = json.loads(raw)
+            except json.JSONDecodeError:
+                # e.g. the prompt's own "BEGIN_x ... END_x" instructions echoed back; keep looking.
+                continue
+            if isinstance(obj, dict):
+                self.payload = obj
+
+
+class JsonMatcher:
+    # Fallback for payloads sent without markers: the first JSON object the predicate accepts.
+    # Strings without any of the hint substrings are never parsed.
+    def __init__(self, predicate: Callable[[dict[str, Any]], bool], hints: tuple[str, ...]) -> None:
+        self.predicate = predicate
+        self.hints = hints
+        self.payload: dict[str, Any] | None = None
+
+    def feed(self, text: str) -> None:
+        if self.payload is None and "{" in text and any(hint in text for hint in self.hints):
+            self.payload = next(iter_json_objects(text, self.predicate), None)
+
+
+class ActivityScan:
+    # Every matcher in one pass over each activity's strings. Lives as long as the session's
+    # cursor, so state carries over between polls and each activity is scanned once.
+    def __init__(self) -> None:
+        self.pr_url: str | None = None
+        # Set by a sessionCompleted/sessionFailed activity; nothing follows it.
+        self.final_state: str | None = None
+        self._ref_branch: str | None = None
+        self._feature_branch: str | None = None
+        self._markers = {
+            WANT_BACKLOG: MarkerMatcher("BEGIN_BACKLOG_JSON", "END_BACKLOG_JSON"),
+            WANT_REVIEW: MarkerMatcher("BEGIN_REVIEW_JSON", "END_REVIEW_JSON"),
+        }
+        self._fallbacks = {
+            WANT_BACKLOG: JsonMatcher(is_backlog_payload, tuple(f'"{key}"' for key in sorted(BACKLOG_KEYS))),
+            WANT_REVIEW: JsonMatcher(is_review_payload, ('"verdict"',)),
+        }
+        self.scanned_bytes = 0
+
+    @property
+    def branch(self) -> str | None:
+        # A feature/ branch beats a plain refs/heads/ mention; the latest of either wins.
+        return self._feature_branch or self._ref_branch
+
+    def feed(self, activity: Activity, want: str) -> bool:
+        # True once the wanted artifact is complete, so the caller can stop reading.
+        self.final_state = activity.final_state or self.final_state
+        for text in activity.texts():
+            self.scanned_bytes += len(text.encode("utf-8"))
+            if self.pr_url is None:
+                match = PR_URL_RE.search(text)
+                if match:
+                    self.pr_url = match.group(0)
+                self._match_branch(text)
+            for marker in self._markers.values():
+                marker.feed(text)
+            fallback = self._fallbacks.get(want)
+            if fallback is not None:
+                fallback.feed(text)
+            if self.complete(want):
+                return True
+        if self.pr_url is None:
+            for text in activity.branch_texts():
+                self.scanned_bytes += len(text.encode("utf-8"))
+                self._match_branch(text)
+        return False
+
+    def _match_branch(self, text: str) -> None:
+        for match in BRANCH_REF_RE.finditer(text):
+            self._ref_branch = match.group(1)
+        for match in FEATURE_BRANCH_RE.finditer(text):
+            self._feature_branch = match.group(1)
+
+    def observe_session(self, session: dict[str, Any]) -> None:
+        if self.pr_url is None:
+            self.pr_url = session_pr_url(session)
+
+    def complete(self, want: str) -> bool:
+        if want == WANT_PR:
+            return self.pr_url is not None
+        return self._markers[want].payload is not None
+
+    def result(self, want: str) -> dict[str, Any] | None:
+        # Marker payloads take precedence over a bare JSON object seen anywhere.
+        return self._markers[want].payload or self._fallbacks[want].payload
@@ -1,11 +1,24 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import pickle
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+try:
+    from yaml import CSafeDumper, CSafeLoader
+
+    HAS_LIBYAML = True
+except ImportError:  # PyYAML built without libyaml
+    CSafeDumper = CSafeLoader = None  # type: ignore[assignment, misc]
+    HAS_LIBYAML = False
+
+from .scheduler import EPIC_ORDER_PRIORITY, FeatureGraph
+from .utils import atomic_write, find_json_object
+
 
 BACKLOG_FILES = {
     "product": "backlog/product.yaml",
@@ -14,32 +27,75 @@ BACKLOG_FILES = {
     "stories": "backlog/stories.yaml",
     "acceptance": "backlog/acceptance.yaml",
 }
+# Top-level keys of an Agent1 payload; any one of them marks a JSON object as a backlog.
+BACKLOG_KEYS = frozenset(BACKLOG_FILES)
+CACHE_DIR = ".orchestrator-cache"
+SNAPSHOT_FILE = "backlog.pickle"
+SNAPSHOT_VERSION = 1
 
 
 class BacklogStore:
-    def __init__(self, root: Path) -> None:
+    use_libyaml = HAS_LIBYAML
+
+    def __init__(self, root: Path, use_cache: bool = False) -> None:
         self.root = root
+        # Optional parsed snapshot under .orchestrator-cache/; the YAML files stay the source of truth.
+        self.use_cache = use_cache
         self.product: dict[str, Any] = {}
         self.epics: dict[str, Any] = {}
         self.features: dict[str, Any] = {}
         self.stories: dict[str, Any] = {}
         self.acceptance: dict[str, Any] = {}
+        # Indexes hold positions into the items lists; they are rebuilt whenever a
+        # section is replaced and extended in place when items are appended.
+        self._feature_pos_by_id: dict[Any, list[int]] = {}
+        self._features_by_status: dict[Any, dict[int, dict[str, Any]]] = {}
+        self._stories_by_feature: dict[Any, list[dict[str, Any]]] = {}
+        self._acceptance_by_story: dict[Any, list[tuple[int, dict[str, Any]]]] = {}
+        # Sections changed since the last load/save, and a digest of what each file last held on disk.
+        self._dirty: set[str] = set()
+        self._disk_digest: dict[str, str] = {}
+        # Features the last feature_graph() found can never start (unknown dependency or cycle).
+        self.stalled_features: dict[str, str] = {}
+        self.duplicate_features: list[str] = []
 
     def load(self) -> None:
-        self.product = self._read_yaml(BACKLOG_FILES["product"])
-        self.epics = self._read_yaml(BACKLOG_FILES["epics"], default_items=True)
-        self.features = self._read_yaml(BACKLOG_FILES["features"], default_items=True)
-        self.stories = self._read_yaml(BACKLOG_FILES["stories"], default_items=True)
-        self.acceptance = self._read_yaml(BACKLOG_FILES["acceptance"], default_items=True)
-
-    def save_all(self) -> None:
-        self._write_yaml(BACKLOG_FILES["product"], self.product)
-        self._write_yaml(BACKLOG_FILES["epics"], self.epics)
-        self._write_yaml(BACKLOG_FILES["features"], self.features)
-        self._write_yaml(BACKLOG_FILES["stories"], self.stories)
-        self._write_yaml(BACKLOG_FILES["acceptance"], self.acceptance)
+        if not (self.use_cache and self._read_snapshot()):
+            self.product = self._read_yaml(BACKLOG_FILES["product"])
+            self.epics = self._read_yaml(BACKLOG_FILES["epics"], default_items=True)
+            self.features = self._read_yaml(BACKLOG_FILES["features"], default_items=True)
+            self.stories = self._read_yaml(BACKLOG_FILES["stories"], default_items=True)
+            self.acceptance = self._read_yaml(BACKLOG_FILES["acceptance"], default_items=True)
+            if self.use_cache:
+                self._write_snapshot()
+        self._index_features()
+        self._index_stories()
+        self._index_acceptance()
+        self._dirty.clear()
+
+    def save_all(self, force: bool = False) -> list[str]:
+        # Only dirty sections are serialised, and a file is rewritten only if its text changed.
+        written: list[str] = []
+        for section, rel_path in BACKLOG_FILES.items():
+            if not force and section not in self._dirty:
+                continue
+            if self._write_yaml(rel_path, getattr(self, section)):
+                written.append(rel_path)
+        self._dirty.clear()
+        if written and self.use_cache:
+            self._write_snapshot()
+        return written
+
+    def revision(self) -> tuple[str | None, ...]:
+        # Changes whenever a save writes different content (or a load reads it).
+        return tuple(self._disk_digest.get(rel_path) for rel_path in BACKLOG_FILES.values())
+
+    def mark_dirty(self, *sections: str) -> None:
+        # For callers that edit the section dicts directly instead of through the store.
+        self._dirty.update(sections or BACKLOG_FILES.keys())
 
     def apply_agent1_payload(self, payload: dict[str, Any], mode: str = "replace") -> None:
+        self._dirty.update(section for section in BACKLOG_FILES if section in payload)
         if mode == "replace":
             if "product" in payload:
                 self.product = {"version": 1, "product": payload["product"]}
@@ -47,10 +103,13 @@ class BacklogStore:
                 self.epics = {"version": 1, "items": payload["epics"]}
             if "features" in payload:
                 self.features = {"version": 1, "items": payload["features"]}
+                self._index_features()
             if "stories" in payload:
                 self.stories = {"version": 1, "items": payload["stories"]}
+                self._index_stories()
             if "acceptance" in payload:
                 self.acceptance = {"version": 1, "items": payload["acceptance"]}
+                self._index_acceptance()
             return
 
         # append mode
@@ -71,55 +130,121 @@ class BacklogStore:
         if "epics" in payload:
             self.epics = {"version": 1, "items": _merge_items(self.epics.get("items", []), payload["epics"])}
         if "features" in payload:
-            self.features = {"version": 1, "items": _merge_items(self.features.get("items", []), payload["features"])}
+            existing = self.features.get("items", [])
+            merged = _merge_items(existing, payload["features"], existing_ids=set(self._feature_pos_by_id))
+            self.features = {"version": 1, "items": merged}
+            self._index_features(start=len(existing))
         if "stories" in payload:
-            self.stories = {"version": 1, "items": _merge_items(self.stories.get("items", []), payload["stories"])}
+            existing = self.stories.get("items", [])
+            self.stories = {"version": 1, "items": _merge_items(existing, payload["stories"])}
+            self._index_stories(start=len(existing))
         if "acceptance" in payload:
+            existing = self.acceptance.get("items", [])
             self.acceptance = {
                 "version": 1,
-                "items": _merge_acceptance(self.acceptance.get("items", []), payload["acceptance"]),
+                "items": _merge_acceptance(existing, payload["acceptance"]),
             }
+            self._index_acceptance(start=len(existing))
 
-    def next_ready_feature(self) -> dict[str, Any] | None:
-        items = self.features.get("items", [])
-        for item in items:
-            if item.get("status") == "ready":
-                return item
-        return None
+    def feature_graph(self, epic_order: str = EPIC_ORDER_PRIORITY) -> FeatureGraph:
+        graph = FeatureGraph(self.epics.get("items", []), self.features.get("items", []), epic_order)
+        self.stalled_features = graph.stalled()
+        self.duplicate_features = graph.duplicate_ids
+        return graph
+
+    def next_ready_feature(self, epic_order: str = EPIC_ORDER_PRIORITY) -> dict[str, Any] | None:
+        runnable = self.feature_graph(epic_order).runnable()
+        return runnable[0] if runnable else None
 
     def next_review_feature(self) -> dict[str, Any] | None:
-        items = self.features.get("items", [])
-        for item in items:
-            if item.get("status") == "review" and item.get("pr_url"):
+        for item in self.features_with_status("review"):
+            if item.get("pr_url"):
                 return item
         return None
 
+    def workable_features(self, epic_order: str = EPIC_ORDER_PRIORITY) -> list[dict[str, Any]]:
+        # Same priority as next_review_feature() or next_ready_feature(), but every match.
+        review = [item for item in self.features_with_status("review") if item.get("pr_url")]
+        return review + self.feature_graph(epic_order).runnable()
+
+    def features_with_status(self, status: str) -> list[dict[str, Any]]:
+        bucket = self._features_by_status.get(status, {})
+        return [bucket[pos] for pos in sorted(bucket)]
+
+    def get_feature(self, feature_id: str) -> dict[str, Any] | None:
+        positions = self._feature_pos_by_id.get(feature_id)
+        if not positions:
+            return None
+        return self.features["items"][positions[0]]
+
     def update_product_fields(self, **fields: Any) -> None:
         product = self.product.setdefault("product", {})
         for key, value in fields.items():
             if value is not None:
                 product[key] = value
+        self._dirty.add("product")
+
+    def clear_product_fields(self, *keys: str) -> None:
+        product = self.product.setdefault("product", {})
+        for key in keys:
+            product.pop(key, None)
+        self._dirty.add("product")
 
     def get_stories_for_feature(self, feature_id: str) -> list[dict[str, Any]]:
-        items = self.stories.get("items", [])
-        return [item for item in items if item.get("feature") == feature_id]
+        return list(self._stories_by_feature.get(feature_id, []))
+
+    def acceptance_for_stories(self, stories: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        entries: dict[int, dict[str, Any]] = {}
+        for story in stories:
+            for pos, item in self._acceptance_by_story.get(story.get("id"), []):
+                entries[pos] = item
+        return [entries[pos] for pos in sorted(entries)]
 
     def update_feature_status(self, feature_id: str, status: str) -> None:
         self.update_feature_fields(feature_id, status=status)
 
     def update_feature_fields(self, feature_id: str, **fields: Any) -> None:
         items = self.features.get("items", [])
-        for item in items:
-            if item.get("id") == feature_id:
-                for key, value in fields.items():
-                    if value is not None:
-                        item[key] = value
+        for pos in self._feature_pos_by_id.get(feature_id, []):
+            item = items[pos]
+            old_status = item.get("status")
+            for key, value in fields.items():
+                if value is not None:
+                    item[key] = value
+            if item.get("status") != old_status:
+                self._features_by_status.get(old_status, {}).pop(pos, None)
+                self._features_by_status.setdefault(item.get("status"), {})[pos] = item
+            self._dirty.add("features")
 
     def update_story_status(self, feature_id: str, status: str) -> None:
-        items = self.stories.get("items", [])
-        for item in items:
-            if item.get("feature") == feature_id:
-                item["status"] = status
+        for item in self._stories_by_feature.get(feature_id, []):
+            item["status"] = status
+            self._dirty.add("stories")
+
+    def _index_features(self, start: int = 0) -> None:
+        if start == 0:
+            self._feature_pos_by_id = {}
+            self._features_by_status = {}
+        items = self.features.get("items", [])
+        for pos in range(start, len(items)):
+            item = items[pos]
+            self._feature_pos_by_id.setdefault(item.get("id"), []).append(pos)
+            self._features_by_status.setdefault(item.get("status"), {})[pos] = item
+
+    def _index_stories(self, start: int = 0) -> None:
+        if start == 0:
+            self._stories_by_feature = {}
+        for item in self.stories.get("items", [])[start:]:
+            self._stories_by_feature.setdefault(item.get("feature"), []).append(item)
+
+    def _index_acceptance(self, start: int = 0) -> None:
+        # Criteria merged into an existing entry keep its position, so only new entries are indexed.
+        if start == 0:
+            self._acceptance_by_story = {}
+        items = self.acceptance.get("items", [])
+        for pos in range(start, len(items)):
+            item = items[pos]
+            self._acceptance_by_story.setdefault(item.get("story"), []).append((pos, item))
 
     def _read_yaml(self, rel_path: str, default_items: bool = False) -> dict[str, Any]:
         path = self.root / rel_path
@@ -127,17 +252,116 @@ class BacklogStore:
             if default_items:
                 return {"version": 1, "items": []}
             return {"version": 1}
-        data = yaml.safe_load(path.read_text()) or {}
+        text = path.read_text()
+        self._disk_digest[rel_path] = _digest(text)
+        data = _load_yaml(text, self.use_libyaml) or {}
         if default_items and "items" not in data:
             data["items"] = []
         if "version" not in data:
             data["version"] = 1
         return data
 
-    def _write_yaml(self, rel_path: str, data: dict[str, Any]) -> None:
+    def _write_yaml(self, rel_path: str, data: dict[str, Any]) -> bool:
+        text = _dump_yaml(data, self.use_libyaml)
+        digest = _digest(text)
         path = self.root / rel_path
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(yaml.safe_dump(data, sort_keys=False))
+        if self._disk_digest.get(rel_path) == digest and path.exists():
+            return False
+        atomic_write(path, text, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+        self._disk_digest[rel_path] = digest
+        return True
+
+    def _snapshot_path(self) -> Path:
+        return self.root / CACHE_DIR / SNAPSHOT_FILE
+
+    def _read_snapshot(self) -> bool:
+        # A file matches its snapshot entry when size and mtime are unchanged, or when
+        # only the mtime moved (e.g. a fresh checkout) but the content hash still matches.
+        path = self._snapshot_path()
+        try:
+            snapshot = pickle.loads(path.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return False
+        if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+            return False
+        files = snapshot.get("files", {})
+        for rel_path in BACKLOG_FILES.values():
+            entry = files.get(rel_path)
+            file_path = self.root / rel_path
+            if not file_path.exists():
+                if entry is not None:
+                    return False
+                continue
+            if entry is None:
+                return False
+            stat = file_path.stat()
+            if stat.st_size != entry["size"]:
+                return False
+            if stat.st_mtime_ns != entry["mtime_ns"] and _digest(file_path.read_text()) != entry["sha256"]:
+                return False
+        for section, data in snapshot["sections"].items():
+            setattr(self, section, data)
+        self._disk_digest = {rel_path: entry["sha256"] for rel_path, entry in files.items() if entry}
+        return True
+
+    def _write_snapshot(self) -> None:
+        files: dict[str, dict[str, Any] | None] = {}
+        for rel_path in BACKLOG_FILES.values():
+            file_path = self.root / rel_path
+            digest = self._disk_digest.get(rel_path)
+            if not file_path.exists() or digest is None:
+                files[rel_path] = None
+                continue
+            stat = file_path.stat()
+            files[rel_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "files": files,
+            "sections": {section: getattr(self, section) for section in BACKLOG_FILES},
+        }
+        atomic_write(self._snapshot_path(), pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _load_yaml(text: str, use_libyaml: bool) -> Any:
+    if use_libyaml and HAS_LIBYAML:
+        return yaml.load(text, Loader=CSafeLoader)
+    return yaml.safe_load(text)
+
+
+def _dump_yaml(data: Any, use_libyaml: bool) -> str:
+    # libyaml folds long double-quoted scalars differently from the pure-Python emitter;
+    # both agree whenever every string is printable ASCII and every key is a short non-empty
+    # string, so only then take the C path.
+    if use_libyaml and HAS_LIBYAML and _is_plain_ascii(data):
+        return yaml.dump(data, Dumper=CSafeDumper, sort_keys=False)
+    return yaml.safe_dump(data, sort_keys=False)
+
+
+# The emitters disagree on when a key needs the explicit "? key" form: an empty key, and
+# keys near their (differently measured) 128-character simple-key limit.
+_MAX_PLAIN_KEY = 100
+
+
+def _is_plain_ascii(data: Any) -> bool:
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, str):
+            if not (obj.isascii() and obj.isprintable()):
+                return False
+        elif isinstance(obj, dict):
+            for key in obj:
+                if not (isinstance(key, str) and 0 < len(key) <= _MAX_PLAIN_KEY):
+                    return False
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, list):
+            stack.extend(obj)
+    return True
 
 
 def extract_backlog_json(text: str) -> dict[str, Any] | None:
@@ -153,23 +377,11 @@ def extract_backlog_json(text: str) -> dict[str, Any] | None:
 
 
 def _extract_from_any_json(text: str) -> dict[str, Any] | None:
-    decoder = json.JSONDecoder()
-    required = {"product", "epics", "features", "stories", "acceptance"}
-    idx = 0
-    text_len = len(text)
-    while idx < text_len:
-        if text[idx] != "{":
-            idx += 1
-            continue
-        try:
-            obj, end = decoder.raw_decode(text[idx:])
-        except json.JSONDecodeError:
-            idx += 1
-            continue
-        if isinstance(obj, dict) and required.intersection(obj.keys()):
-            return obj
-        idx += max(end, 1)
-    return None
+    return find_json_object(text, is_backlog_payload)
+
+
+def is_backlog_payload(obj: dict[str, Any]) -> bool:
+    return bool(BACKLOG_KEYS.intersection(obj.keys()))
 
 
 def _merge_unique_list(existing: list[Any], incoming: list[Any]) -> list[Any]:
@@ -180,9 +392,14 @@ def _merge_unique_list(existing: list[Any], incoming: list[Any]) -> list[Any]:
     return merged
 
 
-def _merge_items(existing: list[dict[str, Any]], incoming: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def _merge_items(
+    existing: list[dict[str, Any]],
+    incoming: list[dict[str, Any]],
+    existing_ids: set[Any] | None = None,
+) -> list[dict[str, Any]]:
     merged = list(existing)
-    existing_ids = {item.get("id") for item in existing if item.get("id")}
+    if existing_ids is None:
+        existing_ids = {item.get("id") for item in existing if item.get("id")}
     for item in incoming or []:
         item_id = item.get("id")
         if not item_id or item_id in existing_ids:
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from pathlib import Path
+from typing import IO, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .utils import now_iso
+
+
+CASSETTE_VERSION = 1
+CASSETTE_MODES = ("record", "replay")
+# Everything the clients read from a response besides the body; auth never reaches the file.
+KEPT_HEADERS = (
+    "Content-Type",
+    "ETag",
+    "Last-Modified",
+    "Link",
+    "Retry-After",
+    "X-RateLimit-Limit",
+    "X-RateLimit-Remaining",
+    "X-RateLimit-Reset",
+)
+
+
+class CassetteMiss(RuntimeError):
+    pass
+
+
+class Cassette:
+    # One run's request/response pairs as JSON lines (gzip when the path ends in .gz). Replay
+    # serves each (method, url, body) key's responses in recorded order and repeats the last
+    # one once they run out, so a replayed poll loop sees the same sequence of states.
+    def __init__(self, path: Path, mode: str = "record", latency: float = 0.0) -> None:
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {', '.join(CASSETTE_MODES)}")
+        self.path = path
+        self.mode = mode
+        # Replay sleeps recorded elapsed time x latency; 0 answers immediately.
+        self.latency = latency
+        self.recorded = 0
+        self.replayed = 0
+        self._entries: dict[str, deque[dict[str, Any]]] = {}
+        self._handle: IO[str] | None = None
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self._load()
+
+    def record(self, request: requests.PreparedRequest, resp: requests.Response) -> None:
+        entry = {
+            "key": request_key(request),
+            "method": request.method,
+            "url": request.url,
+            "status": resp.status_code,
+            "reason": resp.reason,
+            "headers": {name: resp.headers[name] for name in KEPT_HEADERS if name in resp.headers},
+            "body": resp.content.decode("utf-8", errors="replace"),
+            "elapsed": round(resp.elapsed.total_seconds(), 4),
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = _open(self.path, "w")
+                self._handle.write(json.dumps({"version": CASSETTE_VERSION, "recorded": now_iso()}) + "\n")
+            self._handle.write(line)
+            self._handle.flush()
+            self.recorded += 1
+
+    def replay(self, request: requests.PreparedRequest) -> requests.Response:
+        key = request_key(request)
+        with self._lock:
+            queue = self._entries.get(key)
+            if not queue:
+                raise CassetteMiss(f"No recorded response for {request.method} {request.url} in {self.path}")
+            entry = queue.popleft() if len(queue) > 1 else queue[0]
+            self.replayed += 1
+        if self.latency:
+            time.sleep(entry.get("elapsed", 0) * self.latency)
+        resp = requests.Response()
+        resp.status_code = int(entry["status"])
+        resp.reason = entry.get("reason") or ""
+        resp.headers = CaseInsensitiveDict(entry.get("headers") or {})
+        resp._content = str(entry.get("body") or "").encode("utf-8")
+        resp.encoding = "utf-8"
+        resp.url = request.url or ""
+        resp.request = request
+        resp.elapsed = timedelta(seconds=entry.get("elapsed", 0))
+        return resp
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with _open(self.path, "r") as handle:
+            try:
+                for line in handle:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, dict) and entry.get("key"):
+                        self._entries.setdefault(entry["key"], deque()).append(entry)
+            except EOFError:
+                # A recording cut short by a crash leaves a truncated gzip stream; keep what was read.
+                pass
+
+
+class CassetteAdapter(HTTPAdapter):
+    def __init__(self, cassette: Cassette, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        if self.cassette.mode == "replay":
+            return self.cassette.replay(request)
+        resp = super().send(request, **kwargs)
+        self.cassette.record(request, resp)
+        return resp
+
+
+def request_key(request: requests.PreparedRequest) -> str:
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()[:16] if body else "-"
+    return f"{request.method} {request.url} {digest}"
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+_CASSETTE: Cassette | None = None
+
+
+def configure_cassette(path: str | Path | None, mode: str = "record", latency: float = 0.0) -> Cassette | None:
+    global _CASSETTE
+    close_cassette()
+    _CASSETTE = Cassette(Path(path), mode, latency) if path else None
+    return _CASSETTE
+
+
+def active_cassette() -> Cassette | None:
+    return _CASSETTE
+
+
+def replaying() -> bool:
+    return _CASSETTE is not None and _CASSETTE.mode == "replay"
+
+
+def close_cassette() -> None:
+    global _CASSETTE
+    if _CASSETTE is not None:
+        _CASSETTE.close()
+        _CASSETTE = None
@@ -13,7 +13,17 @@ class Config:
     source: str | None
     product_prompt: str | None
     poll_seconds: int
+    poll_strategy: str
+    poll_min_seconds: float
+    poll_max_seconds: float
+    poll_backoff: float
+    poll_jitter: float
     max_poll_minutes: int
+    events_port: int
+    events_host: str
+    events_dir: str | None
+    events_secret: str | None
+    events_fallback_seconds: float
     require_plan_approval: bool
     github_token: str | None
     github_repository: str | None
@@ -26,7 +36,27 @@ class Config:
     auto_merge: bool
     merge_method: str
     review_retry_max: int
+    reviewers: int
+    review_split: str
+    review_quorum: str
     backlog_retry_max: int
+    http_pool_connections: int
+    http_pool_maxsize: int
+    http_pool_block: bool
+    http_keep_alive: bool
+    backlog_cache: bool
+    github_cache: bool
+    github_graphql: bool
+    batch_commits: bool
+    git_backend: str
+    concurrency: int
+    epic_order: str
+    api_rpm: int
+    api_max_wait: float
+    metrics_prom: str | None
+    cassette: str | None
+    cassette_mode: str
+    cassette_latency: float
     dry_run: bool
 
     @classmethod
@@ -39,6 +69,7 @@ class Config:
             "true",
             "yes",
         )
+        review_split = (os.getenv("ORCH_REVIEW_SPLIT") or "redundant").lower()
         return cls(
             api_base=api_base,
             key_arch=os.getenv("JULES_KEY_ARCH"),
@@ -47,7 +78,17 @@ class Config:
             source=os.getenv("JULES_SOURCE"),
             product_prompt=os.getenv("PRODUCT_PROMPT") or None,
             poll_seconds=poll_seconds,
+            poll_strategy=(os.getenv("ORCH_POLL_STRATEGY") or "adaptive").lower(),
+            poll_min_seconds=float(os.getenv("ORCH_POLL_MIN_SECONDS", "3")),
+            poll_max_seconds=float(os.getenv("ORCH_POLL_MAX_SECONDS", "60")),
+            poll_backoff=float(os.getenv("ORCH_POLL_BACKOFF", "1.5")),
+            poll_jitter=float(os.getenv("ORCH_POLL_JITTER", "0.1")),
             max_poll_minutes=max_poll_minutes,
+            events_port=int(os.getenv("ORCH_EVENTS_PORT", "0")),
+            events_host=os.getenv("ORCH_EVENTS_HOST") or "127.0.0.1",
+            events_dir=os.getenv("ORCH_EVENTS_DIR") or None,
+            events_secret=os.getenv("ORCH_EVENTS_SECRET") or None,
+            events_fallback_seconds=float(os.getenv("ORCH_EVENTS_FALLBACK_SECONDS", "120")),
             require_plan_approval=require_plan_approval,
             github_token=os.getenv("GITHUB_TOKEN"),
             github_repository=os.getenv("GITHUB_REPOSITORY"),
@@ -60,7 +101,28 @@ class Config:
             auto_merge=(os.getenv("ORCH_AUTO_MERGE") or "false").lower() in ("1", "true", "yes"),
             merge_method=(os.getenv("ORCH_MERGE_METHOD") or "squash").lower(),
             review_retry_max=int(os.getenv("ORCH_REVIEW_RETRY_MAX", "1")),
+            reviewers=int(os.getenv("ORCH_REVIEWERS", "1")),
+            review_split=review_split,
+            # Slices of the criteria must all pass; redundant reviewers vote.
+            review_quorum=(os.getenv("ORCH_REVIEW_QUORUM") or ("all" if review_split == "acceptance" else "majority")).lower(),
             backlog_retry_max=int(os.getenv("ORCH_BACKLOG_RETRY_MAX", "1")),
+            http_pool_connections=int(os.getenv("ORCH_HTTP_POOL_CONNECTIONS", "4")),
+            http_pool_maxsize=int(os.getenv("ORCH_HTTP_POOL_MAXSIZE", "10")),
+            http_pool_block=(os.getenv("ORCH_HTTP_POOL_BLOCK") or "false").lower() in ("1", "true", "yes"),
+            http_keep_alive=(os.getenv("ORCH_HTTP_KEEP_ALIVE") or "true").lower() in ("1", "true", "yes"),
+            batch_commits=(os.getenv("ORCH_BATCH_COMMITS") or "true").lower() in ("1", "true", "yes"),
+            git_backend=(os.getenv("ORCH_GIT_BACKEND") or "subprocess").lower(),
+            backlog_cache=(os.getenv("ORCH_BACKLOG_CACHE") or "false").lower() in ("1", "true", "yes"),
+            github_cache=(os.getenv("ORCH_GITHUB_CACHE") or "false").lower() in ("1", "true", "yes"),
+            github_graphql=(os.getenv("ORCH_GITHUB_GRAPHQL") or "true").lower() in ("1", "true", "yes"),
+            concurrency=int(os.getenv("ORCH_CONCURRENCY", "1")),
+            epic_order=(os.getenv("ORCH_EPIC_ORDER") or "priority").lower(),
+            api_rpm=int(os.getenv("ORCH_API_RPM", "60")),
+            api_max_wait=float(os.getenv("ORCH_API_MAX_WAIT_SECONDS", "300")),
+            metrics_prom=os.getenv("ORCH_METRICS_PROM") or None,
+            cassette=os.getenv("ORCH_CASSETTE") or None,
+            cassette_mode=(os.getenv("ORCH_CASSETTE_MODE") or "record").lower(),
+            cassette_latency=float(os.getenv("ORCH_CASSETTE_LATENCY", "0")),
             dry_run=dry_run,
         )
 
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from .backlog import BacklogStore
+from .config import Config
+from .events import ShutdownRequested, request_shutdown, shutdown_requested, wait_for_shutdown
+from .github_client import save_cache
+from .intake import prompt_from_event
+from .run import (
+    commit_status,
+    flush_commits,
+    log,
+    run_cycle,
+    setup_runtime,
+    teardown_runtime,
+    write_run_report,
+    write_error,
+)
+from .transport import RateLimitWait
+from .utils import atomic_write
+
+
+QUEUE_DIR = ".orchestrator-queue"
+
+
+class WorkQueue:
+    # Intake events (GitHub event payloads, as read by intake.prompt_from_event), one JSON
+    # file each. A rename into processing/ claims an item; whatever is still there after a
+    # crash goes back to incoming/ on the next start.
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.incoming = root / "incoming"
+        self.processing = root / "processing"
+        self.done = root / "done"
+        self.failed = root / "failed"
+        for directory in (self.incoming, self.processing, self.done, self.failed):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def enqueue(self, payload: dict[str, Any]) -> Path:
+        path = self.incoming / f"{time.time_ns()}.json"
+        atomic_write(path, json.dumps(payload))
+        return path
+
+    def pending(self) -> int:
+        return sum(1 for _ in self.incoming.glob("*.json"))
+
+    def claim(self) -> Path | None:
+        for path in sorted(self.incoming.glob("*.json")):
+            target = self.processing / path.name
+            try:
+                os.replace(path, target)
+            except FileNotFoundError:
+                continue
+            return target
+        return None
+
+    def recover(self) -> int:
+        recovered = 0
+        for path in sorted(self.processing.glob("*.json")):
+            os.replace(path, self.incoming / path.name)
+            recovered += 1
+        return recovered
+
+    def requeue(self, path: Path) -> None:
+        os.replace(path, self.incoming / path.name)
+
+    def finish(self, path: Path, failed: bool = False) -> None:
+        os.replace(path, (self.failed if failed else self.done) / path.name)
+
+
+class Daemon:
+    def __init__(self, cfg: Config, root: Path, queue: WorkQueue, idle_seconds: float) -> None:
+        self.cfg = cfg
+        self.root = root
+        self.queue = queue
+        self.idle_seconds = idle_seconds
+        self.store = BacklogStore(root, use_cache=cfg.backlog_cache)
+        self.cycles = 0
+
+    def run(self) -> int:
+        recovered = self.queue.recover()
+        if recovered:
+            log(f"Daemon: requeued {recovered} interrupted intake item(s)")
+        self.store.load()
+        log(f"Daemon: watching {self.queue.incoming}")
+        while not shutdown_requested():
+            item = self.queue.claim()
+            if item is None and not self._has_work():
+                self._idle()
+                continue
+            before = self.store.revision()
+            self._cycle(item)
+            if item is None and self.store.revision() == before:
+                # Nothing moved (PR pending, merge blocked, ...); do not spin on it.
+                self._idle()
+        log(f"Daemon: stopped after {self.cycles} cycle(s)")
+        return 0
+
+    def _has_work(self) -> bool:
+        if self.store.product.get("product", {}).get("agent1_session"):
+            return True
+        return bool(self.store.workable_features(self.cfg.epic_order))
+
+    def _idle(self) -> None:
+        # Wake early for new intake; the shutdown event ends the wait immediately.
+        deadline = time.monotonic() + self.idle_seconds
+        while not shutdown_requested() and not self.queue.pending():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            wait_for_shutdown(min(remaining, 1.0))
+
+    def _cycle(self, item: Path | None) -> None:
+        cfg = self.cfg
+        agent1_mode = cfg.agent1_mode if cfg.agent1_mode in ("replace", "append") else "replace"
+        prompt = None
+        if item is not None:
+            try:
+                prompt, mode = prompt_from_event(str(item))
+            except ValueError as exc:
+                log(f"Daemon: unreadable intake {item.name}: {exc}")
+                self.queue.finish(item, failed=True)
+                return
+            if not prompt:
+                log(f"Daemon: no prompt in intake {item.name}; skipping")
+                self.queue.finish(item)
+                return
+            agent1_mode = mode or agent1_mode
+            log(f"Daemon: intake {item.name} ({agent1_mode})")
+        # Per-cycle copy: a prompt must drive exactly one Agent1 run.
+        cycle_cfg = dataclasses.replace(cfg, product_prompt=prompt)
+        run_deadline = time.time() + cfg.run_max_minutes * 60
+        self.cycles += 1
+        try:
+            run_cycle(cycle_cfg, self.store, self.root, run_deadline, agent1_mode)
+        except ShutdownRequested:
+            log("Daemon: shutdown requested; checkpointing")
+            if item is not None:
+                self.queue.requeue(item)
+            return
+        except RateLimitWait as exc:
+            log(f"Daemon: {exc}; checkpointing until the quota resets")
+            if item is not None:
+                self.queue.requeue(item)
+            self.store.load()
+            wait_for_shutdown(exc.wait)
+            return
+        except Exception as exc:
+            log(f"Daemon: cycle failed: {exc}")
+            write_error(self.root, exc)
+            commit_status(cfg, "status: record error")
+            if item is not None:
+                self.queue.finish(item, failed=True)
+            # In-memory state may be half-updated; start the next cycle from disk.
+            self.store.load()
+            wait_for_shutdown(self.idle_seconds)
+            return
+        finally:
+            self._checkpoint()
+        if item is not None:
+            self.queue.finish(item)
+
+    def _checkpoint(self) -> None:
+        # Backlog and status files are saved by each stage; push them and persist caches.
+        flush_commits()
+        save_cache()
+        write_run_report(self.cfg, self.root)
+
+
+def _install_signal_handlers() -> None:
+    # First SIGINT/SIGTERM: stop at the next poll wait and checkpoint. Second: exit now.
+    def handle(signum: int, frame: Any) -> None:
+        if shutdown_requested():
+            raise KeyboardInterrupt
+        log(f"Daemon: received signal {signum}; finishing current step")
+        request_shutdown()
+
+    signal.signal(signal.SIGINT, handle)
+    signal.signal(signal.SIGTERM, handle)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--queue", default=os.getenv("ORCH_DAEMON_QUEUE") or QUEUE_DIR)
+    parser.add_argument(
+        "--idle-seconds",
+        type=float,
+        default=float(os.getenv("ORCH_DAEMON_IDLE_SECONDS", "30")),
+        help="wait between cycles when there is no intake and nothing changed",
+    )
+    parser.add_argument("--enqueue", metavar="EVENT_JSON", help="add a GitHub event payload to the queue and exit")
+    args = parser.parse_args()
+
+    root = Path.cwd()
+    queue = WorkQueue(root / args.queue)
+    if args.enqueue:
+        path = queue.enqueue(json.loads(Path(args.enqueue).read_text()))
+        log(f"Queued {path}")
+        return 0
+
+    cfg = Config.from_env(dry_run=args.dry_run)
+    _install_signal_handlers()
+    setup_runtime(cfg, root)
+    try:
+        return Daemon(cfg, root, queue, args.idle_seconds).run()
+    finally:
+        teardown_runtime()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
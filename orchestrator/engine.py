@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from .backlog import BacklogStore
+from .config import Config
+from .events import ShutdownRequested, inbox, shutdown_requested, wait_for_event
+from .journal import (
+    STAGE_AGENT2_SESSION,
+    STAGE_FEATURE_STARTED,
+    STAGE_FIX_SESSION,
+    stage_journal,
+)
+from .jules_client import JulesClient
+from .metrics import current_stage, metrics, stage
+from .polling import PollSchedule, make_schedule
+from .review import aggregate_reviews
+from .run import (
+    _out_of_time,
+    commit_backlog,
+    commit_status,
+    fallback_pr_url,
+    flush_commits,
+    get_session_state,
+    handle_passed_review,
+    log,
+    normalize_verdict,
+    panel_decided,
+    pending_review,
+    pending_review_sessions,
+    pr_head_ref,
+    probe_pr_url,
+    progress_marker,
+    probe_panel_review,
+    probe_review,
+    probe_session_completion,
+    record_fix_state,
+    record_review_verdict,
+    start_agent2,
+    start_agent2_fix,
+    start_review_panel,
+    write_error,
+    write_status,
+)
+from .transport import RateLimitWait
+
+
+T = TypeVar("T")
+
+
+class Engine:
+    def __init__(self, cfg: Config, store: BacklogStore, root: Path, run_deadline: float) -> None:
+        self.cfg = cfg
+        self.store = store
+        self.root = root
+        self.run_deadline = run_deadline
+        self.slots = asyncio.Semaphore(max(cfg.concurrency, 1))
+        # BacklogStore and git are not concurrency-safe; every checkpoint goes through this lock.
+        self.store_lock = asyncio.Lock()
+        # Inbox waits park a thread for minutes; their own pool keeps them from starving the calls.
+        lanes = max(cfg.concurrency, 1) * max(cfg.reviewers, 1)
+        self._calls = ThreadPoolExecutor(max_workers=lanes + 1, thread_name_prefix="engine-call")
+        self._waits = ThreadPoolExecutor(max_workers=lanes, thread_name_prefix="engine-wait")
+
+    async def call(self, fn: Callable[..., T], *args: Any) -> T:
+        return await self._in(self._calls, fn, *args)
+
+    async def _in(self, pool: ThreadPoolExecutor, fn: Callable[..., T], *args: Any) -> T:
+        # Carries the metrics stage into the thread, as asyncio.to_thread does.
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(pool, functools.partial(context.run, fn, *args))
+
+    def _stage_deadline(self) -> float:
+        return min(time.time() + self.cfg.max_poll_minutes * 60, self.run_deadline - 60)
+
+    async def _sleep(
+        self,
+        schedule: PollSchedule,
+        client: JulesClient,
+        session_name: str,
+        deadline: float,
+    ) -> None:
+        delay = schedule.next_delay(progress_marker(client, session_name))
+        metrics().incr("poll_iterations", stage=current_stage())
+        if inbox() is None:
+            await asyncio.sleep(max(min(delay, deadline - time.time()), 0))
+            if shutdown_requested():
+                raise ShutdownRequested()
+        else:
+            await self._in(self._waits, wait_for_event, session_name, delay, deadline)
+
+    def _dev_client(self) -> JulesClient:
+        return JulesClient(self.cfg.require(self.cfg.key_dev, "JULES_KEY_DEV"), self.cfg.api_base)
+
+    async def checkpoint(self, feature_id: str, notes: str, message: str, **fields: Any) -> None:
+        async with self.store_lock:
+            self.store.update_feature_fields(feature_id, **fields)
+            await self.call(self._persist, feature_id, notes, message)
+
+    async def flush(self) -> None:
+        async with self.store_lock:
+            await self.call(flush_commits)
+
+    def _persist(self, feature_id: str, notes: str, message: str) -> None:
+        self.store.save_all()
+        write_status(self.root, self.store, feature_id, notes=notes)
+        commit_backlog(self.cfg, message)
+
+    async def wait_for_pr_url(self, client: JulesClient, session_name: str, feature_id: str) -> str | None:
+        with stage("agent2"):
+            await self.flush()
+            deadline = self._stage_deadline()
+            schedule = make_schedule(self.cfg)
+            branch: str | None = None
+            while time.time() < deadline:
+                pr_url, branch, done = await self.call(probe_pr_url, client, session_name, branch)
+                if pr_url:
+                    return pr_url
+                if done:
+                    break
+                await self._sleep(schedule, client, session_name, deadline)
+            return await self.call(fallback_pr_url, self.cfg, session_name, feature_id, branch)
+
+    async def wait_for_review(self, client: JulesClient, session_name: str) -> dict[str, Any]:
+        await self.flush()
+        deadline = self._stage_deadline()
+        schedule = make_schedule(self.cfg)
+        while time.time() < deadline:
+            payload, done = await self.call(probe_review, client, session_name)
+            if payload:
+                return payload
+            if done:
+                break
+            await self._sleep(schedule, client, session_name, deadline)
+        return pending_review()
+
+    async def wait_for_reviewer(self, client: JulesClient, session_name: str) -> dict[str, Any]:
+        await self.flush()
+        deadline = self._stage_deadline()
+        schedule = make_schedule(self.cfg)
+        while time.time() < deadline:
+            review = await self.call(probe_panel_review, client, session_name)
+            if review:
+                return review
+            await self._sleep(schedule, client, session_name, deadline)
+        return pending_review()
+
+    async def wait_for_panel(self, client: JulesClient, sessions: list[str]) -> dict[str, Any]:
+        if len(sessions) == 1:
+            return await self.wait_for_review(client, sessions[0])
+        tasks = {asyncio.create_task(self.wait_for_reviewer(client, name)): name for name in sessions}
+        reviews: dict[str, dict[str, Any]] = {}
+        try:
+            running = set(tasks)
+            while running:
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    reviews[tasks[task]] = task.result()
+                decided = aggregate_reviews(list(reviews.values()), len(sessions), self.cfg.review_quorum)
+                if decided:
+                    return panel_decided(decided, sessions, reviews)
+            return pending_review()
+        finally:
+            current = inbox()
+            for task, name in tasks.items():
+                task.cancel()
+                # A cancelled reviewer's worker thread may be parked in the inbox wait; release it.
+                if current is not None and name not in reviews:
+                    current.wake(name)
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def wait_for_completion(self, client: JulesClient, session_name: str) -> str:
+        with stage("fix"):
+            await self.flush()
+            deadline = self._stage_deadline()
+            schedule = make_schedule(self.cfg)
+            while time.time() < deadline:
+                state = await self.call(probe_session_completion, client, session_name)
+                if state:
+                    return state
+                await self._sleep(schedule, client, session_name, deadline)
+            return "PENDING"
+
+    async def review(
+        self,
+        pr_url: str,
+        feature: dict[str, Any],
+        stories: list[dict[str, Any]],
+        acceptance: list[dict[str, Any]],
+        branch: str | None,
+        resume_sessions: list[str] | None = None,
+    ) -> tuple[dict[str, Any], str]:
+        with stage("agent3"):
+            retries = max(self.cfg.review_retry_max, 0)
+            while True:
+                if resume_sessions:
+                    log(f"Resuming Agent3 session(s): {', '.join(resume_sessions)}")
+                    client = JulesClient(self.cfg.require(self.cfg.key_review, "JULES_KEY_REVIEW"), self.cfg.api_base)
+                    sessions, resume_sessions = resume_sessions, None
+                else:
+                    client, sessions = await self.call(
+                        start_review_panel,
+                        self.cfg,
+                        pr_url,
+                        feature,
+                        stories,
+                        acceptance,
+                        branch,
+                    )
+                review = await self.wait_for_panel(client, sessions)
+                record_review_verdict(feature.get("id"), sessions, review)
+                verdict = normalize_verdict(str(review.get("verdict", "")))
+                if verdict != "PENDING" or retries <= 0 or _out_of_time(self.run_deadline):
+                    return review, verdict
+                log(f"Review pending for {feature.get('id')}; retrying Agent3")
+                retries -= 1
+
+    async def merge(self, feature_id: str, pr_url: str) -> None:
+        async with self.store_lock:
+            await self.call(handle_passed_review, self.cfg, self.store, self.root, feature_id, pr_url)
+
+    async def run_feature(self, feature: dict[str, Any]) -> str:
+        async with self.slots:
+            if _out_of_time(self.run_deadline):
+                return "skipped"
+            try:
+                return await self._pipeline(feature)
+            except RateLimitWait as exc:
+                # Like running out of time: the feature resumes from its recorded state next run.
+                log(f"Feature {feature.get('id')} stopped: {exc}")
+                return "skipped"
+            except Exception as exc:
+                log(f"Feature {feature.get('id')} failed: {exc}")
+                async with self.store_lock:
+                    write_error(self.root, exc)
+                return "error"
+
+    async def _pipeline(self, feature: dict[str, Any]) -> str:
+        cfg = self.cfg
+        feature_id = str(feature.get("id"))
+        pr_url = feature.get("pr_url")
+        agent2_session = feature.get("agent2_session")
+        agent2_fix_session = feature.get("agent2_fix_session")
+        verdict = normalize_verdict(str(feature.get("review_verdict", "")))
+        journal = stage_journal()
+        pending_fix = journal.pending(feature_id, STAGE_FIX_SESSION, "session")
+        review_sessions = pending_review_sessions(feature_id)
+        agent2_session = agent2_session or journal.pending(feature_id, STAGE_AGENT2_SESSION, "session")
+        log(f"Processing feature {feature_id}")
+        if feature.get("status") == "review" and verdict == "PASS" and pr_url:
+            await self.merge(feature_id, pr_url)
+            return "passed"
+        if feature.get("status") == "review" and (pending_fix or (verdict == "NEEDS_CHANGES" and agent2_fix_session)):
+            agent2_fix_session = pending_fix or agent2_fix_session
+            fix_state = await self.wait_for_completion(self._dev_client(), agent2_fix_session)
+            record_fix_state(feature_id, agent2_fix_session, fix_state)
+            if fix_state != "COMPLETED":
+                await self.checkpoint(
+                    feature_id,
+                    "Agent2 fix pending",
+                    f"backlog: fix pending {feature_id}",
+                    status="review",
+                    agent2_fix_session=agent2_fix_session,
+                    agent2_fix_state=fix_state,
+                )
+                return "fix_pending"
+        if feature.get("status") != "review":
+            if feature.get("status") != "in_progress":
+                journal.record(feature_id, STAGE_FEATURE_STARTED)
+            await self.checkpoint(feature_id, "Feature in progress", f"backlog: start feature {feature_id}", status="in_progress")
+
+        stories = self.store.get_stories_for_feature(feature_id)
+        acceptance = self.store.acceptance_for_stories(stories)
+
+        if not pr_url and agent2_session:
+            pr_url = await self.wait_for_pr_url(self._dev_client(), agent2_session, feature_id)
+        if not pr_url:
+            client, agent2_session = await self.call(start_agent2, cfg, feature, stories, acceptance)
+            await self.checkpoint(
+                feature_id,
+                "Agent2 session started",
+                f"backlog: agent2 session {feature_id}",
+                agent2_session=agent2_session,
+            )
+            pr_url = await self.wait_for_pr_url(client, agent2_session, feature_id)
+        if not pr_url:
+            log(f"PR not ready for {feature_id}; leaving feature in progress.")
+            agent2_state = None
+            if agent2_session:
+                agent2_state = await self.call(get_session_state, cfg, agent2_session)
+            await self.checkpoint(
+                feature_id,
+                "PR pending",
+                f"backlog: pr pending {feature_id}",
+                status="in_progress",
+                agent2_session=agent2_session,
+                agent2_state=agent2_state,
+            )
+            return "pr_pending"
+
+        log(f"PR created: {pr_url}")
+        await self.checkpoint(feature_id, "Feature in review", f"backlog: review feature {feature_id}", status="review", pr_url=pr_url)
+
+        branch = await self.call(pr_head_ref, cfg, feature_id, pr_url)
+        review, verdict = await self.review(pr_url, feature, stories, acceptance, branch, review_sessions)
+
+        if verdict == "PENDING":
+            await self.checkpoint(
+                feature_id,
+                "Review pending (no verdict)",
+                f"backlog: review pending {feature_id}",
+                status="review",
+                pr_url=pr_url,
+                review_verdict="PENDING",
+            )
+            return "review_pending"
+
+        if verdict == "NEEDS_CHANGES":
+            log(f"Reviewer requested changes for {feature_id}")
+            client, fix_session = await self.call(start_agent2_fix, cfg, pr_url, review, branch, feature_id)
+            fix_state = await self.wait_for_completion(client, fix_session)
+            record_fix_state(feature_id, fix_session, fix_state)
+            await self.checkpoint(
+                feature_id,
+                "Agent2 fix pending" if fix_state != "COMPLETED" else "Agent2 fix completed",
+                f"backlog: fix session {feature_id}",
+                status="review",
+                agent2_fix_session=fix_session,
+                agent2_fix_state=fix_state,
+            )
+            if fix_state != "COMPLETED":
+                return "fix_pending"
+            review, verdict = await self.review(pr_url, feature, stories, acceptance, branch)
+
+        if verdict != "PASS":
+            await self.checkpoint(
+                feature_id,
+                f"Review verdict: {verdict}",
+                f"backlog: review verdict {feature_id}",
+                status="review",
+                pr_url=pr_url,
+                review_verdict=verdict,
+            )
+            return "review_failed"
+        await self.merge(feature_id, pr_url)
+        return "passed"
+
+    async def run(self, features: list[dict[str, Any]]) -> dict[str, str]:
+        try:
+            outcomes = await asyncio.gather(*(self.run_feature(feature) for feature in features))
+        finally:
+            self._calls.shutdown(wait=False, cancel_futures=True)
+            self._waits.shutdown(wait=False, cancel_futures=True)
+        return {str(feature.get("id")): outcome for feature, outcome in zip(features, outcomes)}
+
+
+def run_features(cfg: Config, store: BacklogStore, root: Path, run_deadline: float) -> int:
+    features = store.workable_features(cfg.epic_order)
+    if not features:
+        log("No ready features found")
+        write_status(root, store, None, notes="No ready features")
+        commit_status(cfg, "status: no ready features")
+        return 0
+    log(f"Engine: {len(features)} feature(s), concurrency {cfg.concurrency}")
+    outcomes = asyncio.run(Engine(cfg, store, root, run_deadline).run(features))
+    for feature_id, outcome in outcomes.items():
+        log(f"Feature {feature_id}: {outcome}")
+    if "error" in outcomes.values():
+        commit_status(cfg, "status: record error")
+        return 1
+    return 0
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import hmac
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from .config import Config
+
+
+# Event-driven wake-ups for the poll loops. Notifications (from the HTTP receiver or a
+# directory inbox) only wake the stage waiting on that session; the stage then does its
+# usual probe, so an event never has to carry more than the session name.
+
+
+class ShutdownRequested(BaseException):
+    # A BaseException, like KeyboardInterrupt, so stage-level `except Exception` handlers let it through.
+    pass
+
+
+_SHUTDOWN = threading.Event()
+
+
+def session_key(session: str) -> str:
+    # "sessions/123", ".../sessions/123" and "123" all name the same session.
+    return str(session).rstrip("/").rsplit("/", 1)[-1]
+
+
+class EventInbox:
+    def __init__(self, fallback_seconds: float = 120.0) -> None:
+        self.fallback_seconds = fallback_seconds
+        self.received = 0
+        self.last_event: dict[str, dict[str, Any]] = {}
+        self._counts: dict[str, int] = {}
+        self._seen: dict[str, int] = {}
+        self._cond = threading.Condition()
+
+    def notify(self, session: str, event: dict[str, Any] | None = None) -> None:
+        key = session_key(session)
+        with self._cond:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self.last_event[key] = event or {}
+            self.received += 1
+            self._cond.notify_all()
+
+    def wake(self, session: str) -> None:
+        # Ends a wait on the session without an event, e.g. for a reviewer nobody waits for any more.
+        key = session_key(session)
+        with self._cond:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._cond.notify_all()
+
+    def wake_all(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait(self, session: str | list[str], timeout: float) -> bool:
+        # True when an event for the session (any of them, for a list) arrived since the
+        # previous wait (even one that arrived while the caller was probing), False on timeout.
+        keys = [session_key(name) for name in ([session] if isinstance(session, str) else session)]
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while all(self._counts.get(key, 0) == self._seen.get(key, 0) for key in keys):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or _SHUTDOWN.is_set():
+                    return False
+                self._cond.wait(remaining)
+            for key in keys:
+                self._seen[key] = self._counts.get(key, 0)
+            return True
+
+
+def event_session(event: Any) -> str | None:
+    if not isinstance(event, dict):
+        return None
+    session = event.get("session") or event.get("sessionName") or event.get("sessionId") or event.get("name")
+    if isinstance(session, dict):
+        session = session.get("name") or session.get("id")
+    return str(session) if session else None
+
+
+class _EventHandler(BaseHTTPRequestHandler):
+    server: "EventServer"
+
+    def do_POST(self) -> None:
+        if self.path.split("?", 1)[0].rstrip("/") not in ("", "/events"):
+            self._reply(404, "not found")
+            return
+        secret = self.server.secret
+        if secret and not hmac.compare_digest(self.headers.get("X-Orchestrator-Token", ""), secret):
+            self._reply(403, "forbidden")
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            event = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._reply(400, "invalid json")
+            return
+        session = event_session(event)
+        if not session:
+            self._reply(400, "missing session")
+            return
+        self.server.inbox.notify(session, event)
+        self._reply(202, "accepted")
+
+    def _reply(self, status: int, message: str) -> None:
+        body = json.dumps({"status": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class EventServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, inbox: EventInbox, secret: str | None = None) -> None:
+        super().__init__((host, port), _EventHandler)
+        self.inbox = inbox
+        self.secret = secret
+
+
+class InboxDirWatcher:
+    # Producers drop one JSON event per file (write to a temp name, then rename to *.json);
+    # each file is delivered once and removed. Unparseable files are renamed to *.bad.
+    def __init__(self, directory: Path, inbox: EventInbox, interval: float = 0.25) -> None:
+        self.directory = directory
+        self.inbox = inbox
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="event-inbox", daemon=True)
+
+    def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def drain(self) -> int:
+        delivered = 0
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                event = json.loads(path.read_text())
+            except OSError:
+                continue
+            except ValueError:
+                path.replace(path.with_suffix(".bad"))
+                continue
+            session = event_session(event)
+            path.unlink(missing_ok=True)
+            if session:
+                self.inbox.notify(session, event)
+                delivered += 1
+        return delivered
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.drain()
+
+
+_INBOX: EventInbox | None = None
+_SERVER: EventServer | None = None
+_WATCHER: InboxDirWatcher | None = None
+
+
+def start_inbox(cfg: Config) -> EventInbox | None:
+    # Starts the receiver and/or directory watcher configured in cfg; None when both are off.
+    global _INBOX, _SERVER, _WATCHER
+    stop_inbox()
+    if not cfg.events_port and not cfg.events_dir:
+        return None
+    _INBOX = EventInbox(cfg.events_fallback_seconds)
+    if cfg.events_port:
+        _SERVER = EventServer(cfg.events_host, cfg.events_port, _INBOX, cfg.events_secret)
+        threading.Thread(target=_SERVER.serve_forever, name="event-server", daemon=True).start()
+    if cfg.events_dir:
+        _WATCHER = InboxDirWatcher(Path(cfg.events_dir), _INBOX)
+        _WATCHER.start()
+    return _INBOX
+
+
+def stop_inbox() -> None:
+    global _INBOX, _SERVER, _WATCHER
+    if _SERVER is not None:
+        _SERVER.shutdown()
+        _SERVER.server_close()
+        _SERVER = None
+    if _WATCHER is not None:
+        _WATCHER.stop()
+        _WATCHER = None
+    _INBOX = None
+
+
+def inbox() -> EventInbox | None:
+    return _INBOX
+
+
+def wait_for_event(session_name: str | list[str], delay: float, deadline: float) -> bool:
+    # Without an inbox this is the plain poll sleep. With one, polling is only the fallback:
+    # the wait stretches to at least fallback_seconds and ends early on an event.
+    # Either way a shutdown request interrupts it with ShutdownRequested.
+    remaining = max(deadline - time.time(), 0)
+    current = _INBOX
+    if current is None:
+        woke = False
+        _SHUTDOWN.wait(min(delay, remaining))
+    else:
+        woke = current.wait(session_name, min(max(delay, current.fallback_seconds), remaining))
+    if _SHUTDOWN.is_set():
+        raise ShutdownRequested()
+    return woke
+
+
+def request_shutdown() -> None:
+    _SHUTDOWN.set()
+    current = _INBOX
+    if current is not None:
+        current.wake_all()
+
+
+def shutdown_requested() -> bool:
+    return _SHUTDOWN.is_set()
+
+
+def wait_for_shutdown(timeout: float) -> bool:
+    return _SHUTDOWN.wait(timeout)
@@ -1,9 +1,33 @@
 from __future__ import annotations
 
+import os
+import stat
 import subprocess
+import time
+from pathlib import Path
 from typing import Iterable
 
 
+GIT_BACKENDS = ("subprocess", "plumbing")
+_backend = "subprocess"
+_push_enabled = True
+_committer_ident: str | None = None
+_repo_dirs_cache: dict[str, tuple[Path, Path]] = {}
+
+
+def set_backend(name: str) -> None:
+    global _backend
+    if name not in GIT_BACKENDS:
+        raise ValueError(f"Unknown git backend: {name}")
+    _backend = name
+
+
+def set_push(enabled: bool) -> None:
+    # Off for cassette replay: commits stay local and nothing reaches origin.
+    global _push_enabled
+    _push_enabled = enabled
+
+
 def run_git(args: list[str], check: bool = True) -> subprocess.CompletedProcess[str]:
     return subprocess.run(["git", *args], check=check, capture_output=True, text=True)
 
@@ -30,7 +54,7 @@ def ensure_pushable() -> bool:
 
 
 def push_with_retry() -> None:
-    if not ensure_pushable():
+    if not _push_enabled or not ensure_pushable():
         return
     branch = _read_stdout(["rev-parse", "--abbrev-ref", "HEAD"]) or "main"
     if branch == "HEAD":
@@ -46,6 +70,12 @@ def push_with_retry() -> None:
 
 
 def commit_paths(message: str, paths: Iterable[str], push: bool = True) -> bool:
+    if _backend == "plumbing":
+        return _plumbing_commit(message, list(paths), push)
+    return _porcelain_commit(message, paths, push)
+
+
+def _porcelain_commit(message: str, paths: Iterable[str], push: bool) -> bool:
     for path in paths:
         run_git(["add", path])
     if not has_staged_changes():
@@ -57,9 +87,141 @@ def commit_paths(message: str, paths: Iterable[str], push: bool = True) -> bool:
 
 
 def commit_all(message: str) -> bool:
+    if _backend == "plumbing":
+        return _plumbing_commit(message, ["."], push=True)
     run_git(["add", "-A"])
     if not is_dirty():
         return False
     run_git(["commit", "-m", message])
     push_with_retry()
     return True
+
+
+# Plumbing backend: one `git status`, one `git fast-import` that writes the blobs, tree,
+# commit and branch ref from a stream, and one `git update-index --stdin` to resync the
+# index - instead of an add per path, diff, commit and the fetch/status/rev-parse before
+# every push. Content is committed as-is (no clean/smudge filters or autocrlf).
+def _plumbing_commit(message: str, paths: list[str], push: bool) -> bool:
+    top, git_dir = _repo_dirs()
+    head = (git_dir / "HEAD").read_text().strip()
+    if not head.startswith("ref: refs/heads/"):
+        # Detached HEAD: let porcelain git deal with it.
+        return _porcelain_commit(message, paths, push)
+    branch = head[len("ref: refs/heads/") :]
+    changed = _changed_files(paths)
+    if not changed:
+        return False
+    _fast_import_commit(top, branch, message, changed)
+    subprocess.run(
+        ["git", "update-index", "--add", "--remove", "-z", "--stdin"],
+        input=b"".join(path.encode() + b"\0" for path in changed),
+        cwd=top,
+        check=True,
+        capture_output=True,
+    )
+    if push:
+        _push_optimistic(branch)
+    return True
+
+
+def _repo_dirs() -> tuple[Path, Path]:
+    cwd = os.getcwd()
+    if cwd not in _repo_dirs_cache:
+        top, git_dir = _read_stdout(["rev-parse", "--show-toplevel", "--absolute-git-dir"]).splitlines()
+        _repo_dirs_cache[cwd] = (Path(top), Path(git_dir))
+    return _repo_dirs_cache[cwd]
+
+
+def _changed_files(paths: list[str]) -> list[str]:
+    # Paths come back relative to the repository root.
+    out = subprocess.run(
+        ["git", "status", "--porcelain=v1", "-z", "--no-renames", "--untracked-files=all", "--", *paths],
+        check=True,
+        capture_output=True,
+    ).stdout
+    return [entry[3:].decode() for entry in out.split(b"\0") if len(entry) > 3]
+
+
+def _ident() -> str:
+    # "Name <email>" from git's own resolution of user.name/user.email, looked up once per process.
+    global _committer_ident
+    if _committer_ident is None:
+        raw = _read_stdout(["var", "GIT_COMMITTER_IDENT"])
+        _committer_ident = raw.rsplit(" ", 2)[0]
+    return _committer_ident
+
+
+def _fast_import_commit(top: Path, branch: str, message: str, changed: list[str]) -> None:
+    ident = f"{_ident()} {int(time.time())} {time.strftime('%z')}"
+    msg = message.encode()
+    chunks = [
+        f"commit refs/heads/{branch}\n".encode(),
+        f"author {ident}\ncommitter {ident}\n".encode(),
+        f"data {len(msg)}\n".encode(),
+        msg,
+        f"\nfrom refs/heads/{branch}^0\n".encode(),
+    ]
+    for path in changed:
+        quoted = _quote_path(path)
+        full = top / path
+        if not os.path.lexists(full):
+            chunks.append(b"D " + quoted + b"\n")
+            continue
+        info = os.lstat(full)
+        if stat.S_ISLNK(info.st_mode):
+            mode, data = "120000", os.readlink(full).encode()
+        else:
+            mode = "100755" if info.st_mode & stat.S_IXUSR else "100644"
+            data = full.read_bytes()
+        chunks.append(f"M {mode} inline ".encode() + quoted + f"\ndata {len(data)}\n".encode())
+        chunks.append(data)
+        chunks.append(b"\n")
+    chunks.append(b"\n")
+    subprocess.run(
+        ["git", "fast-import", "--quiet", "--done"],
+        input=b"".join(chunks) + b"done\n",
+        cwd=top,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _quote_path(path: str) -> bytes:
+    if any(ch in path for ch in ('"', "\\", "\n")) or path.startswith(" "):
+        escaped = path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return f'"{escaped}"'.encode()
+    return path.encode()
+
+
+def _push_optimistic(branch: str) -> None:
+    # Push first and only fetch/rebase when the remote rejects us.
+    if not _push_enabled:
+        return
+    for _ in range(2):
+        if run_git(["push"], check=False).returncode == 0:
+            return
+        run_git(["fetch", "origin"], check=False)
+        run_git(["rebase", f"origin/{branch}"], check=False)
+
+
+class CommitJournal:
+    # Collects backlog/status commits during a run so they land as one commit + push.
+    def __init__(self) -> None:
+        self.messages: list[str] = []
+        self.paths: list[str] = []
+
+    def record(self, message: str, paths: Iterable[str]) -> None:
+        self.messages.append(message)
+        for path in paths:
+            if path not in self.paths:
+                self.paths.append(path)
+
+    def flush(self, push: bool = True) -> bool:
+        if not self.messages:
+            return False
+        messages, paths = self.messages, self.paths
+        self.messages, self.paths = [], []
+        message = messages[-1]
+        if len(messages) > 1:
+            message = message + "\n\n" + "\n".join(f"- {entry}" for entry in messages)
+        return commit_paths(message, paths, push=push)
@@ -1,9 +1,140 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import re
+from collections import OrderedDict
+from pathlib import Path
 from typing import Any
 
-import requests
+from .metrics import metrics
+from .transport import governed_request, shared_session
+from .utils import atomic_write
+
+
+CACHE_FILE = "github-etags.json"
+CACHE_VERSION = 1
+
+
+class CachedResponse:
+    # Stands in for a 304 so callers keep reading status_code/text/json() as before.
+    def __init__(self, status_code: int, text: str) -> None:
+        self.status_code = status_code
+        self.text = text
+
+    def json(self) -> Any:
+        return json.loads(self.text) if self.text else None
+
+
+class ResponseCache:
+    # ETag/Last-Modified validators per (token, URL). GitHub answers a matching
+    # conditional request with 304, which does not count against the rate limit.
+    def __init__(self, path: Path | None = None, max_entries: int = 512) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if path is not None:
+            self._load()
+
+    def get(self, url: str, headers: dict[str, str]) -> Any:
+        key = _cache_key(url, headers)
+        entry = self.entries.get(key)
+        request_headers = dict(headers)
+        if entry is not None:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+        resp = _send("GET", url, request_headers)
+        if resp.status_code == 304 and entry is not None:
+            self.hits += 1
+            metrics().incr("github_cache_hits")
+            self.entries.move_to_end(key)
+            return CachedResponse(entry["status"], entry["body"])
+        self.misses += 1
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if resp.status_code < 300 and (etag or last_modified):
+            self.entries[key] = {
+                "status": resp.status_code,
+                "body": resp.text,
+                "etag": etag,
+                "last_modified": last_modified,
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._dirty = True
+        elif entry is not None:
+            del self.entries[key]
+            self._dirty = True
+        return resp
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        atomic_write(self.path, json.dumps({"version": CACHE_VERSION, "entries": list(self.entries.items())}))
+        self._dirty = False
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return
+        for key, entry in data.get("entries", [])[-self.max_entries :]:
+            self.entries[key] = entry
+
+
+_CACHE = ResponseCache()
+_BRANCHES: dict[str, list[str]] = {}
+
+
+def configure_cache(path: Path | None = None, max_entries: int = 512) -> ResponseCache:
+    # Called once per run; the branch lists are per run too.
+    global _CACHE
+    _CACHE = ResponseCache(path, max_entries)
+    _BRANCHES.clear()
+    return _CACHE
+
+
+def response_cache() -> ResponseCache:
+    return _CACHE
+
+
+def save_cache() -> None:
+    _CACHE.save()
+
+
+def _cache_key(url: str, headers: dict[str, str]) -> str:
+    # Validators are per credential; only a hash of the token is kept (and written to disk).
+    token_hash = hashlib.sha256(headers.get("Authorization", "").encode("utf-8")).hexdigest()[:16]
+    return f"{token_hash} {url}"
+
+
+def _send(method: str, url: str, headers: dict[str, str], **kwargs: Any) -> Any:
+    # Every GitHub call shares one rate budget per token (see transport.RateGovernor).
+    return governed_request(
+        shared_session(),
+        method,
+        url,
+        headers.get("Authorization", ""),
+        service="github",
+        headers=headers,
+        timeout=30,
+        **kwargs,
+    )
+
+
+def _headers(token: str) -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github+json",
+    }
 
 
 def parse_pr_url(pr_url: str) -> tuple[str, str, int]:
@@ -23,15 +154,12 @@ def parse_repo(repo_full: str) -> tuple[str, str]:
 
 def list_branches(repo_full: str, token: str, api_base: str, per_page: int = 100, max_pages: int = 10) -> list[str]:
     owner, repo = parse_repo(repo_full)
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
+    headers = _headers(token)
     branches: list[str] = []
     page = 1
     while page <= max_pages:
         url = f"{api_base.rstrip('/')}/repos/{owner}/{repo}/branches?per_page={per_page}&page={page}"
-        resp = requests.get(url, headers=headers, timeout=30)
+        resp = _CACHE.get(url, headers)
         if resp.status_code >= 400:
             raise RuntimeError(f"GitHub API error {resp.status_code}: {resp.text}")
         data = resp.json() or []
@@ -47,10 +175,43 @@ def list_branches(repo_full: str, token: str, api_base: str, per_page: int = 100
     return branches
 
 
+def matching_branches(repo_full: str, prefix: str, token: str, api_base: str, refresh: bool = False) -> list[str]:
+    # Every branch under refs/heads/<prefix> in one request (no paging), cached for the run.
+    url = _matching_refs_url(repo_full, prefix, api_base)
+    if refresh or url not in _BRANCHES:
+        resp = _CACHE.get(url, _headers(token))
+        if resp.status_code >= 400:
+            raise RuntimeError(f"GitHub API error {resp.status_code}: {resp.text}")
+        names: list[str] = []
+        for item in resp.json() or []:
+            ref = str(item.get("ref") or "")
+            if ref.startswith("refs/heads/"):
+                names.append(ref[len("refs/heads/") :])
+        _BRANCHES[url] = names
+    return _BRANCHES[url]
+
+
 def find_branch_by_session_id(repo_full: str, session_id: str, token: str, api_base: str) -> str | None:
     if not session_id:
         return None
-    branches = list_branches(repo_full, token, api_base)
+    # Agent2 pushes feature/ branches; other branches are only listed when none match.
+    for prefix in ("feature/", ""):
+        cached = _matching_refs_url(repo_full, prefix, api_base) in _BRANCHES
+        branch = _pick_session_branch(matching_branches(repo_full, prefix, token, api_base), session_id)
+        if branch is None and cached:
+            # The cached list may predate the branch; the refresh is a 304 when nothing changed.
+            branch = _pick_session_branch(matching_branches(repo_full, prefix, token, api_base, refresh=True), session_id)
+        if branch:
+            return branch
+    return None
+
+
+def _matching_refs_url(repo_full: str, prefix: str, api_base: str) -> str:
+    owner, repo = parse_repo(repo_full)
+    return f"{api_base.rstrip('/')}/repos/{owner}/{repo}/git/matching-refs/heads/{prefix}"
+
+
+def _pick_session_branch(branches: list[str], session_id: str) -> str | None:
     # Prefer feature branches containing the session id
     for name in branches:
         if session_id in name and name.startswith("feature/"):
@@ -64,11 +225,8 @@ def find_branch_by_session_id(repo_full: str, session_id: str, token: str, api_b
 def find_pr_by_head(repo_full: str, head_ref: str, token: str, api_base: str) -> dict[str, Any] | None:
     owner, repo = parse_repo(repo_full)
     url = f"{api_base.rstrip('/')}/repos/{owner}/{repo}/pulls?state=open&head={owner}:{head_ref}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
-    resp = requests.get(url, headers=headers, timeout=30)
+    headers = _headers(token)
+    resp = _CACHE.get(url, headers)
     if resp.status_code >= 400:
         raise RuntimeError(f"GitHub API error {resp.status_code}: {resp.text}")
     data = resp.json() or []
@@ -95,17 +253,14 @@ def create_pr(
 ) -> dict[str, Any]:
     owner, repo = parse_repo(repo_full)
     url = f"{api_base.rstrip('/')}/repos/{owner}/{repo}/pulls"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
+    headers = _headers(token)
     payload = {
         "title": title,
         "head": f"{owner}:{head_ref}",
         "base": base_ref,
         "body": body,
     }
-    resp = requests.post(url, headers=headers, json=payload, timeout=30)
+    resp = _send("POST", url, headers, json=payload)
     if resp.status_code == 422:
         # Likely PR already exists; caller should check with find_pr_by_head
         return {"error": resp.text}
@@ -124,11 +279,8 @@ def create_pr(
 def get_pr_info(pr_url: str, token: str, api_base: str) -> dict[str, Any]:
     owner, repo, number = parse_pr_url(pr_url)
     url = f"{api_base.rstrip('/')}/repos/{owner}/{repo}/pulls/{number}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
-    resp = requests.get(url, headers=headers, timeout=30)
+    headers = _headers(token)
+    resp = _CACHE.get(url, headers)
     if resp.status_code >= 400:
         raise RuntimeError(f"GitHub API error {resp.status_code}: {resp.text}")
     data = resp.json()
@@ -144,11 +296,8 @@ def get_pr_info(pr_url: str, token: str, api_base: str) -> dict[str, Any]:
 def is_pr_merged(pr_url: str, token: str, api_base: str) -> bool:
     owner, repo, number = parse_pr_url(pr_url)
     url = f"{api_base.rstrip('/')}/repos/{owner}/{repo}/pulls/{number}/merge"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
-    resp = requests.get(url, headers=headers, timeout=30)
+    headers = _headers(token)
+    resp = _CACHE.get(url, headers)
     if resp.status_code == 204:
         return True
     if resp.status_code == 404:
@@ -163,14 +312,11 @@ def merge_pr(pr_url: str, token: str, api_base: str, merge_method: str | None =
         merge_method = None
     owner, repo, number = parse_pr_url(pr_url)
     url = f"{api_base.rstrip('/')}/repos/{owner}/{repo}/pulls/{number}/merge"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
+    headers = _headers(token)
     payload = {}
     if merge_method:
         payload["merge_method"] = merge_method
-    resp = requests.put(url, headers=headers, json=payload, timeout=30)
+    resp = _send("PUT", url, headers, json=payload)
     if resp.status_code in (200, 201):
         data = resp.json()
         return {
@@ -190,3 +336,87 @@ def merge_pr(pr_url: str, token: str, api_base: str, merge_method: str | None =
     if resp.status_code >= 400:
         raise RuntimeError(f"GitHub API error {resp.status_code}: {resp.text}")
     return {"merged": False, "message": resp.text}
+
+
+PR_FIELDS = "number title url state merged mergeable headRefName"
+
+
+def graphql_url(api_base: str) -> str:
+    # https://api.github.com -> /graphql; GHES https://host/api/v3 -> https://host/api/graphql
+    base = api_base.rstrip("/")
+    if base.endswith("/v3"):
+        base = base[: -len("/v3")]
+    return f"{base}/graphql"
+
+
+def graphql(query: str, variables: dict[str, Any], token: str, api_base: str) -> dict[str, Any]:
+    resp = _send("POST", graphql_url(api_base), _headers(token), json={"query": query, "variables": variables})
+    if resp.status_code >= 400:
+        raise RuntimeError(f"GitHub GraphQL error {resp.status_code}: {resp.text}")
+    payload = resp.json() or {}
+    # Missing PRs come back as per-field errors next to partial data; only fail when there is no data.
+    if payload.get("errors") and not payload.get("data"):
+        raise RuntimeError(f"GitHub GraphQL error: {payload['errors']}")
+    return payload.get("data") or {}
+
+
+def batch_lookup(
+    repo_full: str,
+    token: str,
+    api_base: str,
+    pr_urls: list[str] | tuple[str, ...] = (),
+    session_ids: list[str] | tuple[str, ...] = (),
+) -> dict[str, dict[str, Any]]:
+    # One GraphQL request instead of get_pr_info/is_pr_merged per PR and a branch listing per
+    # session id. Returns {"prs": {pr_url: info}, "branches": {session_id: branch}} with None
+    # for anything not found.
+    owner, repo = parse_repo(repo_full)
+    selections: dict[tuple[str, str], list[str]] = {(owner, repo): []}
+    params: list[str] = []
+    variables: dict[str, Any] = {}
+    for idx, pr_url in enumerate(pr_urls):
+        pr_owner, pr_repo, number = parse_pr_url(pr_url)
+        selections.setdefault((pr_owner, pr_repo), []).append(f"pr{idx}: pullRequest(number: {number}) {{ {PR_FIELDS} }}")
+    for idx, session_id in enumerate(session_ids):
+        params.append(f"$s{idx}: String!")
+        variables[f"s{idx}"] = session_id
+        selections[(owner, repo)].append(f'ref{idx}: refs(refPrefix: "refs/heads/", query: $s{idx}, first: 100) {{ nodes {{ name }} }}')
+
+    blocks: list[str] = []
+    for idx, ((block_owner, block_repo), fields) in enumerate(selections.items()):
+        if not fields:
+            continue
+        params.extend([f"$o{idx}: String!", f"$n{idx}: String!"])
+        variables[f"o{idx}"] = block_owner
+        variables[f"n{idx}"] = block_repo
+        blocks.append(f"r{idx}: repository(owner: $o{idx}, name: $n{idx}) {{ {' '.join(fields)} }}")
+    result: dict[str, dict[str, Any]] = {"prs": {}, "branches": {}}
+    if not blocks:
+        return result
+
+    data = graphql(f"query({', '.join(params)}) {{ {' '.join(blocks)} }}", variables, token, api_base)
+    found: dict[str, Any] = {}
+    for block in data.values():
+        found.update(block or {})
+    for idx, pr_url in enumerate(pr_urls):
+        node = found.get(f"pr{idx}")
+        result["prs"][pr_url] = _pr_from_graphql(node, pr_url) if node else None
+    for idx, session_id in enumerate(session_ids):
+        nodes = (found.get(f"ref{idx}") or {}).get("nodes") or []
+        branches = [node["name"] for node in nodes if node and node.get("name")]
+        result["branches"][session_id] = _pick_session_branch(branches, session_id)
+    return result
+
+
+def _pr_from_graphql(node: dict[str, Any], pr_url: str) -> dict[str, Any]:
+    # Same keys as get_pr_info (REST state names), plus merged/mergeable.
+    state = str(node.get("state") or "").lower()
+    return {
+        "number": node.get("number"),
+        "title": node.get("title"),
+        "html_url": node.get("url") or pr_url,
+        "head_ref": node.get("headRefName"),
+        "state": "closed" if state == "merged" else state,
+        "merged": bool(node.get("merged")),
+        "mergeable": node.get("mergeable"),
+    }
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .utils import now_iso
+
+
+JOURNAL_FILE = "status/journal.jsonl"
+
+# Stage names, in pipeline order; a restarted run picks a feature up at its last recorded stage.
+STAGE_FEATURE_STARTED = "feature_started"
+STAGE_AGENT2_SESSION = "agent2_session"
+STAGE_PR_FOUND = "pr_found"
+STAGE_REVIEW_SESSION = "review_session"
+STAGE_REVIEW_VERDICT = "review_verdict"
+STAGE_FIX_SESSION = "fix_session"
+STAGE_FIX_DONE = "fix_done"
+STAGE_MERGE_ATTEMPT = "merge_attempt"
+STAGE_MERGED = "merged"
+
+
+class StageJournal:
+    def __init__(self, root: Path) -> None:
+        self.path = root / JOURNAL_FILE
+        self._states: dict[str, dict[str, Any]] = {}
+        self._last_time: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        self._states = {}
+        self._last_time = {}
+        if not self.path.exists():
+            return
+        with self.path.open() as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A run killed mid-write leaves at most one partial line.
+                    continue
+                if isinstance(entry, dict) and entry.get("feature"):
+                    self._apply(entry)
+
+    def record(self, feature_id: str | None, stage: str, **data: Any) -> dict[str, Any]:
+        if not feature_id:
+            return {}
+        feature_id = str(feature_id)
+        with self._lock:
+            now = time.time()
+            previous = self._last_time.get(feature_id)
+            entry: dict[str, Any] = {
+                "ts": now_iso(),
+                "time": round(now, 3),
+                "feature": feature_id,
+                "stage": stage,
+                "elapsed_seconds": round(now - previous, 3) if previous is not None else None,
+            }
+            entry.update({key: value for key, value in data.items() if value is not None})
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as handle:
+                handle.write(json.dumps(entry, sort_keys=True) + "\n")
+            self._apply(entry)
+            return entry
+
+    def state(self, feature_id: str | None) -> dict[str, Any]:
+        if not feature_id:
+            return {}
+        return dict(self._states.get(str(feature_id), {}))
+
+    def pending(self, feature_id: str | None, stage: str, key: str) -> Any:
+        state = self.state(feature_id)
+        return state.get(key) if state.get("stage") == stage else None
+
+    def _apply(self, entry: dict[str, Any]) -> None:
+        feature_id = str(entry["feature"])
+        if entry.get("stage") == STAGE_FEATURE_STARTED:
+            self._states[feature_id] = {}
+        state = self._states.setdefault(feature_id, {})
+        for key, value in entry.items():
+            if key not in ("ts", "time", "feature", "elapsed_seconds"):
+                state[key] = value
+        if isinstance(entry.get("time"), (int, float)):
+            self._last_time[feature_id] = float(entry["time"])
+
+
+_JOURNAL: StageJournal | None = None
+
+
+def open_journal(root: Path) -> StageJournal:
+    global _JOURNAL
+    _JOURNAL = StageJournal(root)
+    _JOURNAL.load()
+    return _JOURNAL
+
+
+def stage_journal() -> StageJournal:
+    global _JOURNAL
+    if _JOURNAL is None:
+        _JOURNAL = StageJournal(Path.cwd())
+        _JOURNAL.load()
+    return _JOURNAL
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
 import json
-import time
-from typing import Any
+from typing import Any, Iterator
 
 import requests
 
+from .activity import Activity, ActivityScan
+from .metrics import current_stage, metrics
+from .transport import backoff, governor, rate_key, shared_session, timed_request
+
 
 class JulesClient:
-    def __init__(self, api_key: str, api_base: str) -> None:
+    def __init__(self, api_key: str, api_base: str, session: requests.Session | None = None) -> None:
         self.api_key = api_key
         self.api_base = api_base.rstrip("/")
+        self.session = session or shared_session()
+        self._cursors: dict[str, ActivityCursor] = {}
 
     def _headers(self) -> dict[str, str]:
         return {
@@ -28,15 +33,29 @@ class JulesClient:
     ) -> dict[str, Any]:
         url = f"{self.api_base}{path}"
         data = json.dumps(payload) if payload is not None else None
+        key = rate_key(url, self.api_key)
         for attempt in range(1, max_retries + 1):
-            resp = requests.request(method, url, headers=self._headers(), data=data, timeout=30)
+            waited = governor().acquire(key)
+            if waited:
+                metrics().observe("rate_wait_seconds", waited, service="jules", stage=current_stage())
+            resp = timed_request(self.session, "jules", method, url, headers=self._headers(), data=data, timeout=30)
+            retry_delay = governor().observe(key, resp)
             if resp.status_code < 400:
                 return resp.json()
+            if attempt < max_retries and (
+                (resp.status_code == 404 and retry_on_404)
+                or retry_delay is not None
+                or resp.status_code in (429, 500, 502, 503, 504)
+            ):
+                metrics().incr("http_retries", service="jules", reason=resp.status_code, stage=current_stage())
             if resp.status_code == 404 and retry_on_404 and attempt < max_retries:
-                time.sleep(2**attempt)
+                backoff(2**attempt)
+                continue
+            if retry_delay is not None and attempt < max_retries:
+                # The next acquire() waits out Retry-After.
                 continue
             if resp.status_code in (429, 500, 502, 503, 504) and attempt < max_retries:
-                time.sleep(2**attempt)
+                backoff(2**attempt)
                 continue
             raise RuntimeError(f"Jules API error {resp.status_code} for {method} {url}: {resp.text}")
         raise RuntimeError("Jules API request failed after retries")
@@ -96,9 +115,74 @@ class JulesClient:
             path = f"{path}&pageToken={page_token}"
         return self._request("GET", path, retry_on_404=True, max_retries=6)
 
+    def activity_cursor(self, session_name: str, max_pages: int | None = None) -> "ActivityCursor":
+        # One cursor per session so repeated polls only fetch what is new.
+        key = self._normalize_session_name(session_name)
+        cursor = self._cursors.get(key)
+        if cursor is None:
+            cursor = ActivityCursor(self, key)
+            self._cursors[key] = cursor
+        if max_pages is not None:
+            cursor.max_pages = max_pages
+        return cursor
+
     def send_message(self, session_name: str, prompt: str) -> dict[str, Any]:
         body = {"prompt": prompt}
         return self._request("POST", f"{self._session_path(session_name)}:sendMessage", body)
 
     def approve_plan(self, session_name: str) -> dict[str, Any]:
         return self._request("POST", f"{self._session_path(session_name)}:approvePlan")
+
+
+class ActivityCursor:
+    def __init__(self, client: JulesClient, session_name: str, page_size: int = 50, max_pages: int = 10) -> None:
+        self.client = client
+        self.session_name = session_name
+        self.page_size = page_size
+        self.max_pages = max_pages
+        # Token of the oldest page that may still gain activities; None means the first page.
+        self.page_token: str | None = None
+        self.seen_ids: set[str] = set()
+        # Last session state seen by the poll loops; part of the progress marker.
+        self.state: str | None = None
+        self.scan = ActivityScan()
+
+    def iter_new(self) -> Iterator[Activity]:
+        # Fetches a page only when the consumer wants more, so at most one page is held.
+        # Stopping early leaves page_token on the current page; its unseen rest comes next time.
+        for _ in range(max(self.max_pages, 1)):
+            page = self.client.list_activities(self.session_name, page_size=self.page_size, page_token=self.page_token)
+            for raw in page.get("activities") or []:
+                key = _activity_key(raw)
+                if key in self.seen_ids:
+                    continue
+                self.seen_ids.add(key)
+                yield Activity.from_api(raw)
+            next_token = page.get("nextPageToken")
+            if not next_token:
+                # Last page may still be partial; re-read it (and only it) next time.
+                break
+            self.page_token = next_token
+
+    def scan_new(self, want: str) -> ActivityScan:
+        # Feeds new activities to the session's scan until the wanted artifact is complete.
+        activities = self.iter_new()
+        try:
+            for activity in activities:
+                if self.scan.feed(activity, want):
+                    break
+        finally:
+            activities.close()
+        if self.scan.final_state:
+            self.state = self.scan.final_state
+        return self.scan
+
+    def progress_marker(self) -> tuple[int, str | None]:
+        return len(self.seen_ids), self.state
+
+
+def _activity_key(activity: dict[str, Any]) -> str:
+    key = activity.get("name") or activity.get("id")
+    if key:
+        return str(key)
+    return json.dumps(activity, sort_keys=True)
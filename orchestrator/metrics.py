@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import urlsplit
+
+from .utils import atomic_write, now_iso
+
+
+METRICS_FILE = "status/metrics.json"
+PROM_PREFIX = "orchestrator"
+
+# The pipeline stage the current code runs in. A ContextVar, so concurrent engine
+# pipelines (and the worker threads they hand HTTP calls to) each see their own stage.
+_STAGE: contextvars.ContextVar[str] = contextvars.ContextVar("orchestrator_stage", default="run")
+
+# Numbers, hex/uuid-ish tokens, and long mixed tokens are ids; "v1alpha" or "pulls" are not.
+_ID_SEGMENT_RE = re.compile(r"^\d+$|^[0-9a-f-]{12,}$|^(?=.*\d)[A-Za-z0-9_-]{16,}$")
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.started_iso = now_iso()
+        self._counters: dict[tuple[str, Labels], float] = {}
+        # name+labels -> [count, total seconds, max seconds]
+        self._timers: dict[tuple[str, Labels], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            timer = self._timers.setdefault(key, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def report(self, extra: dict[str, Any] | None = None) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {key: list(value) for key, value in self._timers.items()}
+        report: dict[str, Any] = {
+            "started": self.started_iso,
+            "finished": now_iso(),
+            "wall_seconds": round(time.time() - self.started, 3),
+            "stages": {},
+            "http": [],
+            "counters": {},
+            "timers": {},
+        }
+        for (name, labels), (count, total, peak) in sorted(timers.items()):
+            summary = {"count": int(count), "total_seconds": round(total, 3), "max_seconds": round(peak, 3)}
+            if name == "stage_seconds":
+                report["stages"][dict(labels)["stage"]] = summary
+            elif name == "http_request_seconds":
+                report["http"].append({**dict(labels), **summary})
+            else:
+                report["timers"].setdefault(name, []).append({"labels": dict(labels), **summary})
+        for (name, labels), value in sorted(counters.items()):
+            report["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+        if extra:
+            report.update(extra)
+        return report
+
+    def prometheus(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {key: list(value) for key, value in self._timers.items()}
+        # One block per metric family, each preceded by its TYPE line.
+        families: dict[tuple[str, str], list[str]] = {}
+        for (name, labels), (count, total, peak) in sorted(timers.items()):
+            metric = f"{PROM_PREFIX}_{name}"
+            families.setdefault((metric, "summary"), []).extend(
+                [
+                    f"{metric}_count{_prom_labels(labels)} {int(count)}",
+                    f"{metric}_sum{_prom_labels(labels)} {total:.6f}",
+                ]
+            )
+            families.setdefault((f"{metric}_max", "gauge"), []).append(f"{metric}_max{_prom_labels(labels)} {peak:.6f}")
+        for (name, labels), value in sorted(counters.items()):
+            metric = f"{PROM_PREFIX}_{name}_total"
+            families.setdefault((metric, "counter"), []).append(f"{metric}{_prom_labels(labels)} {value:g}")
+        lines: list[str] = []
+        for (metric, kind), samples in families.items():
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(samples)
+        lines.append(f"# TYPE {PROM_PREFIX}_run_seconds gauge")
+        lines.append(f"{PROM_PREFIX}_run_seconds {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+
+_METRICS = Metrics()
+
+
+def metrics() -> Metrics:
+    return _METRICS
+
+
+def reset_metrics() -> Metrics:
+    global _METRICS
+    _METRICS = Metrics()
+    return _METRICS
+
+
+def current_stage() -> str:
+    return _STAGE.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    # Wall time of a pipeline stage; HTTP calls, polls and retries inside it carry its label.
+    # Usable as a decorator too; re-entering the current stage is not timed twice.
+    if _STAGE.get() == name:
+        yield
+        return
+    token = _STAGE.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _METRICS.observe("stage_seconds", time.perf_counter() - start, stage=name)
+        _STAGE.reset(token)
+
+
+def observe_http(service: str, method: str, url: str, status: int | str, seconds: float) -> None:
+    _METRICS.observe(
+        "http_request_seconds",
+        seconds,
+        service=service,
+        method=method.upper(),
+        endpoint=endpoint_label(url),
+        status=status,
+        stage=_STAGE.get(),
+    )
+
+
+def endpoint_label(url: str) -> str:
+    # /repos/acme/app/pulls/12 -> /repos/{owner}/{repo}/pulls/{id}; /v1alpha/sessions/8723.. -> /v1alpha/sessions/{id}
+    parts = [part for part in urlsplit(url).path.split("/") if part]
+    labelled: list[str] = []
+    for idx, part in enumerate(parts):
+        if idx >= 2 and parts[idx - 2] == "repos":
+            labelled[-1] = "{owner}"
+            labelled.append("{repo}")
+        elif idx >= 1 and parts[idx - 1] == "heads" and "matching-refs" in parts:
+            labelled.append(part)
+        else:
+            # Custom methods ("sessions/123:approvePlan") keep the verb.
+            name, colon, verb = part.partition(":")
+            labelled.append(("{id}" if _ID_SEGMENT_RE.match(name) else name) + colon + verb)
+    return "/" + "/".join(labelled)
+
+
+def write_report(root: Path, prom_path: str | None = None, extra: dict[str, Any] | None = None) -> Path:
+    path = root / METRICS_FILE
+    atomic_write(path, json.dumps(_METRICS.report(extra), indent=2), 0o644)
+    if prom_path:
+        atomic_write(root / prom_path, _METRICS.prometheus(), 0o644)
+    return path
+
+
+def _labels(labels: dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _prom_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_prom_escape(value)}"' for key, value in labels) + "}"
+
+
+def _prom_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
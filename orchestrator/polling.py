@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import random
+from typing import Any, Callable, Hashable
+
+from .cassette import replaying
+from .config import Config
+
+
+_UNSET = object()
+
+
+class FixedSchedule:
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+
+    def next_delay(self, marker: Hashable = None) -> float:
+        return self.seconds
+
+
+class BackoffSchedule:
+    # Quiet polls stretch the interval (x factor, capped at max_seconds); any change
+    # in the progress marker (new activities, new session state) drops it to min_seconds.
+    def __init__(
+        self,
+        start_seconds: float,
+        min_seconds: float,
+        max_seconds: float,
+        factor: float = 1.5,
+        jitter: float = 0.1,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.min_seconds = max(min_seconds, 0.0)
+        self.max_seconds = max(max_seconds, self.min_seconds)
+        self.factor = max(factor, 1.0)
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.rng = rng
+        self.delay = min(max(start_seconds, self.min_seconds), self.max_seconds)
+        self._marker: Any = _UNSET
+
+    def next_delay(self, marker: Hashable = None) -> float:
+        if self._marker is not _UNSET:
+            if marker != self._marker:
+                self.delay = self.min_seconds
+            else:
+                self.delay = min(self.delay * self.factor, self.max_seconds)
+        self._marker = marker
+        spread = self.delay * self.jitter
+        return max(self.delay - spread + 2 * spread * self.rng(), 0.0)
+
+
+PollSchedule = FixedSchedule | BackoffSchedule
+
+
+def make_schedule(cfg: Config) -> PollSchedule:
+    if replaying():
+        # A replayed session advances one recorded response per poll; waiting adds nothing.
+        return FixedSchedule(0)
+    if cfg.poll_strategy == "fixed":
+        return FixedSchedule(cfg.poll_seconds)
+    return BackoffSchedule(
+        start_seconds=cfg.poll_seconds,
+        min_seconds=cfg.poll_min_seconds,
+        max_seconds=cfg.poll_max_seconds,
+        factor=cfg.poll_backoff,
+        jitter=cfg.poll_jitter,
+    )
@@ -21,6 +21,7 @@ Rules:
 - Only add NEW epics, features, stories, and acceptance criteria.
 - Use NEW unique IDs that do not exist yet.
 - If you add a new feature, it must reference an epic ID.
+- A feature may list prerequisite feature IDs in "depends_on"; omit it when there are none.
 - If you add a new story, it must reference a feature ID.
 - If you have no new items for a section, return an empty array for that section.
 - You may add new items to product constraints/rules/requirements only.
@@ -68,7 +69,7 @@ BEGIN_BACKLOG_JSON
     {{"id": "E1", "title": "<epic>", "status": "planned", "description": "<short>"}}
   ],
   "features": [
-    {{"id": "F1", "epic": "E1", "title": "<feature>", "status": "ready", "description": "<short>"}}
+    {{"id": "F1", "epic": "E1", "title": "<feature>", "status": "ready", "description": "<short>", "depends_on": []}}
   ],
   "stories": [
     {{"id": "S1", "feature": "F1", "title": "<story>", "status": "ready", "description": "<short>"}}
@@ -119,11 +120,24 @@ REVIEW:
 """.strip().format(pr_url=pr_url, review=_pretty(review))
 
 
-def build_agent3_prompt(pr_url: str, feature: dict[str, Any], stories: list[dict[str, Any]], acceptance: list[dict[str, Any]]) -> str:
+def build_agent3_prompt(
+    pr_url: str,
+    feature: dict[str, Any],
+    stories: list[dict[str, Any]],
+    acceptance: list[dict[str, Any]],
+    part: tuple[int, int] | None = None,
+) -> str:
+    # part=(i, n): this reviewer owns slice i of n of the acceptance criteria.
+    scope = ""
+    if part:
+        scope = (
+            f"\nYou are reviewer {part[0]} of {part[1]}. The others cover the remaining acceptance criteria; "
+            "only the criteria listed below are yours to check (plus correctness and security of the whole PR)."
+        )
     return """
 You are Agent 3 (Senior Reviewer).
 
-Review the PR for correctness, security, performance, and adherence to acceptance criteria.
+Review the PR for correctness, security, performance, and adherence to acceptance criteria.{scope}
 Return ONLY the JSON payload between the markers below. Do not include any extra text.
 
 PR:
@@ -147,6 +161,7 @@ BEGIN_REVIEW_JSON
 }}
 END_REVIEW_JSON
 """.strip().format(
+        scope=scope,
         pr_url=pr_url,
         feature=_pretty(feature),
         stories=_pretty(stories),
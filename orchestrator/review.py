@@ -3,7 +3,18 @@ from __future__ import annotations
 import json
 from typing import Any
 
-from .utils import extract_between
+from .utils import extract_between, find_json_object
+
+
+# How a panel of Agent3 reviewers reaches a verdict: how many clean PASS votes it takes.
+QUORUM_FIRST_PASS = "first_pass"
+QUORUM_MAJORITY = "majority"
+QUORUM_ALL = "all"
+QUORUM_MODES = (QUORUM_FIRST_PASS, QUORUM_MAJORITY, QUORUM_ALL)
+# What each reviewer of a panel is given: the whole feature, or a slice of its acceptance criteria.
+SPLIT_REDUNDANT = "redundant"
+SPLIT_ACCEPTANCE = "acceptance"
+REVIEW_SPLITS = (SPLIT_REDUNDANT, SPLIT_ACCEPTANCE)
 
 
 def extract_review_json(text: str) -> dict[str, Any] | None:
@@ -17,19 +28,111 @@ def extract_review_json(text: str) -> dict[str, Any] | None:
 
 
 def _extract_from_any_json(text: str) -> dict[str, Any] | None:
-    decoder = json.JSONDecoder()
-    idx = 0
-    text_len = len(text)
-    while idx < text_len:
-        if text[idx] != "{":
-            idx += 1
-            continue
-        try:
-            obj, end = decoder.raw_decode(text[idx:])
-        except json.JSONDecodeError:
-            idx += 1
-            continue
-        if isinstance(obj, dict) and "verdict" in obj:
-            return obj
-        idx += max(end, 1)
-    return None
+    return find_json_object(text, is_review_payload)
+
+
+def is_review_payload(obj: dict[str, Any]) -> bool:
+    return "verdict" in obj
+
+
+def normalize_verdict(value: str) -> str:
+    verdict = value.strip().upper()
+    if verdict in {"CHANGES_REQUESTED", "REQUEST_CHANGES", "REQUESTED_CHANGES"}:
+        return "NEEDS_CHANGES"
+    if verdict in {"APPROVED", "PASS"}:
+        return "PASS"
+    return verdict
+
+
+def quorum_needed(quorum: str, reviewers: int) -> int:
+    if quorum == QUORUM_FIRST_PASS:
+        return 1
+    if quorum == QUORUM_MAJORITY:
+        return reviewers // 2 + 1
+    if quorum == QUORUM_ALL:
+        return reviewers
+    raise ValueError(f"Unknown review quorum {quorum!r}; expected one of {', '.join(QUORUM_MODES)}")
+
+
+def aggregate_reviews(reviews: list[dict[str, Any]], reviewers: int, quorum: str) -> dict[str, Any] | None:
+    # The panel's review once the quorum is decided, else None. A panel vote is PASS only with
+    # no blocking issues; PENDING (timed out, failed) counts for neither side. A single
+    # reviewer's review is returned as it is.
+    if reviewers == 1:
+        return reviews[0] if reviews else None
+    needed = quorum_needed(quorum, reviewers)
+    passed = [review for review in reviews if _clean_pass(review)]
+    rejected = [
+        review
+        for review in reviews
+        if not _clean_pass(review) and normalize_verdict(str(review.get("verdict", ""))) != "PENDING"
+    ]
+    outstanding = reviewers - len(reviews)
+    if len(passed) >= needed:
+        return _merge_reviews("PASS", passed, reviews, reviewers)
+    if len(passed) + outstanding >= needed:
+        return None
+    if not rejected:
+        return {
+            "verdict": "PENDING",
+            "blocking": [],
+            "non_blocking": [],
+            "notes": f"{len(passed)} of {reviewers} reviewers passed; quorum {quorum} needs {needed}.",
+            "reviewers": [_vote(review) for review in reviews],
+        }
+    verdicts = [normalize_verdict(str(review.get("verdict", ""))) for review in rejected]
+    verdict = "NEEDS_CHANGES" if "NEEDS_CHANGES" in verdicts or "PASS" in verdicts else verdicts[0]
+    return _merge_reviews(verdict, rejected, reviews, reviewers)
+
+
+def split_acceptance(acceptance: list[dict[str, Any]], parts: int) -> list[list[dict[str, Any]]]:
+    # Criteria dealt round-robin into at most `parts` slices, each keeping its story entries.
+    pairs = [(pos, item, criterion) for pos, item in enumerate(acceptance) for criterion in _criteria(item)]
+    count = min(parts, len(pairs))
+    if count <= 1:
+        return [acceptance]
+    slices: list[dict[int, dict[str, Any]]] = [{} for _ in range(count)]
+    for idx, (pos, item, criterion) in enumerate(pairs):
+        slices[idx % count].setdefault(pos, {**item, "criteria": []})["criteria"].append(criterion)
+    return [list(entries.values()) for entries in slices]
+
+
+def _criteria(item: dict[str, Any]) -> list[Any]:
+    criteria = item.get("criteria")
+    if isinstance(criteria, list):
+        return criteria
+    return [criteria] if criteria else []
+
+
+def _clean_pass(review: dict[str, Any]) -> bool:
+    return normalize_verdict(str(review.get("verdict", ""))) == "PASS" and not review.get("blocking")
+
+
+def _merge_reviews(
+    verdict: str,
+    deciding: list[dict[str, Any]],
+    reviews: list[dict[str, Any]],
+    reviewers: int,
+) -> dict[str, Any]:
+    blocking: list[Any] = []
+    non_blocking: list[Any] = []
+    for review in deciding:
+        for issue in review.get("blocking") or []:
+            if issue not in blocking:
+                blocking.append(issue)
+    for review in reviews:
+        for issue in review.get("non_blocking") or []:
+            if issue not in non_blocking and issue not in blocking:
+                non_blocking.append(issue)
+    notes = [str(review["notes"]) for review in deciding if review.get("notes")]
+    return {
+        "verdict": verdict,
+        "blocking": blocking,
+        "non_blocking": non_blocking,
+        "notes": " | ".join(notes) or f"{len(deciding)} of {reviewers} reviewers: {verdict}",
+        "reviewers": [_vote(review) for review in reviews],
+    }
+
+
+def _vote(review: dict[str, Any]) -> dict[str, Any]:
+    return {"verdict": normalize_verdict(str(review.get("verdict", ""))), "blocking": len(review.get("blocking") or [])}
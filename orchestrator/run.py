@@ -1,41 +1,72 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
-import re
 import sys
 import time
 from pathlib import Path
 from typing import Any
 
-from .backlog import BacklogStore, extract_backlog_json
+from .activity import WANT_BACKLOG, WANT_PR, WANT_REVIEW, ActivityScan
+from .backlog import CACHE_DIR, BacklogStore
+from .cassette import close_cassette, configure_cassette
 from .config import Config
-from .git_utils import commit_all, commit_paths
+from .git_utils import CommitJournal, commit_all, commit_paths, set_backend, set_push
 from .github_client import (
+    CACHE_FILE as GITHUB_CACHE_FILE,
+    batch_lookup,
+    configure_cache,
     create_pr,
     find_branch_by_session_id,
     find_pr_by_head,
     get_pr_info,
     is_pr_merged,
     merge_pr,
+    save_cache,
 )
+from .events import start_inbox, stop_inbox, wait_for_event
 from .intake import prompt_from_event
+from .journal import (
+    JOURNAL_FILE,
+    STAGE_AGENT2_SESSION,
+    STAGE_FEATURE_STARTED,
+    STAGE_FIX_DONE,
+    STAGE_FIX_SESSION,
+    STAGE_MERGE_ATTEMPT,
+    STAGE_MERGED,
+    STAGE_PR_FOUND,
+    STAGE_REVIEW_SESSION,
+    STAGE_REVIEW_VERDICT,
+    open_journal,
+    stage_journal,
+)
 from .jules_client import JulesClient
+from .metrics import current_stage, metrics, reset_metrics, stage, write_report
+from .polling import PollSchedule, make_schedule
 from .prompts import build_agent1_prompt, build_agent2_prompt, build_agent2_fix_prompt, build_agent3_prompt
-from .review import extract_review_json
-from .utils import iter_strings, now_iso
+from .review import REVIEW_SPLITS, SPLIT_ACCEPTANCE, aggregate_reviews, normalize_verdict, quorum_needed, split_acceptance
+from .transport import RateLimitWait, close_session, configure_governor, configure_session, governor
+from .utils import now_iso
 
 
-PR_URL_RE = re.compile(r"https://github.com/[^/]+/[^/]+/pull/\d+")
-BRANCH_REF_RE = re.compile(r"refs/heads/([A-Za-z0-9._/-]+)")
-FEATURE_BRANCH_RE = re.compile(r"(feature/[A-Za-z0-9._/-]+)")
+COMMIT_JOURNAL = CommitJournal()
 
 
 def log(message: str) -> None:
     print(message, flush=True)
 
 
+def log_rate_usage() -> None:
+    for key, usage in governor().usage().items():
+        quota = f", {usage['remaining']}/{usage['limit']} left" if usage["remaining"] is not None else ""
+        log(
+            f"Rate budget {key}: {usage['requests']} requests, {usage['throttled']} throttled, "
+            f"waited {usage['waited_seconds']:.1f}s{quota}"
+        )
+
+
 def session_name_from(resp: dict[str, Any]) -> str:
     name = resp.get("name") or resp.get("session", {}).get("name") or resp.get("id")
     if not name:
@@ -43,26 +74,13 @@ def session_name_from(resp: dict[str, Any]) -> str:
     return str(name)
 
 
-def collect_activity_text(client: JulesClient, session_name: str) -> str:
-    page_token: str | None = None
-    texts: list[str] = []
+def scan_new_activities(client: JulesClient, session_name: str, want: str) -> ActivityScan:
     max_pages = int(os.getenv("ORCH_MAX_ACTIVITY_PAGES", "10"))
-    for _ in range(max_pages):
-        activities = client.list_activities(session_name, page_token=page_token)
-        texts.extend(iter_strings(activities))
-        page_token = activities.get("nextPageToken")
-        if not page_token:
-            break
-    return "\n".join(texts)
-
-
-def _extract_branch(text: str) -> str | None:
-    candidates: list[str] = []
-    for match in BRANCH_REF_RE.finditer(text):
-        candidates.append(match.group(1))
-    for match in FEATURE_BRANCH_RE.finditer(text):
-        candidates.append(match.group(1))
-    return candidates[-1] if candidates else None
+    cursor = client.activity_cursor(session_name, max_pages=max_pages)
+    scanned = cursor.scan.scanned_bytes
+    scan = cursor.scan_new(want)
+    metrics().incr("activity_bytes_scanned", scan.scanned_bytes - scanned, stage=current_stage())
+    return scan
 
 
 def _ensure_pr_exists(cfg: Config, branch: str, feature_id: str | None) -> str | None:
@@ -89,6 +107,155 @@ def _out_of_time(run_deadline: float, buffer_seconds: int = 60) -> bool:
     return time.time() + buffer_seconds >= run_deadline
 
 
+def session_state(client: JulesClient, session_name: str) -> str:
+    session = client.get_session(session_name)
+    state = str(session.get("state") or session.get("status") or "").upper()
+    cursor = client.activity_cursor(session_name)
+    cursor.state = state
+    cursor.scan.observe_session(session)
+    return state
+
+
+def settled_state(client: JulesClient, session_name: str, scan: ActivityScan) -> tuple[str, bool]:
+    # A sessionCompleted/sessionFailed activity is the last one; a state read needs a rescan.
+    if scan.final_state:
+        return scan.final_state, False
+    return session_state(client, session_name), True
+
+
+def progress_marker(client: JulesClient, session_name: str) -> tuple[int, str | None]:
+    return client.activity_cursor(session_name).progress_marker()
+
+
+def wait_for_next_poll(
+    schedule: PollSchedule,
+    client: JulesClient,
+    session_name: str | list[str],
+    deadline: float,
+) -> None:
+    names = [session_name] if isinstance(session_name, str) else session_name
+    delay = schedule.next_delay(tuple(progress_marker(client, name) for name in names))
+    metrics().incr("poll_iterations", stage=current_stage())
+    wait_for_event(session_name, delay, deadline)
+
+
+def probe_pr_url(
+    client: JulesClient,
+    session_name: str,
+    branch: str | None,
+) -> tuple[str | None, str | None, bool]:
+    scan = scan_new_activities(client, session_name, WANT_PR)
+    if not scan.pr_url:
+        state, rescan = settled_state(client, session_name, scan)
+        if state in {"FAILED", "CANCELLED"}:
+            raise RuntimeError(f"Agent2 session ended with state {state}")
+        if state != "COMPLETED":
+            return None, branch or scan.branch, False
+        if rescan and not scan.pr_url:
+            # The last activities may have been posted between the scan and the state read.
+            scan = scan_new_activities(client, session_name, WANT_PR)
+    return scan.pr_url, branch or scan.branch, True
+
+
+def fallback_pr_url(cfg: Config, session_name: str, feature_id: str | None, branch: str | None) -> str | None:
+    session_id = session_name.split("/")[-1]
+    if not branch:
+        branch = find_session_branch(cfg, session_id)
+    if branch:
+        pr_url = _ensure_pr_exists(cfg, branch, feature_id)
+        if pr_url:
+            return pr_url
+    return None
+
+
+def find_session_branch(cfg: Config, session_id: str) -> str | None:
+    repo, token = cfg.github_repository, cfg.github_token
+    if not repo or not token:
+        return None
+    if cfg.github_graphql:
+        try:
+            lookup = batch_lookup(repo, token, cfg.github_api_url, session_ids=[session_id])
+            return lookup["branches"].get(session_id)
+        except RuntimeError as exc:
+            log(f"GraphQL branch search failed, listing branches instead: {exc}")
+    return find_branch_by_session_id(repo, session_id, token, cfg.github_api_url)
+
+
+def reconcile_review_features(cfg: Config, store: BacklogStore, root: Path) -> list[str]:
+    if not cfg.github_graphql or not cfg.github_repository or not cfg.github_token:
+        return []
+    features = [item for item in store.features_with_status("review") if item.get("pr_url")]
+    if not features:
+        return []
+    try:
+        lookup = batch_lookup(
+            cfg.github_repository,
+            cfg.github_token,
+            cfg.github_api_url,
+            pr_urls=[str(item["pr_url"]) for item in features],
+        )
+    except (RuntimeError, ValueError) as exc:
+        log(f"GraphQL PR reconciliation skipped: {exc}")
+        return []
+    merged: list[str] = []
+    for item in features:
+        info = lookup["prs"].get(str(item["pr_url"]))
+        if not info or not info.get("merged"):
+            continue
+        feature_id = str(item.get("id"))
+        stage_journal().record(feature_id, STAGE_MERGED, pr_url=str(item["pr_url"]))
+        store.update_feature_status(feature_id, "done")
+        store.update_story_status(feature_id, "done")
+        store.update_feature_fields(feature_id, merge_status="merged")
+        merged.append(feature_id)
+    if merged:
+        log(f"Merged PRs reconciled: {', '.join(merged)}")
+        store.save_all()
+        write_status(root, store, merged[-1], notes="Feature merged")
+        commit_backlog(cfg, f"backlog: reconcile merged {', '.join(merged)}")
+    return merged
+
+
+def probe_backlog(client: JulesClient, session_name: str) -> dict[str, Any] | None:
+    return scan_new_activities(client, session_name, WANT_BACKLOG).result(WANT_BACKLOG)
+
+
+class SessionEnded(RuntimeError):
+    pass
+
+
+def probe_review(client: JulesClient, session_name: str) -> tuple[dict[str, Any] | None, bool]:
+    scan = scan_new_activities(client, session_name, WANT_REVIEW)
+    payload = scan.result(WANT_REVIEW)
+    if payload:
+        return payload, True
+    state, rescan = settled_state(client, session_name, scan)
+    if state in {"FAILED", "CANCELLED"}:
+        raise SessionEnded(f"Agent3 session ended with state {state}")
+    if state != "COMPLETED":
+        return None, False
+    if not rescan:
+        return None, True
+    # The verdict may have been posted between the scan and the state read.
+    return scan_new_activities(client, session_name, WANT_REVIEW).result(WANT_REVIEW), True
+
+
+def probe_session_completion(client: JulesClient, session_name: str) -> str | None:
+    state = session_state(client, session_name)
+    if state in {"COMPLETED", "FAILED", "CANCELLED"}:
+        return state
+    return None
+
+
+def pending_review() -> dict[str, Any]:
+    return {
+        "verdict": "PENDING",
+        "blocking": [],
+        "non_blocking": [],
+        "notes": "Review JSON not found before timeout; manual check recommended.",
+    }
+
+
 def poll_for_pr_url(
     client: JulesClient,
     session_name: str,
@@ -96,32 +263,20 @@ def poll_for_pr_url(
     feature_id: str | None,
     run_deadline: float,
 ) -> str | None:
+    flush_commits()
     deadline = time.time() + cfg.max_poll_minutes * 60
+    schedule = make_schedule(cfg)
     branch: str | None = None
-    session_id = session_name.split("/")[-1]
     while time.time() < deadline:
         if _out_of_time(run_deadline):
             break
-        text = collect_activity_text(client, session_name)
-        match = PR_URL_RE.search(text)
-        if match:
-            return match.group(0)
-        if not branch:
-            branch = _extract_branch(text)
-        session = client.get_session(session_name)
-        state = str(session.get("state") or session.get("status") or "").upper()
-        if state in {"FAILED", "CANCELLED"}:
-            raise RuntimeError(f"Agent2 session ended with state {state}")
-        if state == "COMPLETED":
-            break
-        time.sleep(cfg.poll_seconds)
-    if not branch and cfg.github_repository and cfg.github_token:
-        branch = find_branch_by_session_id(cfg.github_repository, session_id, cfg.github_token, cfg.github_api_url)
-    if branch:
-        pr_url = _ensure_pr_exists(cfg, branch, feature_id)
+        pr_url, branch, done = probe_pr_url(client, session_name, branch)
         if pr_url:
             return pr_url
-    return None
+        if done:
+            break
+        wait_for_next_poll(schedule, client, session_name, deadline)
+    return fallback_pr_url(cfg, session_name, feature_id, branch)
 
 
 def poll_for_backlog(
@@ -130,15 +285,16 @@ def poll_for_backlog(
     cfg: Config,
     run_deadline: float,
 ) -> dict[str, Any] | None:
+    flush_commits()
     deadline = time.time() + cfg.max_poll_minutes * 60
+    schedule = make_schedule(cfg)
     while time.time() < deadline:
         if _out_of_time(run_deadline):
             break
-        text = collect_activity_text(client, session_name)
-        payload = extract_backlog_json(text)
+        payload = probe_backlog(client, session_name)
         if payload:
             return payload
-        time.sleep(cfg.poll_seconds)
+        wait_for_next_poll(schedule, client, session_name, deadline)
     return None
 
 
@@ -148,40 +304,66 @@ def poll_for_review(
     cfg: Config,
     run_deadline: float,
 ) -> dict[str, Any]:
+    flush_commits()
     deadline = time.time() + cfg.max_poll_minutes * 60
+    schedule = make_schedule(cfg)
     while time.time() < deadline:
         if _out_of_time(run_deadline):
             break
-        text = collect_activity_text(client, session_name)
-        payload = extract_review_json(text)
+        payload, done = probe_review(client, session_name)
         if payload:
             return payload
-        session = client.get_session(session_name)
-        state = str(session.get("state") or session.get("status") or "").upper()
-        if state in {"FAILED", "CANCELLED"}:
-            raise RuntimeError(f"Agent3 session ended with state {state}")
-        if state == "COMPLETED":
-            # final attempt before exiting
-            payload = extract_review_json(text)
-            if payload:
-                return payload
+        if done:
             break
-        time.sleep(cfg.poll_seconds)
-    return {
-        "verdict": "PENDING",
-        "blocking": [],
-        "non_blocking": [],
-        "notes": "Review JSON not found before timeout; manual check recommended.",
-    }
+        wait_for_next_poll(schedule, client, session_name, deadline)
+    return pending_review()
+
+
+def poll_for_review_panel(
+    client: JulesClient,
+    sessions: list[str],
+    cfg: Config,
+    run_deadline: float,
+) -> dict[str, Any]:
+    if len(sessions) == 1:
+        return poll_for_review(client, sessions[0], cfg, run_deadline)
+    flush_commits()
+    deadline = time.time() + cfg.max_poll_minutes * 60
+    schedule = make_schedule(cfg)
+    reviews: dict[str, dict[str, Any]] = {}
+    while time.time() < deadline and not _out_of_time(run_deadline):
+        for session_name in sessions:
+            if session_name not in reviews:
+                review = probe_panel_review(client, session_name)
+                if review:
+                    reviews[session_name] = review
+        decided = aggregate_reviews(list(reviews.values()), len(sessions), cfg.review_quorum)
+        if decided:
+            return panel_decided(decided, sessions, reviews)
+        wait_for_next_poll(schedule, client, [name for name in sessions if name not in reviews], deadline)
+    for session_name in sessions:
+        reviews.setdefault(session_name, pending_review())
+    return panel_decided(aggregate_reviews(list(reviews.values()), len(sessions), cfg.review_quorum), sessions, reviews)
+
+
+def probe_panel_review(client: JulesClient, session_name: str) -> dict[str, Any] | None:
+    # A failed or cancelled reviewer is a PENDING vote; API errors still fail the feature.
+    try:
+        payload, done = probe_review(client, session_name)
+    except SessionEnded as exc:
+        log(f"Agent3 reviewer {session_name} failed: {exc}")
+        return pending_review()
+    if payload:
+        return payload
+    return pending_review() if done else None
 
 
-def normalize_verdict(value: str) -> str:
-    verdict = value.strip().upper()
-    if verdict in {"CHANGES_REQUESTED", "REQUEST_CHANGES", "REQUESTED_CHANGES"}:
-        return "NEEDS_CHANGES"
-    if verdict in {"APPROVED", "PASS"}:
-        return "PASS"
-    return verdict
+def panel_decided(review: dict[str, Any] | None, sessions: list[str], reviews: dict[str, Any]) -> dict[str, Any]:
+    undecided = [name for name in sessions if name not in reviews]
+    if undecided:
+        log(f"Review quorum reached; not waiting for {len(undecided)} reviewer(s): {', '.join(undecided)}")
+        metrics().incr("review_reviewers_skipped", len(undecided), stage=current_stage())
+    return review or pending_review()
 
 
 BACKLOG_REMINDER = """
@@ -217,8 +399,9 @@ def review_with_retry(
     acceptance: list[dict[str, Any]],
     pr_head: str | None,
     run_deadline: float,
+    resume_sessions: list[str] | None = None,
 ) -> tuple[dict[str, Any], str]:
-    review = run_agent3(cfg, pr_url, feature, stories, acceptance, pr_head, run_deadline)
+    review = run_agent3(cfg, pr_url, feature, stories, acceptance, pr_head, run_deadline, resume_sessions)
     verdict = normalize_verdict(str(review.get("verdict", "")))
     retries = max(cfg.review_retry_max, 0)
     while verdict == "PENDING" and retries > 0 and not _out_of_time(run_deadline):
@@ -230,18 +413,27 @@ def review_with_retry(
 
 
 def poll_for_session_completion(client: JulesClient, session_name: str, cfg: Config, run_deadline: float) -> str:
+    flush_commits()
     deadline = time.time() + cfg.max_poll_minutes * 60
+    schedule = make_schedule(cfg)
     while time.time() < deadline:
         if _out_of_time(run_deadline):
             return "PENDING"
-        session = client.get_session(session_name)
-        state = str(session.get("state") or session.get("status") or "").upper()
-        if state in {"COMPLETED", "FAILED", "CANCELLED"}:
+        state = probe_session_completion(client, session_name)
+        if state:
             return state
-        time.sleep(cfg.poll_seconds)
+        wait_for_next_poll(schedule, client, session_name, deadline)
     return "PENDING"
 
 
+def log_stalled_features(cfg: Config, store: BacklogStore) -> None:
+    store.feature_graph(cfg.epic_order)
+    for feature_id in store.duplicate_features:
+        log(f"Feature id {feature_id} is listed more than once; only the first entry is scheduled")
+    for feature_id, reason in store.stalled_features.items():
+        log(f"Feature {feature_id} cannot start: {reason}")
+
+
 def write_status(root: Path, store: BacklogStore, current_feature: str | None, notes: str = "") -> None:
     product = store.product.get("product", {})
     epics = store.epics.get("items", [])
@@ -263,7 +455,10 @@ def write_status(root: Path, store: BacklogStore, current_feature: str | None, n
     }
     feature_items = []
     for item in features:
-        feature_items.append({"id": item.get("id"), "status": item.get("status")})
+        entry = {"id": item.get("id"), "status": item.get("status")}
+        if str(item.get("id")) in store.stalled_features:
+            entry["stalled"] = store.stalled_features[str(item.get("id"))]
+        feature_items.append(entry)
 
     (root / "status" / "product_status.json").write_text(json.dumps(product_status, indent=2))
     (root / "status" / "feature_status.json").write_text(json.dumps({"items": feature_items}, indent=2))
@@ -278,6 +473,7 @@ def write_error(root: Path, error: Exception) -> None:
     (root / "status" / "last_error.json").write_text(json.dumps(payload, indent=2))
 
 
+@stage("merge")
 def handle_passed_review(
     cfg: Config,
     store: BacklogStore,
@@ -288,6 +484,7 @@ def handle_passed_review(
     store.update_feature_fields(feature_id, status="review", pr_url=pr_url, review_verdict="PASS")
     token = cfg.github_token
     if token and is_pr_merged(pr_url, token, cfg.github_api_url):
+        stage_journal().record(feature_id, STAGE_MERGED, pr_url=pr_url)
         store.update_feature_status(feature_id, "done")
         store.update_story_status(feature_id, "done")
         store.update_feature_fields(feature_id, review_verdict="PASS", merge_status="merged")
@@ -298,7 +495,11 @@ def handle_passed_review(
     if cfg.auto_merge and token:
         merge_result = merge_pr(pr_url, token, cfg.github_api_url, cfg.merge_method)
         message = str(merge_result.get("message", "")).strip()
+        stage_journal().record(
+            feature_id, STAGE_MERGE_ATTEMPT, pr_url=pr_url, merged=bool(merge_result.get("merged")), message=message
+        )
         if merge_result.get("merged") or ("already" in message.lower() and "merge" in message.lower()):
+            stage_journal().record(feature_id, STAGE_MERGED, pr_url=pr_url)
             store.update_feature_status(feature_id, "done")
             store.update_story_status(feature_id, "done")
             store.update_feature_fields(feature_id, review_verdict="PASS", merge_status="merged")
@@ -336,24 +537,38 @@ def handle_passed_review(
     return True
 
 
-def acceptance_for_stories(acceptance_items: list[dict[str, Any]], stories: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    story_ids = {story.get("id") for story in stories}
-    return [item for item in acceptance_items if item.get("story") in story_ids]
-
-
 def commit_backlog(cfg: Config, message: str) -> bool:
     paths = ["backlog"]
     if cfg.status_mode == "git":
         paths.append("status")
+    elif stage_journal().path.exists():
+        # Artifact status is never read back; resuming needs the journal in git.
+        paths.append(JOURNAL_FILE)
+    if cfg.batch_commits:
+        COMMIT_JOURNAL.record(message, paths)
+        return True
     return commit_paths(message, paths, push=True)
 
 
 def commit_status(cfg: Config, message: str) -> bool:
     if cfg.status_mode != "git":
         return False
+    if cfg.batch_commits:
+        COMMIT_JOURNAL.record(message, ["status"])
+        return True
     return commit_paths(message, ["status"], push=True)
 
 
+def agent1_prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def flush_commits() -> bool:
+    # Called before every long poll and on exit, so recorded state is pushed before we wait.
+    return COMMIT_JOURNAL.flush(push=True)
+
+
+@stage("agent1")
 def run_agent1(
     cfg: Config,
     store: BacklogStore,
@@ -372,7 +587,8 @@ def run_agent1(
     if session_name:
         log(f"Agent1 session (resume): {session_name}")
     else:
-        prompt = build_agent1_prompt(cfg.require(cfg.product_prompt, "PRODUCT_PROMPT"), mode=mode, existing=existing)
+        product_prompt = cfg.require(cfg.product_prompt, "PRODUCT_PROMPT")
+        prompt = build_agent1_prompt(product_prompt, mode=mode, existing=existing)
         session = client.create_session(
             prompt=prompt,
             source=cfg.require(cfg.source, "JULES_SOURCE"),
@@ -383,6 +599,10 @@ def run_agent1(
         )
         session_name = session_name_from(session)
         log(f"Agent1 session: {session_name}")
+        # Recorded before polling, so a crash mid-poll resumes this session instead of starting another.
+        store.update_product_fields(agent1_session=session_name, agent1_prompt=agent1_prompt_key(product_prompt))
+        store.save_all()
+        commit_backlog(cfg, "backlog: agent1 session")
         if cfg.require_plan_approval:
             client.approve_plan(session_name)
     payload = poll_for_backlog(client, session_name, cfg, run_deadline)
@@ -399,13 +619,13 @@ def run_agent1(
     return True, session_name
 
 
-def run_agent2(
+@stage("agent2")
+def start_agent2(
     cfg: Config,
     feature: dict[str, Any],
     stories: list[dict[str, Any]],
     acceptance: list[dict[str, Any]],
-    run_deadline: float,
-) -> tuple[str | None, str]:
+) -> tuple[JulesClient, str]:
     prompt = build_agent2_prompt(feature, stories, acceptance)
     client = JulesClient(cfg.require(cfg.key_dev, "JULES_KEY_DEV"), cfg.api_base)
     session = client.create_session(
@@ -418,12 +638,26 @@ def run_agent2(
     )
     session_name = session_name_from(session)
     log(f"Agent2 session: {session_name}")
+    stage_journal().record(feature.get("id"), STAGE_AGENT2_SESSION, session=session_name)
     if cfg.require_plan_approval:
         client.approve_plan(session_name)
+    return client, session_name
+
+
+@stage("agent2")
+def run_agent2(
+    cfg: Config,
+    feature: dict[str, Any],
+    stories: list[dict[str, Any]],
+    acceptance: list[dict[str, Any]],
+    run_deadline: float,
+) -> tuple[str | None, str]:
+    client, session_name = start_agent2(cfg, feature, stories, acceptance)
     pr_url = poll_for_pr_url(client, session_name, cfg, feature.get("id"), run_deadline)
     return pr_url, session_name
 
 
+@stage("agent2")
 def resume_agent2(
     cfg: Config,
     session_name: str,
@@ -446,13 +680,14 @@ def get_session_state_with_key(cfg: Config, api_key: str, session_name: str) ->
     return str(session.get("state") or session.get("status") or "UNKNOWN").upper()
 
 
-def run_agent2_fix(
+@stage("fix")
+def start_agent2_fix(
     cfg: Config,
     pr_url: str,
     review: dict[str, Any],
     branch: str | None,
-    run_deadline: float,
-) -> tuple[str, str]:
+    feature_id: str | None = None,
+) -> tuple[JulesClient, str]:
     prompt = build_agent2_fix_prompt(pr_url, review)
     client = JulesClient(cfg.require(cfg.key_dev, "JULES_KEY_DEV"), cfg.api_base)
     session = client.create_session(
@@ -465,32 +700,58 @@ def run_agent2_fix(
     )
     session_name = session_name_from(session)
     log(f"Agent2 fix session: {session_name}")
+    stage_journal().record(feature_id, STAGE_FIX_SESSION, session=session_name)
     if cfg.require_plan_approval:
         client.approve_plan(session_name)
+    return client, session_name
+
+
+@stage("fix")
+def run_agent2_fix(
+    cfg: Config,
+    pr_url: str,
+    review: dict[str, Any],
+    branch: str | None,
+    run_deadline: float,
+    feature_id: str | None = None,
+) -> tuple[str, str]:
+    client, session_name = start_agent2_fix(cfg, pr_url, review, branch, feature_id)
     state = poll_for_session_completion(client, session_name, cfg, run_deadline)
+    record_fix_state(feature_id, session_name, state)
     return state, session_name
 
 
-def resume_agent2_fix(cfg: Config, session_name: str, run_deadline: float) -> str:
+@stage("fix")
+def resume_agent2_fix(cfg: Config, session_name: str, run_deadline: float, feature_id: str | None = None) -> str:
     client = JulesClient(cfg.require(cfg.key_dev, "JULES_KEY_DEV"), cfg.api_base)
-    return poll_for_session_completion(client, session_name, cfg, run_deadline)
+    state = poll_for_session_completion(client, session_name, cfg, run_deadline)
+    record_fix_state(feature_id, session_name, state)
+    return state
 
 
-def run_agent3(
+def record_fix_state(feature_id: str | None, session_name: str, state: str) -> None:
+    # A fix that has not completed stays the pending stage, so the next run resumes it.
+    if state == "COMPLETED":
+        stage_journal().record(feature_id, STAGE_FIX_DONE, session=session_name, state=state)
+
+
+@stage("agent3")
+def start_agent3(
     cfg: Config,
     pr_url: str,
     feature: dict[str, Any],
     stories: list[dict[str, Any]],
     acceptance: list[dict[str, Any]],
     branch: str | None,
-    run_deadline: float,
-) -> dict[str, Any]:
-    prompt = build_agent3_prompt(pr_url, feature, stories, acceptance)
+    part: tuple[int, int] | None = None,
+) -> tuple[JulesClient, str]:
+    prompt = build_agent3_prompt(pr_url, feature, stories, acceptance, part if cfg.review_split == SPLIT_ACCEPTANCE else None)
     client = JulesClient(cfg.require(cfg.key_review, "JULES_KEY_REVIEW"), cfg.api_base)
+    reviewer = f"{part[0]}/{part[1]} " if part else ""
     session = client.create_session(
         prompt=prompt,
         source=cfg.require(cfg.source, "JULES_SOURCE"),
-        title=f"Agent3 Review {feature.get('id')}",
+        title=f"Agent3 Review {reviewer}{feature.get('id')}",
         starting_branch=branch or cfg.starting_branch,
         automation_mode=None,
         require_plan_approval=cfg.require_plan_approval,
@@ -499,192 +760,370 @@ def run_agent3(
     log(f"Agent3 session: {session_name}")
     if cfg.require_plan_approval:
         client.approve_plan(session_name)
-    return poll_for_review(client, session_name, cfg, run_deadline)
+    return client, session_name
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--dry-run", action="store_true")
-    args = parser.parse_args()
+def review_parts(
+    cfg: Config,
+    stories: list[dict[str, Any]],
+    acceptance: list[dict[str, Any]],
+) -> list[tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+    reviewers = max(cfg.reviewers, 1)
+    if cfg.review_split not in REVIEW_SPLITS:
+        raise ValueError(f"Unknown review split {cfg.review_split!r}; expected one of {', '.join(REVIEW_SPLITS)}")
+    if cfg.review_split != SPLIT_ACCEPTANCE:
+        return [(stories, acceptance)] * reviewers
+    parts = []
+    for chunk in split_acceptance(acceptance, reviewers):
+        story_ids = {item.get("story") for item in chunk}
+        parts.append(([story for story in stories if story.get("id") in story_ids] or stories, chunk))
+    if len(parts) < reviewers:
+        log(f"Only {len(parts)} acceptance slice(s) to review; starting {len(parts)} of {reviewers} reviewers")
+    return parts
+
+
+@stage("agent3")
+def start_review_panel(
+    cfg: Config,
+    pr_url: str,
+    feature: dict[str, Any],
+    stories: list[dict[str, Any]],
+    acceptance: list[dict[str, Any]],
+    branch: str | None,
+) -> tuple[JulesClient, list[str]]:
+    parts = review_parts(cfg, stories, acceptance)
+    # Fails on an unknown quorum before any session is started.
+    quorum_needed(cfg.review_quorum, len(parts))
+    started = [
+        start_agent3(
+            cfg,
+            pr_url,
+            feature,
+            part_stories,
+            part_acceptance,
+            branch,
+            (idx, len(parts)) if len(parts) > 1 else None,
+        )
+        for idx, (part_stories, part_acceptance) in enumerate(parts, 1)
+    ]
+    sessions = [session_name for _, session_name in started]
+    # One entry for the whole panel, so a restarted run resumes all of its reviewers.
+    stage_journal().record(feature.get("id"), STAGE_REVIEW_SESSION, sessions=sessions, pr_url=pr_url)
+    return started[0][0], sessions
 
-    cfg = Config.from_env(dry_run=args.dry_run)
-    run_deadline = time.time() + cfg.run_max_minutes * 60
-    root = Path.cwd()
-    store = BacklogStore(root)
-    store.load()
 
-    try:
-        agent1_mode = cfg.agent1_mode if cfg.agent1_mode in ("replace", "append") else "replace"
+def pending_review_sessions(feature_id: str | None) -> list[str] | None:
+    # Review sessions still waiting for a verdict; journals written before panels hold one "session".
+    journal = stage_journal()
+    sessions = journal.pending(feature_id, STAGE_REVIEW_SESSION, "sessions")
+    if sessions:
+        return [str(name) for name in sessions]
+    session = journal.pending(feature_id, STAGE_REVIEW_SESSION, "session")
+    return [str(session)] if session else None
 
-        if not cfg.product_prompt:
-            event_path = os.getenv("GITHUB_EVENT_PATH")
-            if event_path:
-                prompt, mode = prompt_from_event(event_path)
-                cfg.product_prompt = prompt
-                if mode:
-                    agent1_mode = mode
 
-        product_meta = store.product.get("product", {})
-        agent1_session = product_meta.get("agent1_session")
-        if cfg.product_prompt or agent1_session:
-            log("Running Agent 1 (backlog)...")
-            if cfg.dry_run:
-                log("Dry run: skipping Agent 1 API call")
-            else:
-                ok, session_name = run_agent1(
-                    cfg,
-                    store,
-                    agent1_mode,
-                    run_deadline,
-                    session_name=agent1_session if not cfg.product_prompt else None,
-                )
-                if not ok:
-                    state = None
-                    if session_name:
-                        state = get_session_state_with_key(cfg, cfg.require(cfg.key_arch, "JULES_KEY_ARCH"), session_name)
-                    store.update_product_fields(agent1_session=session_name, agent1_state=state)
-                    store.save_all()
-                    write_status(root, store, None, notes="Agent1 backlog pending")
-                    commit_backlog(cfg, "backlog: pending agent1")
-                    return 0
-                store.update_product_fields(agent1_session=None, agent1_state="COMPLETED")
-                store.save_all()
-                write_status(root, store, None, notes=f"Agent1 backlog updated ({agent1_mode})")
-                commit_backlog(cfg, "backlog: update from agent1")
-
-        feature = store.next_review_feature() or store.next_ready_feature()
-        if not feature:
-            log("No ready features found")
-            write_status(root, store, None, notes="No ready features")
-            commit_status(cfg, "status: no ready features")
-            return 0
+@stage("agent3")
+def run_agent3(
+    cfg: Config,
+    pr_url: str,
+    feature: dict[str, Any],
+    stories: list[dict[str, Any]],
+    acceptance: list[dict[str, Any]],
+    branch: str | None,
+    run_deadline: float,
+    sessions: list[str] | None = None,
+) -> dict[str, Any]:
+    if sessions:
+        log(f"Resuming Agent3 session(s): {', '.join(sessions)}")
+        client = JulesClient(cfg.require(cfg.key_review, "JULES_KEY_REVIEW"), cfg.api_base)
+    else:
+        client, sessions = start_review_panel(cfg, pr_url, feature, stories, acceptance, branch)
+    review = poll_for_review_panel(client, sessions, cfg, run_deadline)
+    record_review_verdict(feature.get("id"), sessions, review)
+    return review
 
-        feature_id = feature.get("id")
-        pr_url = feature.get("pr_url")
-        agent2_session = feature.get("agent2_session")
-        agent2_fix_session = feature.get("agent2_fix_session")
-        log(f"Processing feature {feature_id}")
-        if (
-            feature.get("status") == "review"
-            and normalize_verdict(str(feature.get("review_verdict", ""))) == "PASS"
-            and pr_url
-        ):
-            handle_passed_review(cfg, store, root, feature_id, pr_url)
-            return 0
-        if (
-            feature.get("status") == "review"
-            and normalize_verdict(str(feature.get("review_verdict", ""))) == "NEEDS_CHANGES"
-            and agent2_fix_session
-        ):
-            fix_state = resume_agent2_fix(cfg, agent2_fix_session, run_deadline)
-            if fix_state != "COMPLETED":
-                store.update_feature_fields(
-                    feature_id,
-                    status="review",
-                    agent2_fix_session=agent2_fix_session,
-                    agent2_fix_state=fix_state,
-                )
+
+def pr_head_ref(cfg: Config, feature_id: str | None, pr_url: str) -> str | None:
+    state = stage_journal().state(feature_id)
+    if state.get("pr_url") == pr_url and state.get("head_ref"):
+        return str(state["head_ref"])
+    pr_info = get_pr_info(pr_url, cfg.require(cfg.github_token, "GITHUB_TOKEN"), cfg.github_api_url)
+    head_ref = pr_info.get("head_ref")
+    stage_journal().record(feature_id, STAGE_PR_FOUND, pr_url=pr_url, head_ref=head_ref)
+    return head_ref
+
+
+def record_review_verdict(feature_id: str | None, sessions: list[str], review: dict[str, Any]) -> None:
+    # No verdict yet leaves the review session(s) as the pending stage.
+    verdict = normalize_verdict(str(review.get("verdict", "")))
+    if verdict != "PENDING":
+        stage_journal().record(feature_id, STAGE_REVIEW_VERDICT, sessions=sessions, verdict=verdict)
+
+
+def setup_runtime(cfg: Config, root: Path) -> None:
+    set_backend(cfg.git_backend)
+    # Before configure_session: the cassette is mounted into the shared HTTP session.
+    cassette = configure_cassette(cfg.cassette, cfg.cassette_mode, cfg.cassette_latency)
+    replay = cassette is not None and cassette.mode == "replay"
+    if cassette is not None:
+        log(f"HTTP cassette: {cassette.mode} {cassette.path}")
+    set_push(not replay)
+    configure_governor(cfg.api_rpm, pace=not replay, max_wait=cfg.api_max_wait)
+    configure_session(
+        pool_connections=cfg.http_pool_connections,
+        pool_maxsize=cfg.http_pool_maxsize,
+        pool_block=cfg.http_pool_block,
+        keep_alive=cfg.http_keep_alive,
+    )
+    if not replay:
+        start_inbox(cfg)
+    configure_cache(root / CACHE_DIR / GITHUB_CACHE_FILE if cfg.github_cache else None)
+    open_journal(root)
+    reset_metrics()
+
+
+def write_run_report(cfg: Config, root: Path) -> None:
+    try:
+        write_report(root, cfg.metrics_prom, extra={"rate_budget": governor().usage()})
+    except OSError as exc:
+        log(f"Could not write metrics report: {exc}")
+
+
+def teardown_runtime() -> None:
+    # A failed push or cache write must not mask the run's exception or skip the closes below.
+    try:
+        flush_commits()
+    except Exception as exc:
+        log(f"Could not push recorded commits: {exc}")
+    try:
+        save_cache()
+    except OSError as exc:
+        log(f"Could not save GitHub response cache: {exc}")
+    log_rate_usage()
+    stop_inbox()
+    close_session()
+    close_cassette()
+
+
+def run_cycle(cfg: Config, store: BacklogStore, root: Path, run_deadline: float, agent1_mode: str) -> int:
+    governor().set_deadline(run_deadline - 60)
+    product_meta = store.product.get("product", {})
+    agent1_session = product_meta.get("agent1_session")
+    resume_session = agent1_session
+    if cfg.product_prompt and product_meta.get("agent1_prompt") != agent1_prompt_key(cfg.product_prompt):
+        # The same prompt again (e.g. a requeued intake) resumes its session; a new one starts afresh.
+        resume_session = None
+    if cfg.product_prompt or agent1_session:
+        log("Running Agent 1 (backlog)...")
+        if cfg.dry_run:
+            log("Dry run: skipping Agent 1 API call")
+        else:
+            ok, session_name = run_agent1(
+                cfg,
+                store,
+                agent1_mode,
+                run_deadline,
+                session_name=resume_session,
+            )
+            if not ok:
+                state = None
+                if session_name:
+                    state = get_session_state_with_key(cfg, cfg.require(cfg.key_arch, "JULES_KEY_ARCH"), session_name)
+                store.update_product_fields(agent1_session=session_name, agent1_state=state)
                 store.save_all()
-                write_status(root, store, feature_id, notes="Agent2 fix pending")
-                commit_backlog(cfg, f"backlog: fix pending {feature_id}")
+                write_status(root, store, None, notes="Agent1 backlog pending")
+                commit_backlog(cfg, "backlog: pending agent1")
                 return 0
-        if feature.get("status") != "review":
-            store.update_feature_status(feature_id, "in_progress")
+            store.clear_product_fields("agent1_session", "agent1_prompt")
+            store.update_product_fields(agent1_state="COMPLETED")
             store.save_all()
-            write_status(root, store, feature_id, notes="Feature in progress")
-            commit_backlog(cfg, f"backlog: start feature {feature_id}")
+            write_status(root, store, None, notes=f"Agent1 backlog updated ({agent1_mode})")
+            commit_backlog(cfg, "backlog: update from agent1")
 
-        stories = store.get_stories_for_feature(feature_id)
-        acceptance = acceptance_for_stories(store.acceptance.get("items", []), stories)
+    reconcile_review_features(cfg, store, root)
+    log_stalled_features(cfg, store)
 
-        if cfg.dry_run:
-            log("Dry run: skipping Agent 2/3 API calls")
-            return 0
+    if cfg.concurrency > 1 and not cfg.dry_run:
+        # Imported lazily: the engine is built from this module's stage helpers.
+        from .engine import run_features
 
-        if not pr_url and agent2_session:
-            pr_url = resume_agent2(cfg, agent2_session, feature_id, run_deadline)
-        if not pr_url:
-            pr_url, agent2_session = run_agent2(cfg, feature, stories, acceptance, run_deadline)
-            store.update_feature_fields(feature_id, agent2_session=agent2_session)
-            store.save_all()
-            commit_backlog(cfg, f"backlog: agent2 session {feature_id}")
-        if not pr_url:
-            log("PR not ready; leaving feature in progress.")
-            agent2_state = None
-            if agent2_session:
-                agent2_state = get_session_state(cfg, agent2_session)
+        return run_features(cfg, store, root, run_deadline)
+
+    feature = store.next_review_feature() or store.next_ready_feature(cfg.epic_order)
+    if not feature:
+        log("No ready features found")
+        write_status(root, store, None, notes="No ready features")
+        commit_status(cfg, "status: no ready features")
+        return 0
+
+    feature_id = feature.get("id")
+    pr_url = feature.get("pr_url")
+    agent2_session = feature.get("agent2_session")
+    agent2_fix_session = feature.get("agent2_fix_session")
+    # The journal knows about sessions started after the last backlog checkpoint.
+    journal = stage_journal()
+    pending_fix = journal.pending(feature_id, STAGE_FIX_SESSION, "session")
+    review_sessions = pending_review_sessions(feature_id)
+    agent2_session = agent2_session or journal.pending(feature_id, STAGE_AGENT2_SESSION, "session")
+    log(f"Processing feature {feature_id}")
+    if (
+        feature.get("status") == "review"
+        and normalize_verdict(str(feature.get("review_verdict", ""))) == "PASS"
+        and pr_url
+    ):
+        handle_passed_review(cfg, store, root, feature_id, pr_url)
+        return 0
+    if feature.get("status") == "review" and (
+        pending_fix
+        or (normalize_verdict(str(feature.get("review_verdict", ""))) == "NEEDS_CHANGES" and agent2_fix_session)
+    ):
+        agent2_fix_session = pending_fix or agent2_fix_session
+        fix_state = resume_agent2_fix(cfg, agent2_fix_session, run_deadline, feature_id)
+        if fix_state != "COMPLETED":
             store.update_feature_fields(
                 feature_id,
-                status="in_progress",
-                agent2_session=agent2_session,
-                agent2_state=agent2_state,
+                status="review",
+                agent2_fix_session=agent2_fix_session,
+                agent2_fix_state=fix_state,
             )
             store.save_all()
-            write_status(root, store, feature_id, notes="PR pending")
-            commit_backlog(cfg, f"backlog: pr pending {feature_id}")
+            write_status(root, store, feature_id, notes="Agent2 fix pending")
+            commit_backlog(cfg, f"backlog: fix pending {feature_id}")
             return 0
+    if feature.get("status") != "review":
+        if feature.get("status") != "in_progress":
+            journal.record(feature_id, STAGE_FEATURE_STARTED)
+        store.update_feature_status(feature_id, "in_progress")
+        store.save_all()
+        write_status(root, store, feature_id, notes="Feature in progress")
+        commit_backlog(cfg, f"backlog: start feature {feature_id}")
+
+    stories = store.get_stories_for_feature(feature_id)
+    acceptance = store.acceptance_for_stories(stories)
+
+    if cfg.dry_run:
+        log("Dry run: skipping Agent 2/3 API calls")
+        return 0
+
+    if not pr_url and agent2_session:
+        pr_url = resume_agent2(cfg, agent2_session, feature_id, run_deadline)
+    if not pr_url:
+        pr_url, agent2_session = run_agent2(cfg, feature, stories, acceptance, run_deadline)
+        store.update_feature_fields(feature_id, agent2_session=agent2_session)
+        store.save_all()
+        commit_backlog(cfg, f"backlog: agent2 session {feature_id}")
+    if not pr_url:
+        log("PR not ready; leaving feature in progress.")
+        agent2_state = None
+        if agent2_session:
+            agent2_state = get_session_state(cfg, agent2_session)
+        store.update_feature_fields(
+            feature_id,
+            status="in_progress",
+            agent2_session=agent2_session,
+            agent2_state=agent2_state,
+        )
+        store.save_all()
+        write_status(root, store, feature_id, notes="PR pending")
+        commit_backlog(cfg, f"backlog: pr pending {feature_id}")
+        return 0
+
+    log(f"PR created: {pr_url}")
+    store.update_feature_fields(feature_id, status="review", pr_url=pr_url)
+    store.save_all()
+    write_status(root, store, feature_id, notes="Feature in review")
+    commit_backlog(cfg, f"backlog: review feature {feature_id}")
+
+    head_ref = pr_head_ref(cfg, feature_id, pr_url)
+    review, verdict = review_with_retry(
+        cfg,
+        pr_url,
+        feature,
+        stories,
+        acceptance,
+        head_ref,
+        run_deadline,
+        resume_sessions=review_sessions,
+    )
 
-        log(f"PR created: {pr_url}")
-        store.update_feature_fields(feature_id, status="review", pr_url=pr_url)
+    if verdict == "PENDING":
+        log("Review pending; no verdict found. Leaving feature in review state.")
+        store.update_feature_fields(feature_id, status="review", pr_url=pr_url, review_verdict="PENDING")
         store.save_all()
-        write_status(root, store, feature_id, notes="Feature in review")
-        commit_backlog(cfg, f"backlog: review feature {feature_id}")
+        write_status(root, store, feature_id, notes="Review pending (no verdict)")
+        commit_backlog(cfg, f"backlog: review pending {feature_id}")
+        return 0
 
-        pr_info = get_pr_info(pr_url, cfg.require(cfg.github_token, "GITHUB_TOKEN"), cfg.github_api_url)
+    if verdict == "NEEDS_CHANGES":
+        log("Reviewer requested changes")
+        fix_state, fix_session = run_agent2_fix(cfg, pr_url, review, head_ref, run_deadline, feature_id)
+        store.update_feature_fields(
+            feature_id,
+            status="review",
+            agent2_fix_session=fix_session,
+            agent2_fix_state=fix_state,
+        )
+        store.save_all()
+        commit_backlog(cfg, f"backlog: fix session {feature_id}")
+        if fix_state != "COMPLETED":
+            write_status(root, store, feature_id, notes="Agent2 fix pending")
+            return 0
         review, verdict = review_with_retry(
             cfg,
             pr_url,
             feature,
             stories,
             acceptance,
-            pr_info.get("head_ref"),
+            head_ref,
             run_deadline,
         )
 
-        if verdict == "PENDING":
-            log("Review pending; no verdict found. Leaving feature in review state.")
-            store.update_feature_fields(feature_id, status="review", pr_url=pr_url, review_verdict="PENDING")
-            store.save_all()
-            write_status(root, store, feature_id, notes="Review pending (no verdict)")
-            commit_backlog(cfg, f"backlog: review pending {feature_id}")
-            return 0
+    if verdict != "PASS":
+        store.update_feature_fields(feature_id, status="review", pr_url=pr_url, review_verdict=verdict)
+        store.save_all()
+        write_status(root, store, feature_id, notes=f"Review verdict: {verdict}")
+        commit_backlog(cfg, f"backlog: review verdict {feature_id}")
+        return 0
+    handle_passed_review(cfg, store, root, feature_id, pr_url)
+    return 0
 
-        if verdict == "NEEDS_CHANGES":
-            log("Reviewer requested changes")
-            fix_state, fix_session = run_agent2_fix(cfg, pr_url, review, pr_info.get("head_ref"), run_deadline)
-            store.update_feature_fields(
-                feature_id,
-                status="review",
-                agent2_fix_session=fix_session,
-                agent2_fix_state=fix_state,
-            )
-            store.save_all()
-            commit_backlog(cfg, f"backlog: fix session {feature_id}")
-            if fix_state != "COMPLETED":
-                write_status(root, store, feature_id, notes="Agent2 fix pending")
-                return 0
-            review, verdict = review_with_retry(
-                cfg,
-                pr_url,
-                feature,
-                stories,
-                acceptance,
-                pr_info.get("head_ref"),
-                run_deadline,
-            )
 
-        if verdict != "PASS":
-            store.update_feature_fields(feature_id, status="review", pr_url=pr_url, review_verdict=verdict)
-            store.save_all()
-            write_status(root, store, feature_id, notes=f"Review verdict: {verdict}")
-            commit_backlog(cfg, f"backlog: review verdict {feature_id}")
-            return 0
-        handle_passed_review(cfg, store, root, feature_id, pr_url)
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    cfg = Config.from_env(dry_run=args.dry_run)
+    run_deadline = time.time() + cfg.run_max_minutes * 60
+    root = Path.cwd()
+    setup_runtime(cfg, root)
+    store = BacklogStore(root, use_cache=cfg.backlog_cache)
+    store.load()
+
+    try:
+        agent1_mode = cfg.agent1_mode if cfg.agent1_mode in ("replace", "append") else "replace"
+
+        if not cfg.product_prompt:
+            event_path = os.getenv("GITHUB_EVENT_PATH")
+            if event_path:
+                prompt, mode = prompt_from_event(event_path)
+                cfg.product_prompt = prompt
+                if mode:
+                    agent1_mode = mode
+
+        return run_cycle(cfg, store, root, run_deadline, agent1_mode)
+    except RateLimitWait as exc:
+        log(f"Rate limited; stopping until the next run: {exc}")
+        write_status(root, store, None, notes=f"Rate limited: {exc}")
+        commit_status(cfg, "status: rate limited")
         return 0
     except Exception as exc:
         write_error(root, exc)
         commit_status(cfg, "status: record error")
         raise
+    finally:
+        write_run_report(cfg, root)
+        teardown_runtime()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+
+EPIC_ORDER_PRIORITY = "priority"
+EPIC_ORDER_STRICT = "strict"
+
+
+def dependency_ids(item: dict[str, Any]) -> list[str]:
+    value = item.get("depends_on") or []
+    if isinstance(value, str):
+        value = [value]
+    return [str(dep) for dep in value if dep]
+
+
+class FeatureGraph:
+    # Edges point from a feature to the features it waits on:
+    # - the feature's own depends_on list
+    # - every feature of the epics its epic lists in depends_on
+    # - with strict epic order, every feature of the epic that precedes it in epics.yaml
+    # A depends_on ID that names no feature (or, on an epic, no epic) blocks the feature until
+    # the backlog is fixed, rather than being dropped; stalled() reports those and the features
+    # left on a cycle. IDs compare as strings, so 7 and "7" are the same feature.
+    def __init__(
+        self,
+        epics: list[dict[str, Any]],
+        features: list[dict[str, Any]],
+        epic_order: str = EPIC_ORDER_PRIORITY,
+    ) -> None:
+        self.features: dict[str, dict[str, Any]] = {}
+        self.position: dict[str, int] = {}
+        # IDs listed more than once; only the first entry is scheduled.
+        self.duplicate_ids: list[str] = []
+        for idx, item in enumerate(features):
+            if not item.get("id"):
+                continue
+            feature_id = str(item["id"])
+            if feature_id in self.features:
+                if feature_id not in self.duplicate_ids:
+                    self.duplicate_ids.append(feature_id)
+                continue
+            self.features[feature_id] = item
+            self.position[feature_id] = idx
+
+        epic_ids = [str(epic.get("id")) for epic in epics if epic.get("id")]
+        self.epic_rank = {epic_id: idx for idx, epic_id in enumerate(epic_ids)}
+        by_epic: dict[str, list[str]] = {}
+        for feature_id, item in self.features.items():
+            by_epic.setdefault(str(item.get("epic")), []).append(feature_id)
+
+        epic_deps: dict[str, set[str]] = {}
+        unknown_epics: dict[str, list[str]] = {}
+        for epic in epics:
+            epic_id = epic.get("id")
+            if epic_id and str(epic_id) not in epic_deps:
+                own = set(dependency_ids(epic))
+                epic_deps[str(epic_id)] = own & set(self.epic_rank)
+                if own - epic_deps[str(epic_id)]:
+                    unknown_epics[str(epic_id)] = sorted(own - epic_deps[str(epic_id)])
+        if epic_order == EPIC_ORDER_STRICT:
+            for prev, epic_id in zip(epic_ids, epic_ids[1:]):
+                epic_deps[epic_id].add(prev)
+
+        self.deps: dict[str, set[str]] = {}
+        self.unknown_deps: dict[str, list[str]] = {}
+        self.unknown_epic_deps: dict[str, list[str]] = {}
+        for feature_id, item in self.features.items():
+            own = set(dependency_ids(item))
+            deps = {dep for dep in own if dep in self.features}
+            if own - deps:
+                self.unknown_deps[feature_id] = sorted(own - deps)
+            if str(item.get("epic")) in unknown_epics:
+                self.unknown_epic_deps[feature_id] = unknown_epics[str(item.get("epic"))]
+            for epic_dep in epic_deps.get(str(item.get("epic")), set()):
+                deps.update(by_epic.get(epic_dep, []))
+            deps.discard(feature_id)
+            self.deps[feature_id] = deps
+
+        self.dependents: dict[str, set[str]] = {feature_id: set() for feature_id in self.features}
+        for feature_id, deps in self.deps.items():
+            for dep in deps:
+                self.dependents[dep].add(feature_id)
+
+        order = self._topological_order()
+        self.cyclic = set(self.features) - set(order)
+        self.path_length = self._critical_path_lengths(order)
+
+    def is_done(self, feature_id: str) -> bool:
+        return self.features[feature_id].get("status") == "done"
+
+    def blockers(self, feature_id: str) -> list[str]:
+        pending = [dep for dep in self.deps.get(feature_id, set()) if not self.is_done(dep)]
+        unknown = self.unknown_deps.get(feature_id, []) + self.unknown_epic_deps.get(feature_id, [])
+        return sorted(pending + unknown)
+
+    def stalled(self) -> dict[str, str]:
+        # Unfinished features that can never start as the backlog stands, with the reason.
+        reasons: dict[str, str] = {}
+        for feature_id in self.features:
+            if self.is_done(feature_id):
+                continue
+            unknown = []
+            if feature_id in self.unknown_deps:
+                unknown.append("unknown feature(s) " + ", ".join(self.unknown_deps[feature_id]))
+            if feature_id in self.unknown_epic_deps:
+                unknown.append("unknown epic(s) " + ", ".join(self.unknown_epic_deps[feature_id]))
+            if unknown:
+                reasons[feature_id] = "depends on " + " and ".join(unknown)
+            elif feature_id in self.cyclic:
+                reasons[feature_id] = "on or behind a dependency cycle"
+        return reasons
+
+    def runnable(self, statuses: tuple[str, ...] = ("ready",)) -> list[dict[str, Any]]:
+        # Features whose prerequisites are all done, longest remaining chain first.
+        candidates = [
+            feature_id
+            for feature_id, item in self.features.items()
+            if item.get("status") in statuses and feature_id not in self.cyclic and not self.blockers(feature_id)
+        ]
+        candidates.sort(key=self._priority)
+        return [self.features[feature_id] for feature_id in candidates]
+
+    def _priority(self, feature_id: str) -> tuple[int, int, int]:
+        epic = str(self.features[feature_id].get("epic"))
+        return (
+            -self.path_length.get(feature_id, 0),
+            self.epic_rank.get(epic, len(self.epic_rank)),
+            self.position[feature_id],
+        )
+
+    def _topological_order(self) -> list[str]:
+        # Kahn's algorithm; features left out sit on (or behind) a dependency cycle.
+        remaining = {feature_id: len(deps) for feature_id, deps in self.deps.items()}
+        queue = deque(sorted((feature_id for feature_id, count in remaining.items() if count == 0), key=self.position.get))
+        order: list[str] = []
+        while queue:
+            feature_id = queue.popleft()
+            order.append(feature_id)
+            for dependent in self.dependents[feature_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    queue.append(dependent)
+        return order
+
+    def _critical_path_lengths(self, order: list[str]) -> dict[str, int]:
+        # Number of unfinished features on the longest chain that starts at each feature.
+        lengths: dict[str, int] = {}
+        for feature_id in reversed(order):
+            own = 0 if self.is_done(feature_id) else 1
+            downstream = [lengths[dep] for dep in self.dependents[feature_id] if dep in lengths]
+            lengths[feature_id] = own + max(downstream, default=0)
+        return lengths
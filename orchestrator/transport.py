@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cassette import CassetteAdapter, active_cassette, replaying
+from .events import ShutdownRequested, wait_for_shutdown
+from .metrics import current_stage, metrics, observe_http
+
+
+_SESSION: requests.Session | None = None
+# GitHub asks clients that hit a secondary rate limit without Retry-After to wait at least a minute.
+SECONDARY_LIMIT_SECONDS = 60.0
+
+
+def build_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    pool_block: bool = False,
+    keep_alive: bool = True,
+) -> requests.Session:
+    session = requests.Session()
+    pool = {"pool_connections": pool_connections, "pool_maxsize": pool_maxsize, "pool_block": pool_block, "max_retries": 0}
+    cassette = active_cassette()
+    adapter = CassetteAdapter(cassette, **pool) if cassette is not None else HTTPAdapter(**pool)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def configure_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    pool_block: bool = False,
+    keep_alive: bool = True,
+) -> requests.Session:
+    global _SESSION
+    if _SESSION is not None:
+        _SESSION.close()
+    _SESSION = build_session(pool_connections, pool_maxsize, pool_block, keep_alive)
+    return _SESSION
+
+
+def shared_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = build_session()
+    return _SESSION
+
+
+def close_session() -> None:
+    global _SESSION
+    if _SESSION is not None:
+        _SESSION.close()
+        _SESSION = None
+
+
+class RateLimitWait(Exception):
+    # Not a RuntimeError, so the stage fallbacks that absorb API errors let it reach the run loop.
+    def __init__(self, key: str, wait: float, allowed: float) -> None:
+        super().__init__(f"rate limit for {key} needs a {wait:.0f}s wait; only {max(allowed, 0):.0f}s allowed")
+        self.key = key
+        self.wait = wait
+
+
+class _Budget:
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(max(per_minute, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.reset_at: float | None = None
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+
+class RateGovernor:
+    # One token bucket per (host, credential), shared by every thread. A wait longer than
+    # max_wait, or past the deadline, raises RateLimitWait instead of sleeping.
+    def __init__(self, per_minute: int = 60, pace: bool = True, max_wait: float | None = None) -> None:
+        self.per_minute = max(per_minute, 1)
+        self.pace = pace
+        self.max_wait = max_wait
+        self.deadline: float | None = None
+        self._budgets: dict[str, _Budget] = {}
+        self._lock = threading.Lock()
+
+    def set_deadline(self, deadline: float | None) -> None:
+        self.deadline = deadline
+
+    def _budget(self, key: str) -> _Budget:
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets[key] = _Budget(self.per_minute)
+        return budget
+
+    def acquire(self, key: str) -> float:
+        # Reserve under the lock, sleep outside it, so callers queue in arrival order.
+        with self._lock:
+            budget = self._budget(key)
+            now = time.monotonic()
+            rate = self._rate(budget, now)
+            budget.tokens = min(budget.capacity, budget.tokens + (now - budget.updated) * rate)
+            budget.updated = now
+            budget.tokens -= 1
+            wait = max(-budget.tokens / rate, budget.blocked_until - now, 0.0)
+            if budget.reset_at is not None and budget.reset_at <= now:
+                budget.remaining = budget.reset_at = None
+            if budget.remaining is not None and budget.remaining <= 0 and budget.reset_at is not None:
+                wait = max(wait, budget.reset_at - now)
+            if not self.pace:
+                wait = 0.0
+            allowed = self._allowed_wait()
+            if wait > 0 and wait > allowed:
+                budget.tokens += 1
+                raise RateLimitWait(key, wait, allowed)
+            if budget.remaining is not None:
+                budget.remaining = max(budget.remaining - 1, 0)
+            budget.requests += 1
+            budget.waited += wait
+        if wait > 0 and wait_for_shutdown(wait):
+            raise ShutdownRequested()
+        return wait
+
+    def _allowed_wait(self) -> float:
+        allowed = self.max_wait if self.max_wait is not None else float("inf")
+        if self.deadline is not None:
+            allowed = min(allowed, self.deadline - time.time())
+        return allowed
+
+    def observe(self, key: str, resp: requests.Response) -> float | None:
+        headers = resp.headers
+        remaining = _int_header(headers, "X-RateLimit-Remaining")
+        limit = _int_header(headers, "X-RateLimit-Limit")
+        reset = _int_header(headers, "X-RateLimit-Reset")
+        retry_after = _retry_after(headers.get("Retry-After"))
+        with self._lock:
+            budget = self._budget(key)
+            now = time.monotonic()
+            if remaining is not None:
+                budget.remaining = remaining
+                budget.limit = limit
+                budget.reset_at = now + max(reset - time.time(), 0) if reset is not None else None
+                budget.tokens = min(budget.tokens, float(remaining))
+            delay: float | None = None
+            if resp.status_code == 429 or (resp.status_code == 403 and (retry_after is not None or remaining == 0)):
+                if retry_after is not None:
+                    delay = retry_after
+                elif remaining == 0 and budget.reset_at is not None:
+                    delay = budget.reset_at - now
+            elif resp.status_code == 403 and "secondary rate limit" in resp.text.lower():
+                delay = SECONDARY_LIMIT_SECONDS
+            if delay is not None:
+                delay = max(delay, 0.0)
+                budget.blocked_until = max(budget.blocked_until, now + delay)
+                budget.throttled += 1
+            return delay
+
+    def usage(self) -> dict[str, dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: {
+                    "requests": budget.requests,
+                    "throttled": budget.throttled,
+                    "waited_seconds": round(budget.waited, 3),
+                    "tokens": round(min(budget.capacity, budget.tokens + (now - budget.updated) * self._rate(budget, now)), 3),
+                    "limit": budget.limit,
+                    "remaining": budget.remaining,
+                    "reset_in_seconds": round(budget.reset_at - now, 1) if budget.reset_at is not None else None,
+                }
+                for key, budget in self._budgets.items()
+            }
+
+    def _rate(self, budget: _Budget, now: float) -> float:
+        rate = budget.capacity / 60.0
+        if budget.remaining and budget.reset_at is not None and budget.reset_at > now:
+            rate = min(rate, budget.remaining / (budget.reset_at - now))
+        return max(rate, 1e-3)
+
+
+_GOVERNOR = RateGovernor()
+
+
+def configure_governor(per_minute: int, pace: bool = True, max_wait: float | None = None) -> RateGovernor:
+    global _GOVERNOR
+    _GOVERNOR = RateGovernor(per_minute, pace, max_wait)
+    return _GOVERNOR
+
+
+def governor() -> RateGovernor:
+    return _GOVERNOR
+
+
+def rate_key(url: str, credential: str) -> str:
+    digest = hashlib.sha256(credential.encode("utf-8")).hexdigest()[:8]
+    return f"{urlsplit(url).netloc}/{digest}"
+
+
+def backoff(seconds: float) -> None:
+    if not replaying():
+        time.sleep(seconds)
+
+
+def timed_request(session: requests.Session, service: str, method: str, url: str, **kwargs: Any) -> requests.Response:
+    start = time.perf_counter()
+    status: int | str = "error"
+    try:
+        resp = session.request(method, url, **kwargs)
+        status = resp.status_code
+        return resp
+    finally:
+        observe_http(service, method, url, status, time.perf_counter() - start)
+
+
+def governed_request(
+    session: requests.Session,
+    method: str,
+    url: str,
+    credential: str,
+    max_retries: int = 3,
+    service: str = "http",
+    **kwargs: Any,
+) -> requests.Response:
+    key = rate_key(url, credential)
+    for attempt in range(1, max_retries + 1):
+        waited = _GOVERNOR.acquire(key)
+        if waited:
+            metrics().observe("rate_wait_seconds", waited, service=service, stage=current_stage())
+        resp = timed_request(session, service, method, url, **kwargs)
+        if _GOVERNOR.observe(key, resp) is None or attempt == max_retries:
+            return resp
+        metrics().incr("http_retries", service=service, reason=resp.status_code, stage=current_stage())
+    return resp
+
+
+def _int_header(headers: Any, name: str) -> int | None:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
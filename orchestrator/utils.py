@@ -1,13 +1,33 @@
 from __future__ import annotations
 
+import json
+import os
+import re
+import tempfile
 from datetime import datetime, timezone
-from typing import Any, Iterable
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
 
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
 
+def atomic_write(path: Path, data: str | bytes, mode: int | None = None) -> None:
+    # Write a sibling temp file and rename it over the target so readers never see a partial file.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if isinstance(data, bytes) else "w") as handle:
+            handle.write(data)
+        if mode is not None:
+            os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
 def iter_strings(obj: Any) -> Iterable[str]:
     if isinstance(obj, str):
         yield obj
@@ -25,3 +45,123 @@ def extract_between(text: str, start_marker: str, end_marker: str) -> str | None
     if start == -1 or end == -1 or end <= start:
         return None
     return text[start + len(start_marker) : end].strip()
+
+
+_JSON_SCAN_RE = re.compile(r'[{}"\\\n]')
+_JSON_DECODER = json.JSONDecoder()
+
+
+def iter_json_objects(
+    text: str,
+    predicate: Callable[[dict[str, Any]], bool] | None = None,
+) -> Iterator[dict[str, Any]]:
+    # Single pass over the structural characters only. Each top-level {...} span is decoded
+    # on its own once its brace closes; a span that parses skips everything nested inside it.
+    # A span that does not parse may have been mis-tokenized by a stray "{" or quote, so from
+    # there on every "{" is tried in turn, as the old raw_decode loop did, until one decodes
+    # and the span scan can take over again. A span that never closes has already scanned to
+    # the end of the text; scanning again after each later object would walk to the end each
+    # time, so the rest of the text is only tried brace by brace.
+    pos = 0
+    span_scan = True
+    while True:
+        if span_scan:
+            start, end = _next_span(text, pos)
+            if start is None:
+                return
+            if end is None:
+                span_scan = False
+            else:
+                try:
+                    # Decode the span on its own: a decode error on the full text would
+                    # count newlines from offset 0 and make failed candidates quadratic.
+                    obj, obj_len = _JSON_DECODER.raw_decode(text[start:end])
+                except json.JSONDecodeError:
+                    pass
+                else:
+                    if isinstance(obj, dict) and (predicate is None or predicate(obj)):
+                        yield obj
+                    pos = start + obj_len
+                    continue
+            pos = start + 1
+        found = _decode_next(text, pos)
+        if found is None:
+            return
+        obj, pos = found
+        if isinstance(obj, dict) and (predicate is None or predicate(obj)):
+            yield obj
+
+
+def _decode_next(text: str, pos: int) -> tuple[Any, int] | None:
+    # First value that decodes at a "{" at or after pos, with its end offset.
+    idx = text.find("{", pos)
+    while idx != -1:
+        found = _decode_at(text, idx)
+        if found is not None:
+            return found
+        idx = text.find("{", idx + 1)
+    return None
+
+
+_DECODE_WINDOW = 4096
+# Longest token a window edge can cut short without an "Unterminated string" error ("-Infinity").
+_DECODE_EDGE = 16
+
+
+def _decode_at(text: str, idx: int) -> tuple[Any, int] | None:
+    # Decode a window starting at idx rather than the full text, so a failed candidate costs
+    # only as much as the parser read. The window doubles while the failure could be an
+    # artefact of the cut: an open string or a token that runs into the window edge.
+    size = _DECODE_WINDOW
+    while True:
+        window = text[idx : idx + size]
+        try:
+            obj, end = _JSON_DECODER.scan_once(window, 0)
+            return obj, idx + end
+        except StopIteration as exc:
+            err_pos, truncated = exc.value, False
+        except json.JSONDecodeError as exc:
+            err_pos, truncated = exc.pos, exc.msg.startswith("Unterminated string")
+        if idx + size >= len(text) or not (truncated or err_pos >= size - _DECODE_EDGE):
+            return None
+        size *= 2
+
+
+def _next_span(text: str, pos: int) -> tuple[int | None, int | None]:
+    # (start, end) of the first top-level brace span at or after pos; end is None when the
+    # text ends before it closes, start is None when there is no "{" left.
+    depth = 0
+    start: int | None = None
+    in_string = False
+    skip_until = -1
+    for match in _JSON_SCAN_RE.finditer(text, pos):
+        idx = match.start()
+        if idx < skip_until:
+            continue
+        ch = match.group()
+        if in_string:
+            if ch == "\\":
+                skip_until = idx + 2
+            elif ch in ('"', "\n"):
+                # JSON strings cannot hold raw newlines, so a newline ends a runaway string.
+                in_string = False
+            continue
+        if ch == "{":
+            if depth == 0:
+                start = idx
+            depth += 1
+        elif ch == "}":
+            if depth:
+                depth -= 1
+                if depth == 0:
+                    return start, idx + 1
+        elif ch == '"' and depth:
+            in_string = True
+    return start, None
+
+
+def find_json_object(
+    text: str,
+    predicate: Callable[[dict[str, Any]], bool] | None = None,
+) -> dict[str, Any] | None:
+    return next(iter_json_objects(text, predicate), None)
@@ -0,0 +1,105 @@
+"""Load/save a synthetic backlog with the libyaml and pure-Python YAML paths.
+
+Usage: python scripts/bench_backlog_yaml.py [--stories 10000] [--unicode]
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from orchestrator.backlog import HAS_LIBYAML, BacklogStore  # noqa: E402
+
+
+def synthetic_payload(story_count, unicode_text):
+    suffix = " — café" if unicode_text else ""
+    features_per_epic = 10
+    stories_per_feature = 5
+    feature_count = max(story_count // stories_per_feature, 1)
+    epic_count = max(feature_count // features_per_epic, 1)
+    epics = [
+        {"id": f"E{e}", "title": f"Epic {e}{suffix}", "status": "planned", "description": "Epic description " * 4}
+        for e in range(epic_count)
+    ]
+    features = [
+        {
+            "id": f"F{f}",
+            "epic": f"E{f // features_per_epic % epic_count}",
+            "title": f"Feature {f}",
+            "status": "ready",
+            "description": f"Feature {f} lets the user do something useful{suffix}. " * 3,
+        }
+        for f in range(feature_count)
+    ]
+    stories = [
+        {
+            "id": f"S{s}",
+            "feature": f"F{s // stories_per_feature % feature_count}",
+            "title": f"Story {s}",
+            "status": "ready",
+            "description": f"As a user I want story {s} so that the feature works{suffix}.",
+        }
+        for s in range(story_count)
+    ]
+    acceptance = [
+        {"story": f"S{s}", "criteria": [f"Criterion {c} for story {s}{suffix}" for c in range(3)]}
+        for s in range(story_count)
+    ]
+    product = {"id": "prod-001", "name": "Bench", "owner": "product-owner", "status": "active"}
+    return {"product": product, "epics": epics, "features": features, "stories": stories, "acceptance": acceptance}
+
+
+def run_once(root, use_libyaml):
+    store = BacklogStore(root)
+    store.use_libyaml = use_libyaml
+    start = time.perf_counter()
+    store.load()
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    store._disk_digest.clear()  # force real serialisation + write of every section
+    store.save_all(force=True)
+    save_seconds = time.perf_counter() - start
+    snapshot = {path.name: path.read_bytes() for path in sorted((root / "backlog").glob("*.yaml"))}
+    return load_seconds, save_seconds, snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stories", type=int, default=10000)
+    parser.add_argument("--unicode", action="store_true", help="include non-ASCII text (forces the pure-Python dumper)")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-backlog-"))
+    try:
+        seed = BacklogStore(tmp)
+        seed.apply_agent1_payload(synthetic_payload(args.stories, args.unicode))
+        seed.save_all()
+        size = sum(path.stat().st_size for path in (tmp / "backlog").glob("*.yaml"))
+        print(f"{args.stories} stories, {size / 1024 / 1024:.1f} MB of YAML, libyaml available: {HAS_LIBYAML}")
+
+        results = {}
+        modes = [("pure", False)] + ([("libyaml", True)] if HAS_LIBYAML else [])
+        for name, use_libyaml in modes:
+            results[name] = run_once(tmp, use_libyaml)
+            load_seconds, save_seconds, _ = results[name]
+            print(f"{name:<8} load {load_seconds:7.3f}s  save {save_seconds:7.3f}s")
+
+        if "libyaml" in results:
+            if results["libyaml"][2] != results["pure"][2]:
+                raise SystemExit("libyaml and pure-Python output differ")
+            print("output byte-identical between paths")
+
+        BacklogStore(tmp, use_cache=True).load()  # cold: parses YAML and writes the snapshot
+        cached = BacklogStore(tmp, use_cache=True)
+        start = time.perf_counter()
+        cached.load()
+        print(f"snapshot load {time.perf_counter() - start:7.3f}s")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
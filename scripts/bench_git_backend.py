@@ -0,0 +1,105 @@
+"""Time commit_paths() with the subprocess and plumbing git backends.
+
+Each backend gets a fresh clone of a local bare repository used as "origin", then
+commits and pushes --commits backlog edits. Counts git processes per commit as well.
+
+Usage: python scripts/bench_git_backend.py [--commits 30]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from orchestrator import git_utils  # noqa: E402
+
+
+def git(args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def make_origin(tmp):
+    origin = tmp / "origin.git"
+    seed = tmp / "seed"
+    git(["init", "-q", "--bare", str(origin)], tmp)
+    git(["clone", "-q", str(origin), str(seed)], tmp)
+    shutil.copytree(ROOT / "backlog", seed / "backlog")
+    (seed / "status").mkdir()
+    (seed / "status" / "product_status.json").write_text("{}\n")
+    git(["-c", "user.name=bench", "-c", "user.email=bench@example.com", "add", "-A"], seed)
+    git(["-c", "user.name=bench", "-c", "user.email=bench@example.com", "commit", "-qm", "seed"], seed)
+    git(["push", "-q", "origin", "HEAD"], seed)
+    return origin
+
+
+class ProcessCounter:
+    def __init__(self):
+        self.count = 0
+        self._run = subprocess.run
+
+    def __enter__(self):
+        def counting_run(*args, **kwargs):
+            self.count += 1
+            return self._run(*args, **kwargs)
+
+        subprocess.run = counting_run
+        return self
+
+    def __exit__(self, *exc):
+        subprocess.run = self._run
+
+
+def bench_backend(tmp, origin, backend, commits):
+    work = tmp / f"work-{backend}"
+    git(["clone", "-q", str(origin), str(work)], tmp)
+    git(["config", "user.name", "bench"], work)
+    git(["config", "user.email", "bench@example.com"], work)
+    cwd = os.getcwd()
+    os.chdir(work)
+    try:
+        git_utils.set_backend(backend)
+        features = work / "backlog" / "features.yaml"
+        base = features.read_text()
+        with ProcessCounter() as counter:
+            start = time.perf_counter()
+            for idx in range(commits):
+                features.write_text(base + f"# edit {backend} {idx}\n")
+                (work / "status" / "product_status.json").write_text(f'{{"run": {idx}}}\n')
+                if not git_utils.commit_paths(f"backlog: bench {backend} {idx}", ["backlog", "status"]):
+                    raise SystemExit(f"{backend}: nothing committed on iteration {idx}")
+            elapsed = time.perf_counter() - start
+        status = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True).stdout
+        if status.strip():
+            raise SystemExit(f"{backend}: working tree not clean after commits:\n{status}")
+    finally:
+        os.chdir(cwd)
+        git_utils.set_backend("subprocess")
+    return elapsed, counter.count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=30)
+    args = parser.parse_args()
+    tmp = Path(tempfile.mkdtemp(prefix="bench-git-"))
+    try:
+        origin = make_origin(tmp)
+        for backend in git_utils.GIT_BACKENDS:
+            elapsed, processes = bench_backend(tmp, origin, backend, args.commits)
+            print(
+                f"{backend:<10} {elapsed:7.3f}s total  {elapsed / args.commits * 1000:7.1f} ms/commit  "
+                f"{processes / args.commits:4.1f} git processes/commit"
+            )
+            # Next backend clones the updated origin and pushes on top of it.
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Compare the single-pass JSON extractor with the old raw_decode loop.
+
+Usage: python scripts/bench_json_extract.py [--sizes 1,2,5,10] [--legacy-max-mb 2]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from orchestrator.backlog import _extract_from_any_json as backlog_extract  # noqa: E402
+from orchestrator.review import _extract_from_any_json as review_extract  # noqa: E402
+
+
+def legacy_extract(text, predicate):
+    # The pre-scanner implementation: raw_decode on a fresh slice at every "{".
+    decoder = json.JSONDecoder()
+    idx = 0
+    text_len = len(text)
+    while idx < text_len:
+        if text[idx] != "{":
+            idx += 1
+            continue
+        try:
+            obj, end = decoder.raw_decode(text[idx:])
+        except json.JSONDecodeError:
+            idx += 1
+            continue
+        if isinstance(obj, dict) and predicate(obj):
+            return obj
+        idx += max(end, 1)
+    return None
+
+
+BACKLOG_KEYS = {"product", "epics", "features", "stories", "acceptance"}
+
+CHUNKS = [
+    "Planning the change to public/js/app.js before editing.\n",
+    "function render(state) { if (!state) { return; } el.textContent = state.msg; }\n",
+    json.dumps({"tool": "run_shell", "exit_code": 0, "stdout": "ok {braces} inside a string"}) + "\n",
+    # A diff hunk that opens a block without closing it, so the braces never balance.
+    "+function retry(fn) {\n+  const opts = {};\n",
+    'Agent said "use {curly} placeholders" in the template\n',
+    "const cfg = { retries: 3, delay: '{ms}' };\n",
+    json.dumps({"file": "public/js/crypto.js", "patch": "@@ -1,3 +1,4 @@\n+const iv = new Uint8Array(12);"}) + "\n",
+]
+
+
+def synthetic_log(size_mb, tail):
+    target = size_mb * 1024 * 1024
+    parts = []
+    total = 0
+    i = 0
+    while total < target:
+        chunk = CHUNKS[i % len(CHUNKS)]
+        parts.append(chunk)
+        total += len(chunk)
+        i += 1
+    parts.append(tail)
+    return "".join(parts)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1,2,5,10", help="comma separated log sizes in MB")
+    parser.add_argument(
+        "--legacy-max-mb",
+        type=float,
+        default=2,
+        help="skip the quadratic legacy loop above this size",
+    )
+    args = parser.parse_args()
+
+    review_tail = "BEGIN_REVIEW_JSON\n" + json.dumps({"verdict": "PASS", "blocking": [], "non_blocking": []})
+    backlog_tail = json.dumps({"product": {"id": "prod-001"}, "epics": [], "features": [], "stories": [], "acceptance": []})
+    cases = [
+        ("review", review_tail, review_extract, lambda obj: "verdict" in obj),
+        ("backlog", backlog_tail, backlog_extract, lambda obj: bool(BACKLOG_KEYS.intersection(obj.keys()))),
+    ]
+
+    print(f"{'case':<8} {'size':>6} {'scanner':>10} {'legacy':>10} {'speedup':>8}")
+    for size in [float(s) for s in args.sizes.split(",") if s]:
+        for name, tail, current, predicate in cases:
+            text = synthetic_log(size, tail)
+            found, new_seconds = timed(current, text)
+            if found is None:
+                raise SystemExit(f"{name} {size}MB: scanner found no payload")
+            if size <= args.legacy_max_mb:
+                expected, old_seconds = timed(legacy_extract, text, predicate)
+                if expected != found:
+                    raise SystemExit(f"{name} {size}MB: scanner and legacy results differ")
+                legacy_col = f"{old_seconds:9.3f}s"
+                speedup_col = f"{old_seconds / new_seconds:7.1f}x"
+            else:
+                legacy_col = f"{'skipped':>10}"
+                speedup_col = f"{'-':>8}"
+            print(f"{name:<8} {size:>5g}M {new_seconds:9.3f}s {legacy_col} {speedup_col}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Wake a waiting orchestrator stage for a Jules session.
+
+Posts to the event receiver (ORCH_EVENTS_PORT) or drops a file into the inbox
+directory (ORCH_EVENTS_DIR), e.g. from a webhook relay or a local stand-in.
+
+Usage: python scripts/send_event.py SESSION [--state COMPLETED] [--url http://127.0.0.1:8765/events | --dir DIR]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("session", help="session id or sessions/<id>")
+    parser.add_argument("--state", help="optional session state to include")
+    parser.add_argument("--url", help="event receiver URL")
+    parser.add_argument("--dir", help="inbox directory")
+    args = parser.parse_args()
+
+    event = {"session": args.session, "sent_at": time.time()}
+    if args.state:
+        event["state"] = args.state
+    if args.dir:
+        inbox = Path(args.dir)
+        inbox.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=inbox, prefix=".event-", suffix=".tmp")
+        with os.fdopen(fd, "w") as handle:
+            json.dump(event, handle)
+        os.replace(tmp_name, inbox / f"{time.time_ns()}.json")
+        return 0
+    url = args.url or f"http://127.0.0.1:{os.getenv('ORCH_EVENTS_PORT', '8765')}/events"
+    headers = {}
+    if os.getenv("ORCH_EVENTS_SECRET"):
+        headers["X-Orchestrator-Token"] = os.environ["ORCH_EVENTS_SECRET"]
+    resp = requests.post(url, json=event, headers=headers, timeout=10)
+    print(resp.status_code, resp.text)
+    return 0 if resp.status_code < 300 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
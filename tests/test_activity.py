@@ -0,0 +1,65 @@
+import pytest
+
+from orchestrator.activity import MAX_MARKER_PAYLOAD, WANT_PR, WANT_REVIEW, Activity, ActivityScan, MarkerMatcher
+
+
+def bash_activity(command, output):
+    return Activity.from_api(
+        {"name": "a1", "progressUpdated": {"title": "Ran a command"}, "artifacts": [{"bashOutput": {"command": command, "output": output}}]}
+    )
+
+
+def branch_of(*activities):
+    scan = ActivityScan()
+    for activity in activities:
+        scan.feed(activity, WANT_PR)
+    return scan.branch
+
+
+PUSH_OUTPUT = (
+    "Enumerating objects: 5, done.\n"
+    "remote: Create a pull request for 'feature/login-form' on GitHub by visiting:\n"
+    "To https://github.com/o/r.git\n"
+    " * [new branch]      HEAD -> feature/login-form\n"
+)
+
+
+@pytest.mark.parametrize(
+    "command",
+    ["git push -u origin HEAD", "cd repo && git push origin HEAD:refs/heads/x", "git -C repo push --set-upstream origin HEAD"],
+)
+def test_branch_from_git_push_output(command):
+    assert branch_of(bash_activity(command, PUSH_OUTPUT)) == "feature/login-form"
+
+
+def test_branch_named_in_the_push_command():
+    assert branch_of(bash_activity("git push origin feature/cart", "Everything up-to-date")) == "feature/cart"
+
+
+@pytest.mark.parametrize("command", ["git log --oneline", "git status", "echo git; push"])
+def test_other_command_output_is_not_searched(command):
+    assert branch_of(bash_activity(command, PUSH_OUTPUT)) is None
+
+
+def test_latest_feature_branch_wins_over_plain_refs():
+    first = bash_activity("git push", "To origin\n   abc..def  HEAD -> refs/heads/main\n")
+    assert branch_of(first) == "main"
+    assert branch_of(first, bash_activity("git push -u origin HEAD", PUSH_OUTPUT)) == "feature/login-form"
+
+
+def test_review_marker_split_across_activities():
+    scan = ActivityScan()
+    scan.feed(Activity.from_api({"agentMessaged": {"agentMessage": 'BEGIN_REVIEW_JSON {"verdict":'}}), WANT_REVIEW)
+    assert scan.result(WANT_REVIEW) is None
+    done = scan.feed(Activity.from_api({"agentMessaged": {"agentMessage": '"PASS", "blocking": []} END_REVIEW_JSON'}}), WANT_REVIEW)
+    assert done
+    assert scan.result(WANT_REVIEW) == {"verdict": "PASS", "blocking": []}
+
+
+def test_unterminated_marker_buffer_is_capped():
+    matcher = MarkerMatcher("BEGIN", "END")
+    matcher.feed("BEGIN " + "x" * MAX_MARKER_PAYLOAD)
+    matcher.feed("more text")
+    assert matcher._parts is None
+    matcher.feed('BEGIN {"ok": true} END')
+    assert matcher.payload == {"ok": True}
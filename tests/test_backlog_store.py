@@ -0,0 +1,88 @@
+import pytest
+import yaml
+
+from orchestrator.backlog import BACKLOG_FILES, BacklogStore
+
+STATUSES = ("ready", "in_progress", "review", "done")
+
+
+def write_backlog(root, features, stories, acceptance):
+    sections = {"product": {"version": 1, "product": {"name": "p"}}, "epics": {"version": 1, "items": [{"id": "E1"}]}}
+    sections["features"] = {"version": 1, "items": features}
+    sections["stories"] = {"version": 1, "items": stories}
+    sections["acceptance"] = {"version": 1, "items": acceptance}
+    for section, rel_path in BACKLOG_FILES.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(yaml.safe_dump(sections[section], sort_keys=False))
+
+
+def assert_indexes_consistent(store):
+    features = store.features.get("items", [])
+    for status in STATUSES:
+        assert store.features_with_status(status) == [item for item in features if item.get("status") == status]
+    for item in features:
+        assert store.get_feature(item["id"]) is next(entry for entry in features if entry["id"] == item["id"])
+        stories = store.get_stories_for_feature(item["id"])
+        assert stories == [story for story in store.stories["items"] if story.get("feature") == item["id"]]
+        story_ids = {story.get("id") for story in stories}
+        expected = [entry for entry in store.acceptance["items"] if entry.get("story") in story_ids]
+        assert store.acceptance_for_stories(stories) == expected
+
+
+@pytest.fixture(params=[False, True], ids=["yaml", "snapshot"])
+def store(request, tmp_path):
+    write_backlog(
+        tmp_path,
+        [{"id": "F1", "epic": "E1", "status": "ready"}, {"id": "F2", "epic": "E1", "status": "done"}],
+        [{"id": "S1", "feature": "F1"}, {"id": "S2", "feature": "F2"}],
+        [{"story": "S1", "criteria": ["a"]}, {"story": "S2", "criteria": ["b"]}],
+    )
+    store = BacklogStore(tmp_path, use_cache=request.param)
+    store.load()
+    return store
+
+
+def test_indexes_after_load(store):
+    assert_indexes_consistent(store)
+    assert store.get_feature("F3") is None
+
+
+def test_status_updates_move_features_between_buckets(store):
+    store.update_feature_status("F1", "in_progress")
+    store.update_feature_fields("F2", status="review", pr_url="u")
+    assert_indexes_consistent(store)
+    assert [item["id"] for item in store.features_with_status("review")] == ["F2"]
+    assert store.next_review_feature()["id"] == "F2"
+
+
+def test_append_extends_indexes(store):
+    store.apply_agent1_payload(
+        {
+            "features": [{"id": "F1", "status": "ready"}, {"id": "F3", "epic": "E1", "status": "ready"}],
+            "stories": [{"id": "S3", "feature": "F3"}],
+            "acceptance": [{"story": "S1", "criteria": ["a", "c"]}, {"story": "S3", "criteria": ["d"]}],
+        },
+        mode="append",
+    )
+    assert [item["id"] for item in store.features["items"]] == ["F1", "F2", "F3"]
+    assert store.acceptance["items"][0]["criteria"] == ["a", "c"]
+    assert_indexes_consistent(store)
+
+
+def test_replace_rebuilds_indexes(store):
+    store.apply_agent1_payload(
+        {"features": [{"id": "F9", "epic": "E1", "status": "ready"}], "stories": [{"id": "S9", "feature": "F9"}]},
+        mode="replace",
+    )
+    assert store.get_feature("F1") is None
+    assert_indexes_consistent(store)
+
+
+def test_indexes_survive_save_and_reload(store, tmp_path):
+    store.update_feature_status("F1", "review")
+    store.save_all()
+    reloaded = BacklogStore(tmp_path, use_cache=store.use_cache)
+    reloaded.load()
+    assert reloaded.features == store.features
+    assert_indexes_consistent(reloaded)
@@ -0,0 +1,32 @@
+import pytest
+import yaml
+
+from orchestrator import backlog
+from orchestrator.backlog import _dump_yaml
+
+pytestmark = pytest.mark.skipif(not backlog.HAS_LIBYAML, reason="PyYAML built without libyaml")
+
+CASES = [
+    {"items": [{"id": "F1", "title": "Plain", "status": "ready", "depends_on": []}]},
+    {"": "empty key"},
+    {"items": [{"id": "F1", "meta": {"": 1}}]},
+    {"k" * 123: 1},
+    {"k" * 200: [1, 2]},
+    {"x" * 122 + "'": "quoted long key"},
+    {1: "int key", None: "null key", True: "bool key"},
+    {"title": "long text " * 40, "notes": "it's \"quoted\" {braces} #hash: colon"},
+    {"title": "café — unicode"},
+    {"text": "line one\nline two"},
+    {"values": [None, True, False, 0, -3, 2.5, 10**20, "", " ", "yes", "~", "- x"]},
+]
+
+
+@pytest.mark.parametrize("data", CASES)
+def test_libyaml_dump_matches_pure_python(data):
+    assert _dump_yaml(data, use_libyaml=True) == yaml.safe_dump(data, sort_keys=False)
+
+
+def test_plain_payload_takes_the_libyaml_path():
+    assert backlog._is_plain_ascii(CASES[0])
+    assert not backlog._is_plain_ascii({"": 1})
+    assert not backlog._is_plain_ascii({"k" * 123: 1})
@@ -0,0 +1,51 @@
+from orchestrator.journal import (
+    STAGE_FEATURE_STARTED,
+    STAGE_FIX_SESSION,
+    STAGE_PR_FOUND,
+    STAGE_REVIEW_SESSION,
+    STAGE_REVIEW_VERDICT,
+    StageJournal,
+)
+
+
+def test_pending_only_while_the_stage_is_the_last_one(tmp_path):
+    journal = StageJournal(tmp_path)
+    journal.record("F1", STAGE_FEATURE_STARTED)
+    journal.record("F1", STAGE_REVIEW_SESSION, sessions=["sessions/r1"])
+    assert journal.pending("F1", STAGE_REVIEW_SESSION, "sessions") == ["sessions/r1"]
+    assert journal.pending("F1", STAGE_FIX_SESSION, "session") is None
+
+    journal.record("F1", STAGE_REVIEW_VERDICT, verdict="PASS")
+    assert journal.pending("F1", STAGE_REVIEW_SESSION, "sessions") is None
+    assert journal.state("F1")["sessions"] == ["sessions/r1"]
+
+
+def test_restart_clears_the_previous_attempt(tmp_path):
+    journal = StageJournal(tmp_path)
+    journal.record("F1", STAGE_PR_FOUND, pr_url="https://github.com/o/r/pull/1", head_ref="feature/f1")
+    journal.record("F1", STAGE_FEATURE_STARTED)
+    assert journal.state("F1") == {"stage": STAGE_FEATURE_STARTED}
+
+
+def test_reload_from_disk(tmp_path):
+    journal = StageJournal(tmp_path)
+    journal.record("F1", STAGE_FEATURE_STARTED)
+    journal.record(7, STAGE_FIX_SESSION, session="sessions/fix")
+    journal.record(None, STAGE_FIX_SESSION, session="ignored")
+    with journal.path.open("a") as handle:
+        handle.write('{"feature": "F1", "stage": "fix_')
+
+    reloaded = StageJournal(tmp_path)
+    reloaded.load()
+    assert reloaded.pending("7", STAGE_FIX_SESSION, "session") == "sessions/fix"
+    assert reloaded.state("F1")["stage"] == STAGE_FEATURE_STARTED
+    assert reloaded.pending(None, STAGE_FIX_SESSION, "session") is None
+
+
+def test_elapsed_seconds_per_feature(tmp_path):
+    journal = StageJournal(tmp_path)
+    first = journal.record("F1", STAGE_FEATURE_STARTED)
+    second = journal.record("F1", STAGE_PR_FOUND, pr_url="u")
+    assert first["elapsed_seconds"] is None
+    assert second["elapsed_seconds"] >= 0
+    assert journal.record("F2", STAGE_FEATURE_STARTED)["elapsed_seconds"] is None
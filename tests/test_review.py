@@ -0,0 +1,68 @@
+import pytest
+
+from orchestrator.review import QUORUM_ALL, QUORUM_FIRST_PASS, QUORUM_MAJORITY, aggregate_reviews, quorum_needed
+
+PASS = {"verdict": "PASS", "blocking": [], "non_blocking": ["nit"]}
+REJECT = {"verdict": "CHANGES_REQUESTED", "blocking": ["broken"], "non_blocking": []}
+PENDING = {"verdict": "PENDING", "blocking": [], "non_blocking": []}
+
+
+@pytest.mark.parametrize(
+    "quorum, reviewers, needed",
+    [
+        (QUORUM_FIRST_PASS, 3, 1),
+        (QUORUM_MAJORITY, 1, 1),
+        (QUORUM_MAJORITY, 2, 2),
+        (QUORUM_MAJORITY, 3, 2),
+        (QUORUM_MAJORITY, 4, 3),
+        (QUORUM_ALL, 3, 3),
+    ],
+)
+def test_quorum_needed(quorum, reviewers, needed):
+    assert quorum_needed(quorum, reviewers) == needed
+
+
+def test_unknown_quorum():
+    with pytest.raises(ValueError):
+        quorum_needed("most", 3)
+
+
+def test_single_reviewer_review_is_returned_as_is():
+    assert aggregate_reviews([], 1, QUORUM_ALL) is None
+    assert aggregate_reviews([REJECT], 1, QUORUM_ALL) is REJECT
+
+
+def test_undecided_while_the_quorum_is_still_reachable():
+    assert aggregate_reviews([PASS], 3, QUORUM_MAJORITY) is None
+    assert aggregate_reviews([REJECT], 3, QUORUM_MAJORITY) is None
+
+
+def test_majority_pass():
+    review = aggregate_reviews([PASS, REJECT, PASS], 3, QUORUM_MAJORITY)
+    assert review["verdict"] == "PASS"
+    assert review["blocking"] == []
+    assert review["non_blocking"] == ["nit"]
+    assert [vote["verdict"] for vote in review["reviewers"]] == ["PASS", "NEEDS_CHANGES", "PASS"]
+
+
+def test_first_pass_decides_early():
+    assert aggregate_reviews([PASS], 3, QUORUM_FIRST_PASS)["verdict"] == "PASS"
+
+
+def test_first_rejection_decides_all():
+    review = aggregate_reviews([REJECT], 3, QUORUM_ALL)
+    assert review["verdict"] == "NEEDS_CHANGES"
+    assert review["blocking"] == ["broken"]
+
+
+def test_pass_with_blocking_issues_is_a_rejection():
+    dirty_pass = {"verdict": "PASS", "blocking": ["leak"]}
+    review = aggregate_reviews([dirty_pass, REJECT], 2, QUORUM_MAJORITY)
+    assert review["verdict"] == "NEEDS_CHANGES"
+    assert review["blocking"] == ["leak", "broken"]
+
+
+def test_pending_votes_count_for_neither_side():
+    review = aggregate_reviews([PASS, PENDING, PENDING], 3, QUORUM_MAJORITY)
+    assert review["verdict"] == "PENDING"
+    assert aggregate_reviews([PENDING, REJECT, REJECT], 3, QUORUM_MAJORITY)["verdict"] == "NEEDS_CHANGES"
@@ -0,0 +1,76 @@
+from orchestrator.scheduler import EPIC_ORDER_STRICT, FeatureGraph
+
+
+def feature(feature_id, epic="E1", status="ready", depends_on=None):
+    item = {"id": feature_id, "epic": epic, "status": status}
+    if depends_on is not None:
+        item["depends_on"] = depends_on
+    return item
+
+
+def runnable_ids(graph):
+    return [item["id"] for item in graph.runnable()]
+
+
+def test_longest_remaining_chain_first():
+    graph = FeatureGraph(
+        [{"id": "E1"}],
+        [feature("A"), feature("B"), feature("C", depends_on=["B"]), feature("D", depends_on="C")],
+    )
+    assert runnable_ids(graph) == ["B", "A"]
+    assert graph.blockers("D") == ["C"]
+
+
+def test_done_dependencies_unblock():
+    graph = FeatureGraph([{"id": "E1"}], [feature("A", status="done"), feature("B", depends_on=["A"])])
+    assert runnable_ids(graph) == ["B"]
+    assert graph.stalled() == {}
+
+
+def test_epic_order_then_file_order():
+    epics = [{"id": "E1"}, {"id": "E2"}]
+    features = [feature("X", epic="E2"), feature("Y", epic="E1"), feature("Z", epic="E1")]
+    assert runnable_ids(FeatureGraph(epics, features)) == ["Y", "Z", "X"]
+    assert runnable_ids(FeatureGraph(epics, features, EPIC_ORDER_STRICT)) == ["Y", "Z"]
+
+
+def test_epic_depends_on_waits_for_every_feature_of_that_epic():
+    epics = [{"id": "E1"}, {"id": "E2", "depends_on": ["E1"]}]
+    features = [feature("A"), feature("B", status="done"), feature("C", epic="E2")]
+    graph = FeatureGraph(epics, features)
+    assert runnable_ids(graph) == ["A"]
+    assert graph.blockers("C") == ["A"]
+
+
+def test_unknown_feature_dependency_stalls():
+    graph = FeatureGraph([{"id": "E1"}], [feature("A", depends_on=["NOPE"]), feature("B")])
+    assert runnable_ids(graph) == ["B"]
+    assert graph.blockers("A") == ["NOPE"]
+    assert graph.stalled() == {"A": "depends on unknown feature(s) NOPE"}
+
+
+def test_unknown_epic_dependency_stalls():
+    epics = [{"id": "E1", "depends_on": ["E9"]}, {"id": "E2"}]
+    graph = FeatureGraph(epics, [feature("A"), feature("B", epic="E2")])
+    assert runnable_ids(graph) == ["B"]
+    assert graph.stalled() == {"A": "depends on unknown epic(s) E9"}
+
+
+def test_cycle_and_features_behind_it_stall():
+    features = [
+        feature("A", depends_on=["B"]),
+        feature("B", depends_on=["A"]),
+        feature("C", depends_on=["A"]),
+        feature("D"),
+    ]
+    graph = FeatureGraph([{"id": "E1"}], features)
+    assert runnable_ids(graph) == ["D"]
+    assert set(graph.stalled()) == {"A", "B", "C"}
+    assert graph.stalled()["C"] == "on or behind a dependency cycle"
+
+
+def test_ids_compare_as_strings():
+    graph = FeatureGraph([{"id": "E1"}], [feature(7), feature("7", status="done"), feature("B", depends_on=[7])])
+    assert graph.duplicate_ids == ["7"]
+    assert runnable_ids(graph) == [7]
+    assert graph.blockers("B") == ["7"]
@@ -0,0 +1,69 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("requests")
+
+from orchestrator import transport  # noqa: E402
+from orchestrator.transport import RateGovernor, RateLimitWait  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(transport.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_up_to_capacity_then_wait(clock):
+    governor = RateGovernor(per_minute=5, max_wait=0)
+    assert [governor.acquire("k") for _ in range(5)] == [0.0] * 5
+    with pytest.raises(RateLimitWait) as exc:
+        governor.acquire("k")
+    assert exc.value.wait == pytest.approx(12.0)
+    usage = governor.usage()["k"]
+    assert usage["requests"] == 5
+    # The refused request handed its token back.
+    assert usage["tokens"] == pytest.approx(0.0)
+
+
+def test_tokens_refill_over_time(clock):
+    governor = RateGovernor(per_minute=5, max_wait=0)
+    for _ in range(5):
+        governor.acquire("k")
+    clock[0] += 12.0
+    assert governor.acquire("k") == 0.0
+    with pytest.raises(RateLimitWait):
+        governor.acquire("k")
+
+
+def test_keys_have_separate_buckets(clock):
+    governor = RateGovernor(per_minute=1, max_wait=0)
+    governor.acquire("a")
+    assert governor.acquire("b") == 0.0
+
+
+def test_without_pacing_nothing_waits(clock):
+    governor = RateGovernor(per_minute=1, pace=False, max_wait=0)
+    assert all(governor.acquire("k") == 0.0 for _ in range(20))
+    assert governor.usage()["k"]["requests"] == 20
+
+
+def test_wait_past_the_deadline_raises(clock):
+    governor = RateGovernor(per_minute=1)
+    governor.set_deadline(time.time() + 5)
+    governor.acquire("k")
+    with pytest.raises(RateLimitWait):
+        governor.acquire("k")
+
+
+def test_retry_after_blocks_the_key(clock):
+    governor = RateGovernor(per_minute=60, max_wait=0)
+    resp = SimpleNamespace(status_code=429, headers={"Retry-After": "30"}, text="")
+    assert governor.observe("k", resp) == 30.0
+    with pytest.raises(RateLimitWait) as exc:
+        governor.acquire("k")
+    assert exc.value.wait == pytest.approx(30.0)
+    clock[0] += 30.0
+    assert governor.acquire("k") == 0.0
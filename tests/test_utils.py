@@ -0,0 +1,62 @@
+import json
+import random
+
+import pytest
+
+from orchestrator.utils import find_json_object, iter_json_objects
+
+
+def legacy_objects(text, predicate=None):
+    # The raw_decode loop iter_json_objects replaced: try every "{", skip past each value that decodes.
+    decoder = json.JSONDecoder()
+    idx = 0
+    while idx < len(text):
+        if text[idx] != "{":
+            idx += 1
+            continue
+        try:
+            obj, end = decoder.raw_decode(text[idx:])
+        except json.JSONDecodeError:
+            idx += 1
+            continue
+        if isinstance(obj, dict) and (predicate is None or predicate(obj)):
+            yield obj
+        idx += max(end, 1)
+
+
+FRAGMENTS = ['{"a": 1}', '{"b": {"c": [1, 2]}}', "{", "}", '"', "\\", "\n", "x", " ", '{"s": "}{"}', "[1]", ":", ","]
+
+
+def test_matches_raw_decode_loop_on_random_text():
+    rng = random.Random(1234)
+    for _ in range(3000):
+        text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 24)))
+        assert list(iter_json_objects(text)) == list(legacy_objects(text)), text
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        'function f() { if (x) { return {"a": 1}',
+        '{"open": [1, 2, {"ok": true}',
+        'const opts = {};\n{"verdict": "PASS"} and then { never closed',
+        '{ "x": "unterminated\n{"y": 2}',
+    ],
+)
+def test_unclosed_braces(text):
+    assert list(iter_json_objects(text)) == list(legacy_objects(text))
+
+
+def test_objects_after_an_unclosed_brace_are_found():
+    text = "{ unbalanced\n" + " ".join(json.dumps({"n": n}) for n in range(50))
+    assert [obj["n"] for obj in iter_json_objects(text)] == list(range(50))
+
+
+def test_large_values_decode_past_the_window():
+    payload = {"text": "y" * 20000, "items": list(range(3000))}
+    assert find_json_object("{ noise " + json.dumps(payload)) == payload
+
+
+def test_predicate_skips_objects():
+    text = '{"kind": "a"} {"kind": "b", "n": 2}'
+    assert find_json_object(text, lambda obj: obj.get("kind") == "b") == {"kind": "b", "n": 2}